@@ -0,0 +1,64 @@
+"""
+Compare validating and trusted (``_validate_ = False``) structures::
+
+    python -m benchmarks.validate
+"""
+import enum
+import timeit
+
+from tamp import *
+
+
+class Kind(enum.IntEnum):
+    Data = 1
+    Ack = 2
+
+
+class Record(Structure):
+    _fields_ = [
+        ('kind', EnumWrap(Kind, uint8_t)),
+        ('seq', uint32_t),
+        ('len', uint16_t),
+        ('samples', int16_t[LengthField('len')]),
+        ('check', Computed(uint8_t, '_calc_check')),
+    ]
+
+    def _calc_check(self):
+        return self.seq & 0xff
+
+
+class TrustedRecord(Record):
+    _validate_ = False
+
+
+def _bench(record_type, number):
+    record = record_type()
+    record.kind = Kind.Data
+    record.seq = 1234
+    record.samples = list(range(-100, 100))
+    packed = bytes(record)
+
+    def _assign():
+        record.seq = 1235
+        record.samples = list(range(-100, 100))
+
+    def _unpack():
+        record_type().unpack(packed)
+
+    return {
+        'assign': timeit.timeit(_assign, number=number),
+        'unpack': timeit.timeit(_unpack, number=number),
+    }
+
+
+def main(number=2000):
+    validated = _bench(Record, number)
+    trusted = _bench(TrustedRecord, number)
+
+    for name in validated:
+        print('%-8s validated %8.2f us  trusted %8.2f us  (%.1fx)' % (
+            name, validated[name] / number * 1e6, trusted[name] / number * 1e6, validated[name] / trusted[name]))
+
+
+if __name__ == '__main__':
+    main()
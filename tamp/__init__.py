@@ -1,7 +1,12 @@
-from ._base import DataType
+from ._base import DataType, IncompleteError
 from ._ints import *
+from ._bits import *
+from ._varint import *
 from ._arrays import *
 from ._enum import *
 from ._struct import *
-from ._stream import StreamUnpacker
+from ._stream import StreamUnpacker, StreamPacker, TransportPacker, PipelinedUnpacker
 from ._strings import *
+from ._file import *
+from ._parallel import *
+from ._columns import *
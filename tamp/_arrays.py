@@ -1,10 +1,10 @@
 import functools
 
-from ._base import DataType, array_type, _Array, LengthFixed, _ArrayType
+from ._base import DataType, IncompleteError, array_type, _Array, LengthFixed, _ArrayType, _find_bytes
 from ._struct import wrap_type
 
 
-__all__ = ['LengthField', 'LengthFixed', 'PackedLength']
+__all__ = ['LengthField', 'LengthFixed', 'PackedLength', 'Remaining', 'Terminated']
 
 
 class _LengthFieldWrapper(DataType):
@@ -22,31 +22,47 @@ class _LengthFieldWrapper(DataType):
     def _unpack(self, buf):
         return self.field.unpack(buf)
 
+    def frame_size(self, buf):
+        # The length is needed to frame the array.
+        return self.field.unpack(buf)
+
     def pack(self):
         return self.field.pack()
 
     def size(self):
         return self.field.size()
 
+    def static_size(self):
+        return self.field.static_size()
+
+    def packed_size(self):
+        return self.field.packed_size()
+
+    def alignment(self):
+        return self.field.alignment()
+
+    @property
+    def _unpack_view_(self):
+        return self.field._unpack_view_
+
     def unpack_stream(self, stream):
-        return self.field.unpack_stream(stream)
+        yield from self.field.unpack_stream(stream)
 
 
 @array_type
 class LengthField(_Array):
-    # TODO: validate that length field is defined before array field.
+    _depends_on_ = ('length-of', 'field')
 
     def __init__(self, field, *args, **kwargs):
         self.field = kwargs.get('parent').wrap_field(field, _LengthFieldWrapper)
         _Array.__init__(self, *args, **kwargs)  # TODO
-        # TODO: validate the length field, hijack the field and make it read only
 
-    def unpack_more(self, values):
-        return len(values) < self.field.value
+    def remaining(self, values):
+        return self.field.value - len(values)
 
     @_Array.value.setter
     def value(self, new_value):
-        self._value = self.array_type(new_value)
+        self._value = self.array_type(new_value, validate=self._validate_)
         self.field.value = len(self._value)
 
     def size(self):
@@ -57,6 +73,191 @@ class LengthField(_Array):
             raise ValueError('Expected %d elements, but got %d.' % (self.field.value, len(value)))
 
 
+@array_type
+class Terminated(_Array):
+    """
+    An array ended by a ``sentinel`` element. The sentinel is packed and
+    unpacked, but is not part of the value::
+
+        class Path(Structure):
+            _fields_ = [
+                ('hops', uint16_t[Terminated(0)]),
+            ]
+
+    Arrays of static size elements are framed by searching for the packed
+    sentinel, then unpacked in bulk.
+    """
+    def __init__(self, sentinel, *args, **kwargs):
+        self.sentinel = sentinel
+        _Array.__init__(self, *args, **kwargs)
+
+        elem_type = self._value.elem_type
+        self._elem_size = elem_type().static_size()
+        self._packed_sentinel = bytes(elem_type(value=sentinel))
+
+    def remaining(self, values):
+        return None
+
+    def _find_sentinel(self, find, start, end=None):
+        # Only matches at element boundaries count.
+        while True:
+            index = find(self._packed_sentinel, start, end)
+
+            if index < 0 or index % self._elem_size == 0:
+                return index
+
+            start = index + 1
+
+    def _frame(self, buf):
+        index = self._find_sentinel(functools.partial(_find_bytes, buf), 0)
+
+        if index < 0:
+            raise IncompleteError('Not enough bytes to unpack: no sentinel found.')
+
+        return index
+
+    def _unpack(self, buf):
+        array = self.array_type(validate=self._validate_)
+
+        if self._elem_size is None:
+            consumed = 0
+            while True:
+                consumed += array.unpack(buf[consumed:])
+
+                if array.value[-1] == self.sentinel:
+                    del array.value[-1]
+                    break
+
+        else:
+            index = self._frame(buf)
+            array.unpack_many(buf[:index], index // self._elem_size)
+            consumed = index + self._elem_size
+
+        self._value = array
+
+        return consumed
+
+    def frame_size(self, buf):
+        if self._elem_size is None:
+            return self.unpack(buf)
+
+        return self._frame(buf) + self._elem_size
+
+    def unpack_stream(self, stream):
+        array = self.array_type(validate=self._validate_)
+
+        if self._elem_size is None:
+            while True:
+                yield from array.unpack_stream(stream)
+
+                if array.value[-1] == self.sentinel:
+                    del array.value[-1]
+                    break
+
+        else:
+            # Whole elements that were already searched are not searched
+            # again when more bytes arrive.
+            scanned = 0
+            while True:
+                index = self._find_sentinel(stream.find, scanned)
+
+                if index >= 0:
+                    break
+
+                scanned = len(stream) - len(stream) % self._elem_size
+                yield from stream.wait(scanned + self._elem_size)
+
+            array.unpack_many(stream.read(index), index // self._elem_size)
+            stream.read(self._elem_size)
+
+        sink = stream.sink(self)
+        if sink is not None:
+            sink(array.value)
+            array = self.array_type(validate=self._validate_)
+
+        self._value = array
+
+    @_Array.value.setter
+    def value(self, new_value):
+        value = self.array_type(new_value, validate=self._validate_)
+
+        if self._validate_ and self.sentinel in value.value:
+            raise TypeError('Value must not contain the sentinel %r.' % (self.sentinel,))
+
+        self._value = value
+
+    def pack(self):
+        return bytes(self._value) + self._packed_sentinel
+
+    def _pack_iter(self):
+        yield from self._value._pack_iter()
+        yield self._packed_sentinel
+
+    def packed_size(self):
+        return self._value.packed_size() + len(self._packed_sentinel)
+
+    def size(self):
+        return 0  # always like a variable length member.
+
+
+@array_type
+class Remaining(_Array):
+    """
+    An array of all the bytes it is unpacked from, e.g. the rest of a
+    :class:`PackedLength` field::
+
+        ('data', PackedLength(uint32_t[Remaining()], 'dsize')),
+
+    For static size elements, the count is worked out by division and the
+    elements are unpacked in bulk; a partial trailing element raises
+    ``ValueError``.
+    """
+    def remaining(self, values):
+        return None
+
+    def _elem_size(self, array):
+        return array.elem_type().static_size()
+
+    def _count(self, buf, elem_size):
+        count, extra = divmod(len(buf), elem_size)
+
+        if extra:
+            raise ValueError('%d bytes is not a whole number of %d byte elements.' % (len(buf), elem_size))
+
+        return count
+
+    def _unpack(self, buf):
+        array = self.array_type(validate=self._validate_)
+        elem_size = self._elem_size(array)
+
+        if elem_size is None:
+            consumed = array.unpack_many(buf)
+        else:
+            consumed = array.unpack_many(buf, self._count(buf, elem_size))
+
+        self._value = array
+
+        return consumed
+
+    def frame_size(self, buf):
+        elem_size = self._elem_size(self._value)
+
+        if elem_size is None:
+            return self.unpack(buf)
+
+        return self._count(buf, elem_size) * elem_size
+
+    def _check_length(self, value):
+        pass
+
+    @_Array.value.setter
+    def value(self, new_value):
+        self._value = self.array_type(new_value, validate=self._validate_)
+
+    def size(self):
+        return 0  # always like a variable length member.
+
+
 class _PackedLengthFieldWrapper(DataType):
     def __init__(self, wrapped_field, length_field):
         self.wrapped_field = wrapped_field
@@ -66,7 +267,7 @@ class _PackedLengthFieldWrapper(DataType):
         # This is definitely ghetto. It's mainly here because in the case the
         # field whose length is represented by the length field is a struct,
         # the parent struct doesn't know that the field changes.
-        self.length_field.value = len(bytes(self.wrapped_field))
+        self.length_field.value = self.wrapped_field.packed_size()
 
     @DataType.value.getter
     def value(self):
@@ -81,8 +282,12 @@ class _PackedLengthFieldWrapper(DataType):
     def _unpack(self, buf):
         return self.length_field.unpack(buf)
 
+    def frame_size(self, buf):
+        # The length is needed to frame the wrapped field.
+        return self.length_field.unpack(buf)
+
     def unpack_stream(self, stream):
-        return self.length_field.unpack_stream(stream)
+        yield from self.length_field.unpack_stream(stream)
 
     def pack(self):
         self._update_length()
@@ -91,6 +296,19 @@ class _PackedLengthFieldWrapper(DataType):
     def size(self):
         return self.length_field.size()
 
+    def static_size(self):
+        return self.length_field.static_size()
+
+    def packed_size(self):
+        return self.length_field.packed_size()
+
+    def alignment(self):
+        return self.length_field.alignment()
+
+    @property
+    def _unpack_view_(self):
+        return self.length_field._unpack_view_
+
 
 @wrap_type
 class PackedLength(DataType):
@@ -109,6 +327,8 @@ class PackedLength(DataType):
                 ('end', Const(uint8_t, 0xFF)),
             ]
     """
+    _depends_on_ = ('size-of', 'size_field_name')
+
     def __init__(self, wrapped_field_type, size_field_name, **kwargs):
         self.wrapped_field = wrapped_field_type(**kwargs)
 
@@ -119,31 +339,51 @@ class PackedLength(DataType):
 
     def _unpack(self, buf):
         unpack_size = self.length_field.value
-        consumed = self.wrapped_field.unpack(buf[:unpack_size])
+
+        if len(buf) < unpack_size:
+            raise IncompleteError('Expected to unpack %d bytes; got %d.' % (unpack_size, len(buf)))
+
+        try:
+            consumed = self.wrapped_field.unpack(buf[:unpack_size])
+        except IncompleteError as err:
+            # All of the bytes it was given were there; more won't help.
+            raise ValueError('Expected to unpack %d bytes: %s' % (unpack_size, err)) from None
 
         if consumed != unpack_size:
             raise ValueError('Expected to unpack %d bytes; unpacked %d.' % (unpack_size, consumed))
 
         return unpack_size
 
-    def unpack_stream(self, stream):
+    def frame_size(self, buf):
         unpack_size = self.length_field.value
-        value = stream.pop_state(self, b'')
 
-        remaining = unpack_size - len(value)
+        if len(buf) < unpack_size:
+            raise IncompleteError('Expected to unpack %d bytes; got %d.' % (unpack_size, len(buf)))
 
-        value += stream.read(min(len(stream), remaining))
+        return unpack_size
 
-        if len(value) < unpack_size:
-            stream.push_state(self, value)
-            return False
-        else:
-            self.wrapped_field.unpack(value)
-            return True
+    def unpack_stream(self, stream):
+        unpack_size = self.length_field.value
+        yield from stream.wait(unpack_size)
+
+        self._unpack(stream.read(unpack_size))
 
     def pack(self):
         return self.wrapped_field.pack()
 
+    def _pack_iter(self):
+        yield from self.wrapped_field._pack_iter()
+
+    def packed_size(self):
+        return self.wrapped_field.packed_size()
+
+    def alignment(self):
+        return self.wrapped_field.alignment()
+
+    @property
+    def _unpack_view_(self):
+        return self.wrapped_field._unpack_view_
+
     @DataType.value.getter
     def value(self):
         return self.wrapped_field.value
@@ -1,6 +1,14 @@
 import inspect
 
 
+class IncompleteError(ValueError):
+    """
+    Raised when there are not enough bytes to unpack a value, which more
+    bytes may complete. Other ``ValueError`` exceptions raised when
+    unpacking mean the bytes are invalid.
+    """
+
+
 class _Type(type): # yo dawg, I heard you like types.types
 
     def __iter__(cls):
@@ -24,20 +32,22 @@ class _Type(type): # yo dawg, I heard you like types.types
         def __init__(self, *args, **kwargs):
             new_args = list(size.args)
             new_args.extend(args)
-            new_args.append(lambda value=None, length=None: cls._array_type_(cls, value=value, length=length))
+            new_args.append(lambda value=None, length=None, validate=True:
+                            cls._array_type_(cls, value=value, length=length, validate=validate))
             kwargs.update(size.kwargs)
             size.cls.__init__(self, *new_args, **kwargs)
 
         new_name = cls.__name__ + '_array_' + str(size.cls)
-        new_type = type(size.cls)(new_name, (size.cls,), {'__init__': __init__})
+        new_type = type(size.cls)(new_name, (size.cls,), {'__init__': __init__, '_array_length_': size})
 
         return new_type
 
 
 class _ArrayType(object):
-    def __init__(self, elem_type, value=None, length=None):
+    def __init__(self, elem_type, value=None, length=None, validate=True):
         self.elem_type = elem_type
         self._value = None
+        self._validate = validate
         self.init(length, value)
 
     def init(self, length, value):
@@ -49,9 +59,39 @@ class _ArrayType(object):
     def unpack_stream(self, stream):
         raise NotImplementedError
 
+    def unpack_stream_many(self, stream, count=None):
+        """
+        Generator unpacking at least one and at most ``count`` elements from
+        a stream. By default, one element.
+        """
+        yield from self.unpack_stream(stream)
+
+    def unpack_many(self, buf, count=None):
+        """
+        Unpack up to ``count`` elements (by default, until ``buf`` is used
+        up) and return the number of bytes consumed.
+        """
+        if isinstance(buf, memoryview) and not self.elem_type._unpack_view_:
+            buf = buf.tobytes()
+
+        offset = 0
+        while (count is None or count > 0) and offset < len(buf):
+            offset += self.unpack(buf[offset:])
+
+            if count is not None:
+                count -= 1
+
+        return offset
+
     def __bytes__(self):
         raise NotImplementedError
 
+    def _pack_iter(self):
+        yield bytes(self)
+
+    def packed_size(self):
+        return len(bytes(self))
+
     @property
     def value(self):
         return self._value
@@ -73,12 +113,22 @@ class _ArrayType(object):
         return NotImplementedError
 
 
+# Number of elements encoded per piece when packing arrays incrementally.
+_PACK_CHUNK_LEN = 4096
+
+
 class ListArray(_ArrayType):
     def init(self, length, value):
         if isinstance(value, _ArrayType):
             raise Exception
 
-        if value is not None:
+        if value is not None and not self._validate:
+            self._value = list(value)
+
+        elif value is not None and self.elem_type._check_many is not None:
+            self._value = self.elem_type._check_many(value)
+
+        elif value is not None:
             # This will raise a TypeError if any of the elements is invalid
             self._value = [self.elem_type(value=elem).value for elem in value]
 
@@ -89,25 +139,45 @@ class ListArray(_ArrayType):
             self._value = []
 
     def unpack(self, buf):
-        elem = self.elem_type()
+        elem = self.elem_type(validate=self._validate)
         consuemd = elem.unpack(buf)
         self._value.append(elem.value)
 
         return consuemd
 
+    def unpack_many(self, buf, count=None):
+        if self.elem_type._unpack_many is None:
+            return super(ListArray, self).unpack_many(buf, count)
+
+        values, consumed = self.elem_type._unpack_many(buf, count)
+        self._value.extend(values)
+
+        return consumed
+
     def unpack_stream(self, stream):
-        elem = stream.pop_state(self) or self.elem_type()
+        elem = self.elem_type(validate=self._validate)
+        yield from elem.unpack_stream(stream)
+        self._value.append(elem.value)
+
+    def __bytes__(self):
+        return b''.join(self._pack_iter())
+
+    def _pack_iter(self):
+        if self.elem_type._pack_chunk is not None:
+            for start in range(0, len(self._value), _PACK_CHUNK_LEN):
+                yield self.elem_type._pack_chunk(self._value[start:start + _PACK_CHUNK_LEN])
 
-        result = elem.unpack_stream(stream)
-        if result:
-            self._value.append(elem.value)
         else:
-            stream.push_state(self, elem)
+            for value in self._value:
+                yield from self.elem_type(value=value)._pack_iter()
 
-        return result
+    def packed_size(self):
+        elem_size = self.elem_type().static_size()
 
-    def __bytes__(self):
-        return b''.join(bytes(self.elem_type(value=value)) for value in self._value)
+        if elem_size is not None:
+            return len(self) * elem_size
+        else:
+            return sum(self.elem_type(value=value).packed_size() for value in self._value)
 
     def size(self):
         return len(self) * self.elem_type().size()
@@ -116,11 +186,52 @@ class ListArray(_ArrayType):
 class DataType(metaclass=_Type):
     _array_type_ = ListArray
 
-    def __init__(self, value=None, parent=None):
+    # Optional classmethods ``_unpack_chunk(buf)`` and ``_pack_chunk(values)``
+    # converting a run of consecutive values in one go. Used to stream arrays
+    # in chunks without per-element objects.
+    _unpack_chunk = None
+    _pack_chunk = None
+
+    # Optional classmethod ``_unpack_many(buf, count)`` unpacking up to
+    # ``count`` (or all) consecutive values of a variable size type, returning
+    # the values and the number of bytes consumed. Used to unpack arrays
+    # without per-element objects.
+    _unpack_many = None
+
+    # Optional classmethod ``_check_many(values)`` validating a run of values
+    # in one go and returning them as a list, raising the same ``TypeError``
+    # as assigning the first invalid value would. Used when assigning arrays.
+    _check_many = None
+
+    # Optional ``(kind, argument)`` declaring that fields of this type depend
+    # on another field of their structure, named by the constructor argument
+    # ``argument`` (e.g. ``('length-of', 'field')``). Structures resolve and
+    # check these once, when the class is created.
+    _depends_on_ = None
+
+    # Whether ``unpack`` accepts a ``memoryview``. Structures (and arrays)
+    # pass views of their buffer to fields that do, and slices of the buffer
+    # they were given (e.g. ``bytes``) to fields that don't.
+    _unpack_view_ = False
+
+    # Whether values are validated (e.g. integer bounds, enum members,
+    # computed fields). Structural checks (lengths, ``Const`` bytes) are
+    # always made. Fields of a structure that does not validate don't either.
+    _validate_ = True
+
+    def __init__(self, value=None, parent=None, validate=None):
         super(DataType, self).__init__()
         self._parent = parent
+        self._init_validate(validate, parent)
         self.value = value
 
+    def _init_validate(self, validate, parent):
+        if validate is None:
+            validate = self._validate_ and (parent is None or parent._validate_)
+
+        if not validate:
+            self.__dict__['_validate_'] = False
+
     @property
     def value(self):
         return self._value
@@ -140,6 +251,11 @@ class DataType(metaclass=_Type):
         raise NotImplementedError
 
     def unpack_stream(self, stream):
+        """
+        Generator that unpacks ``self.value`` from a :class:`StreamUnpacker`.
+        Whenever too few bytes are buffered, it yields the number of bytes it
+        needs; it returns once the value is complete.
+        """
         raise NotImplementedError
 
     def pack(self):
@@ -158,6 +274,47 @@ class DataType(metaclass=_Type):
         if consumed_bytes != len(buf):
             raise ValueError('Must consume exactly %d bytes; consumed %d.' % (len(buf), consumed_bytes))
 
+    def pack_iter(self, chunk_size=None):
+        """
+        Pack incrementally, without building the whole serialised value. With
+        no ``chunk_size``, yield the pieces as they are encoded (e.g. as a
+        scatter list for ``socket.sendmsg``); otherwise yield chunks of
+        exactly ``chunk_size`` bytes, except for a shorter final chunk.
+        """
+        if chunk_size is None:
+            yield from self._pack_iter()
+            return
+
+        buf = bytearray()
+        for piece in self._pack_iter():
+            buf += piece
+
+            while len(buf) >= chunk_size:
+                yield bytes(buf[:chunk_size])
+                del buf[:chunk_size]
+
+        if buf:
+            yield bytes(buf)
+
+    def pack_to(self, fileobj, chunk_size=65536):
+        """
+        Write the packed value to ``fileobj`` in chunks of at most
+        ``chunk_size`` bytes and return the number of bytes written.
+        """
+        written = 0
+        for chunk in self.pack_iter(chunk_size):
+            fileobj.write(chunk)
+            written += len(chunk)
+
+        return written
+
+    def _pack_iter(self):
+        """
+        Yield the packed value in pieces; concatenated, they equal
+        :meth:`pack`.
+        """
+        yield self.pack()
+
     def __bytes__(self):
         return self.pack()
 
@@ -168,6 +325,73 @@ class DataType(metaclass=_Type):
         """
         raise NotImplementedError
 
+    def static_size(self):
+        """
+        The number of bytes every value of this type packs to, or ``None`` if
+        that depends on the value.
+        """
+        return None
+
+    def alignment(self):
+        """
+        The natural alignment of the type, used to pad fields of structures
+        that set ``_pack_``.
+        """
+        return 1
+
+    def frame_size(self, buf):
+        """
+        The number of bytes the value at the start of ``buf`` occupies,
+        decoding only as much as is needed to find out (e.g. length fields).
+        ``ValueError`` is raised if ``buf`` is too short.
+        """
+        size = self.static_size()
+
+        if size is None:
+            return self.unpack(buf)
+
+        elif len(buf) < size:
+            raise IncompleteError('Not enough bytes to unpack.')
+
+        else:
+            return size
+
+    def packed_size(self):
+        """
+        The number of bytes the current value packs to.
+        """
+        return len(self.pack())
+
+
+def _find_bytes(buf, sub, start=0, end=None):
+    """
+    The index of ``sub`` in ``buf[start:end]``, or -1. Memoryviews are
+    searched in growing chunks, so that only about as many bytes are copied
+    as are scanned.
+    """
+    if isinstance(buf, (bytes, bytearray)):
+        return buf.find(sub, start, len(buf) if end is None else end)
+
+    buf = memoryview(buf).cast('B')
+    end = len(buf) if end is None else min(end, len(buf))
+    chunk = 64
+
+    while start < end:
+        # Overlap the chunks so that matches spanning two are found.
+        chunk_end = min(end, start + chunk + len(sub) - 1)
+        index = bytes(buf[start:chunk_end]).find(sub)
+
+        if index >= 0:
+            return start + index
+
+        elif chunk_end == end:
+            break
+
+        start += chunk
+        chunk *= 2
+
+    return -1
+
 
 def array_type(cls):
     def _wrapper(*args, **kwargs):
@@ -184,6 +408,8 @@ class _ArrayLengthWrapper:
 
 
 class _Array(DataType):
+    _unpack_view_ = True
+
     def __init__(self, array_type, *args, **kwargs):
         self.array_type = array_type
         super(_Array, self).__init__(*args, **kwargs)
@@ -192,18 +418,21 @@ class _Array(DataType):
     def value(self):
         return self._value.value
 
-    def unpack_more(self, values):
+    def remaining(self, values):
+        """
+        The number of elements still to be unpacked after ``values``, or
+        ``None`` if the array consumes everything it is given.
+        """
         raise NotImplementedError
 
+    def unpack_more(self, values):
+        remaining = self.remaining(values)
+        return remaining is None or remaining > 0
+
     def _unpack(self, buf):
-        array = self.array_type()
+        array = self.array_type(validate=self._validate_)
 
-        offset = 0
-        total_consumed_bytes = 0
-        while self.unpack_more(array) and offset < len(buf):
-            consumed_bytes = array.unpack(buf[offset:])
-            offset += consumed_bytes
-            total_consumed_bytes += consumed_bytes
+        total_consumed_bytes = array.unpack_many(buf, self.remaining(array))
 
         self._check_length(array)
         self._value = array
@@ -211,33 +440,89 @@ class _Array(DataType):
         return total_consumed_bytes
 
     def unpack_stream(self, stream):
-        array = stream.pop_state(self) or self.array_type()
+        sink = stream.sink(self)
+        if sink is not None:
+            yield from self._unpack_stream_sink(stream, sink)
+            return
 
-        unpack_more = True
-        result = True
-        while unpack_more and result:
-            result = array.unpack_stream(stream)
+        array = self.array_type(validate=self._validate_)
 
-            if result:
-                unpack_more = self.unpack_more(array)
-            else:
-                unpack_more = True
+        while self.unpack_more(array):
+            yield from array.unpack_stream_many(stream, self.remaining(array))
+
+        self._check_length(array)
+        self._value = array
+
+    def frame_size(self, buf):
+        array = self.array_type(validate=self._validate_)
+        remaining = self.remaining(array)
+        elem_size = array.elem_type().static_size()
+
+        if remaining is None or elem_size is None:
+            return self.unpack(buf)
+
+        elif len(buf) < remaining * elem_size:
+            raise IncompleteError('Expected %d elements, but got %d.' % (remaining, len(buf) // elem_size))
 
-        if unpack_more:
-            stream.push_state(self, array)
-            return False
         else:
-            self._check_length(array)
-            self._value = array
+            return remaining * elem_size
 
-            return True
+    def _unpack_stream_sink(self, stream, sink):
+        """
+        Hand elements to ``sink`` in chunks as they arrive rather than
+        collecting them. The array itself is left empty.
+        """
+        array = self.array_type(validate=self._validate_)
+        elem_type = array.elem_type
+        remaining = self.remaining(array)
+
+        if elem_type._unpack_chunk is not None:
+            elem_size = elem_type().size()
+
+            while remaining is None or remaining > 0:
+                yield from stream.wait(elem_size)
+
+                count = len(stream) // elem_size
+                if remaining is not None:
+                    count = min(count, remaining)
+                    remaining -= count
+
+                sink(elem_type._unpack_chunk(stream.read(count * elem_size)))
+
+        else:
+            chunk = []
+            while remaining is None or remaining > 0:
+                if chunk and not len(stream):
+                    sink(chunk)
+                    chunk = []
+
+                elem = elem_type()
+                yield from elem.unpack_stream(stream)
+                chunk.append(elem.value)
+
+                if remaining is not None:
+                    remaining -= 1
+
+            if chunk:
+                sink(chunk)
+
+        self._value = array
 
     def _check_length(self, value):
         raise NotImplementedError
 
+    def alignment(self):
+        return self._value.elem_type().alignment()
+
     def pack(self):
         return bytes(self._value)
 
+    def _pack_iter(self):
+        yield from self._value._pack_iter()
+
+    def packed_size(self):
+        return self._value.packed_size()
+
     def size(self):
         raise NotImplementedError
 
@@ -248,20 +533,30 @@ class LengthFixed(_Array):
         self._length = length
         _Array.__init__(self, *args, **kwargs)  # TODO
 
-    def unpack_more(self, values):
+    def remaining(self, values):
         # 0 => variable length member: consume all the bytes.
-        return (len(values) < self._length) or (self._length == 0)
+        if self._length == 0:
+            return None
+        else:
+            return self._length - len(values)
 
     def size(self):
         return 0 if self._length == 0 else self._value.size()
 
+    def static_size(self):
+        if self._length == 0:
+            return None
+
+        elem_size = self._value.elem_type().static_size()
+        return None if elem_size is None else elem_size * self._length
+
     def _check_length(self, value, exc=ValueError):
         if self._length not in (0, len(value)):
             raise exc('Expected %d elements, but got %d.' % (self._length, len(value)))
 
     @_Array.value.setter
     def value(self, new_value):
-        value = self.array_type(value=new_value, length=self._length)
+        value = self.array_type(value=new_value, length=self._length, validate=self._validate_)
         self._check_length(value, exc=TypeError)
 
         self._value = value
@@ -0,0 +1,79 @@
+from collections import OrderedDict
+
+from ._ints import _Int, _IntType
+
+__all__ = ['Bits']
+
+
+def Bits(int_type, fields):
+    """
+    An unsigned integer type (e.g. ``uint16_t``) split into bit fields,
+    allocated from the least significant bit up. Fields named ``None`` are
+    reserved bits::
+
+        class Header(Structure):
+            _fields_ = [
+                ('hdr', Bits(uint16_t.be, [('ver', 3), ('flags', 5), ('seq', 8)])),
+            ]
+
+        h = Header()
+        h.seq = 7
+        h.hdr  # 0x700
+
+    The value of the field is the whole word; the bit fields are accessed as
+    fields of the structure. Since it is an integer type, the word is
+    unpacked and packed as one integer (including by the compiled codec of a
+    structure).
+    """
+    if not issubclass(int_type, _Int) or int_type._bounds_[0] != 0:
+        raise ValueError('Bits requires an unsigned integer type.')
+
+    bit_fields = OrderedDict()
+    shift = 0
+
+    for name, width in fields:
+        if width <= 0:
+            raise ValueError('Invalid width %d for bit field %s.' % (width, name))
+
+        if name is not None:
+            bit_fields[name] = (shift, (1 << width) - 1)
+
+        shift += width
+
+    if shift > int_type().size() * 8:
+        raise ValueError('%d bits do not fit in %s.' % (shift, int_type.__name__))
+
+    # The ``.le`` and ``.be`` variants have the same bit fields.
+    variants = {}
+    for endian in ('le', 'be'):
+        base = getattr(int_type, endian)
+        variants[endian] = _IntType('Bits(%s)' % base.__name__, (_Bits, base), {'_bit_fields_': bit_fields})
+
+    for bits_type in variants.values():
+        bits_type.le, bits_type.be, bits_type.network = variants['le'], variants['be'], variants['be']
+
+    return variants['le' if int_type._endian_ == '<' else 'be']
+
+
+class _Bits(_Int):
+    _bit_fields_ = OrderedDict()
+
+    @classmethod
+    def get_bits(cls, word, name):
+        """
+        The value of bit field ``name`` in ``word``.
+        """
+        shift, mask = cls._bit_fields_[name]
+        return (word >> shift) & mask
+
+    @classmethod
+    def set_bits(cls, word, name, value):
+        """
+        ``word`` with bit field ``name`` set to ``value``.
+        """
+        shift, mask = cls._bit_fields_[name]
+
+        if not 0 <= value <= mask:
+            raise TypeError('%s must be 0 <= x <= %d.' % (name, mask))
+
+        return (word & ~(mask << shift)) | (value << shift)
@@ -0,0 +1,207 @@
+import array
+import struct
+from collections import OrderedDict, namedtuple
+
+from ._base import IncompleteError, _Array
+from ._arrays import _LengthFieldWrapper, _PackedLengthFieldWrapper
+from ._enum import Enum
+from ._ints import _Int, _OddInt
+from ._strings import String
+from ._struct import Structure, _as_record_value, _field_input
+
+__all__ = ['unpack_columns', 'EnumColumn']
+
+
+EnumColumn = namedtuple('EnumColumn', ['enum', 'codes'])
+EnumColumn.__doc__ = """
+A column of enum values: the raw ``codes`` and the ``enum`` they belong to.
+"""
+
+
+def unpack_columns(struct_type, buf, count=None):
+    """
+    Unpack up to ``count`` (by default all) consecutive ``struct_type`` values
+    from ``buf`` into one column per field, rather than one object per value::
+
+        columns = unpack_columns(mpc_pkt, buf)
+        columns['saddr']      # array('B', [...])
+        columns['cmd'].codes  # array('B', [...]); columns['cmd'].enum is MPC_CMD
+
+    Returns an ordered mapping of field names (with nested structures
+    flattened as ``'outer.inner'``) to columns:
+
+    * integer fields: an ``array.array``,
+    * enum fields: an :class:`EnumColumn` of the enum type and an
+      ``array.array`` of raw codes,
+    * byte string fields: a list of ``memoryview`` slices of ``buf``,
+    * anything else: a list of values, with structures and arrays as
+      tuples (see :meth:`Structure.as_record`).
+
+    Variable length values are supported. Structures made up only of integer
+    and enum fields are decoded with a single ``struct.iter_unpack``.
+    """
+    view = memoryview(buf).cast('B')
+    proto = struct_type()
+
+    columns = OrderedDict()
+    _add_columns(proto, '', columns)
+
+    fmt = _flat_format(proto)
+    if fmt is not None:
+        _unpack_flat(fmt, view, count, columns)
+
+    else:
+        offset = 0
+        unpacked_count = 0
+        while offset < len(view) and (count is None or unpacked_count < count):
+            unpacked = []
+            offset = _unpack_fields(proto, view, offset, unpacked, '')
+            _append_values(unpacked, view, columns)
+            unpacked_count += 1
+
+    return columns
+
+
+def _column_field(field):
+    # Length field wrappers are columns of the length field itself.
+    if isinstance(field, _LengthFieldWrapper):
+        return field.field
+    elif isinstance(field, _PackedLengthFieldWrapper):
+        return field.length_field
+    else:
+        return field
+
+
+def _int_column(int_type):
+    if issubclass(int_type, _OddInt):
+        return []
+
+    column = array.array(int_type._fmt_)
+
+    if column.itemsize != struct.calcsize(int_type._fmt()):
+        return []
+    else:
+        return column
+
+
+class _BytesColumn(list):
+    pass
+
+
+def _add_columns(struct_obj, prefix, columns):
+    for field_name, field in struct_obj._iter_fields():
+        key = prefix + field_name
+        field = _column_field(field)
+
+        if isinstance(field, Structure):
+            _add_columns(field, key + '.', columns)
+
+        elif isinstance(field, _Int):
+            columns[key] = _int_column(type(field))
+
+        elif isinstance(field, Enum) and issubclass(field._type_, _Int):
+            columns[key] = EnumColumn(field._enum_, _int_column(field._type_))
+
+        elif isinstance(field, _Array) and isinstance(field._value, String):
+            columns[key] = _BytesColumn()
+
+        else:
+            columns[key] = []
+
+
+def _unpack_fields(struct_obj, view, offset, unpacked, prefix):
+    start = offset
+
+    for field_name, field in struct_obj._iter_fields():
+        key = prefix + field_name
+        offset += struct_obj._padding(field, offset - start)
+
+        if isinstance(field, Structure):
+            offset = _unpack_fields(field, view, offset, unpacked, key + '.')
+        else:
+            consumed = field.unpack(_field_input(field, view, view, offset))
+            unpacked.append((key, field, offset, offset + consumed))
+            offset += consumed
+
+    offset += struct_obj._padding(struct_obj, offset - start)
+    if len(view) < offset:
+        raise IncompleteError('Not enough bytes to unpack.')
+
+    struct_obj._unpacked()
+
+    return offset
+
+
+def _append_values(unpacked, view, columns):
+    # Only read values once the whole struct has been unpacked and checked:
+    # reading a computed field's value recomputes it.
+    for key, field, start, end in unpacked:
+        column = columns[key]
+        value = _column_field(field).value
+
+        if isinstance(column, EnumColumn):
+            column.codes.append(value.value)
+        elif isinstance(column, _BytesColumn):
+            column.append(view[start:end])
+        else:
+            # Copy anything that may be reused by the next value.
+            column.append(_as_record_value(value, 'tuple'))
+
+
+def _flat_format(struct_obj):
+    """
+    A ``struct`` format for the whole structure if it only has integer and
+    enum fields of the same byte order, otherwise ``None``.
+    """
+    endian = None
+    fmt = []
+    offset = 0
+
+    for _, field in struct_obj._iter_fields():
+        if isinstance(field, _Int):
+            int_type = type(field)
+        elif isinstance(field, Enum) and issubclass(field._type_, _Int):
+            int_type = field._type_
+        else:
+            return None
+
+        if issubclass(int_type, _OddInt):
+            return None
+
+        if endian not in (None, int_type._endian_):
+            return None
+
+        endian = int_type._endian_
+        padding = struct_obj._padding(field, offset)
+        fmt.append('%dx%s' % (padding, int_type._fmt_))
+        offset += padding + field.size()
+
+    if not fmt:
+        return None
+
+    return endian + ''.join(fmt) + '%dx' % struct_obj._padding(struct_obj, offset)
+
+
+def _unpack_flat(fmt, view, count, columns):
+    record_size = struct.calcsize(fmt)
+    available = len(view) // record_size
+
+    if count is None:
+        if len(view) % record_size:
+            raise IncompleteError('Not enough bytes to unpack.')
+
+        count = available
+    else:
+        count = min(count, available)
+
+    values = zip(*struct.iter_unpack(fmt, view[:count * record_size]))
+
+    for column, column_values in zip(columns.values(), values):
+        if isinstance(column, EnumColumn):
+            invalid = set(column_values).difference(column.enum._value2member_map_)
+            if invalid:
+                raise ValueError('%r is not a valid %s.' % (min(invalid), column.enum.__name__))
+
+            column.codes.extend(column_values)
+        else:
+            column.extend(column_values)
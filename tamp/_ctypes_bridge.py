@@ -0,0 +1,104 @@
+import ctypes
+
+from ._base import _Array
+from ._enum import Enum
+from ._ints import _Int
+from ._strings import Byte
+from ._struct import Structure, Const, Computed
+
+
+_INT_CTYPES = {
+    'B': ctypes.c_uint8,
+    'b': ctypes.c_int8,
+    'H': ctypes.c_uint16,
+    'h': ctypes.c_int16,
+    'I': ctypes.c_uint32,
+    'i': ctypes.c_int32,
+    'Q': ctypes.c_uint64,
+    'q': ctypes.c_int64,
+}
+
+
+def struct_ctypes_type(struct_type):
+    """
+    The ``ctypes`` structure equivalent to ``struct_type``, created once per
+    class. See :meth:`Structure.as_ctypes`.
+    """
+    try:
+        return struct_type.__dict__['_ctypes_type_']
+    except KeyError:
+        pass
+
+    fields = []
+    endian = None
+
+    for field_name, field in struct_type()._iter_fields():
+        field_ctype, field_endian = _field_ctype(field)
+
+        if endian not in (None, field_endian) and field_endian is not None:
+            raise ValueError('%s mixes byte orders; ctypes structures cannot.' % struct_type.__name__)
+
+        endian = endian or field_endian
+        fields.append((field_name, field_ctype))
+
+    base = ctypes.BigEndianStructure if endian == '>' else ctypes.LittleEndianStructure
+    ctype = type(struct_type.__name__, (base,), {'_pack_': struct_type._pack_, '_fields_': fields})
+
+    if ctypes.sizeof(ctype) != struct_type._cls_static_size():
+        raise ValueError('%s cannot be represented as a ctypes structure.' % struct_type.__name__)
+
+    struct_type._ctypes_type_ = ctype
+
+    return ctype
+
+
+def struct_array_ctypes(array):
+    """
+    A copy of a :class:`StructArray` as a ``ctypes`` array of structures.
+    """
+    ctype = struct_ctypes_type(array.elem_type) * len(array)
+    return ctype.from_buffer_copy(bytes(array))
+
+
+def _field_ctype(field):
+    """
+    The ``ctypes`` type of a field and its byte order (``None`` if it does
+    not matter).
+    """
+    if isinstance(field, Computed.__wrapped__):
+        return _field_ctype(field.pack_field)
+
+    elif isinstance(field, Const.__wrapped__):
+        return ctypes.c_uint8 * field.size(), None
+
+    elif isinstance(field, Structure):
+        return struct_ctypes_type(type(field)), None
+
+    elif isinstance(field, (_Int, Enum)):
+        return _elem_ctype(type(field))
+
+    elif isinstance(field, _Array) and field.static_size() is not None:
+        elem_type = field._value.elem_type
+        length = len(field._value)
+
+        if issubclass(elem_type, Byte):
+            return ctypes.c_char * length, None
+
+        elem_ctype, endian = _elem_ctype(elem_type)
+        return elem_ctype * length, endian
+
+    raise ValueError('%s fields cannot be represented as ctypes.' % type(field).__name__)
+
+
+def _elem_ctype(elem_type):
+    if issubclass(elem_type, Enum):
+        elem_type = elem_type._type_
+
+    if issubclass(elem_type, Structure):
+        return struct_ctypes_type(elem_type), None
+
+    elif issubclass(elem_type, _Int) and elem_type._fmt_ in _INT_CTYPES:
+        int_ctype = _INT_CTYPES[elem_type._fmt_]
+        return int_ctype, None if ctypes.sizeof(int_ctype) == 1 else elem_type._endian_
+
+    raise ValueError('%s cannot be represented as ctypes.' % elem_type.__name__)
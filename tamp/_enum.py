@@ -60,6 +60,8 @@ class Enum(DataType, metaclass=_EnumMeta):
         ``PizzaToppings``. Unpacking or assigning an invalid value raises a
         ``TypeError``.
     """
+    _unpack_view_ = True
+
     _type_ = None
     _enum_ = None
 
@@ -68,6 +70,8 @@ class Enum(DataType, metaclass=_EnumMeta):
         try:
             if new_value is None:
                 new_value = list(self._enum_).pop(0)
+            elif not self._validate_:
+                new_value = self._enum_._value2member_map_.get(new_value, new_value)
             else:
                 new_value = self._enum_(new_value)
 
@@ -81,26 +85,36 @@ class Enum(DataType, metaclass=_EnumMeta):
     def _unpack(self, buf):
         unpack_type = self._type_()
         consumed = unpack_type.unpack(buf)
-        self._value = self._enum_(unpack_type.value)
+        self._value = self._member(unpack_type.value)
 
         return consumed
 
     def unpack_stream(self, stream):
-        elem = stream.pop_state(self) or self._type_()
+        elem = self._type_()
+        yield from elem.unpack_stream(stream)
+        self._value = self._member(elem.value)
 
-        if elem.unpack_stream(stream):
-            self._value = self._enum_(elem.value)
-            return True
+    def _member(self, value):
+        if self._validate_:
+            return self._enum_(value)
         else:
-            stream.push_state(self, elem)
-            return False
+            return self._enum_._value2member_map_.get(value, value)
 
     def pack(self):
-        return bytes(self._type_(self._value))
+        return bytes(self._type_(self._value, validate=self._validate_))
 
     def size(self):
         return self._type_().size()
 
+    def static_size(self):
+        return self._type_().static_size()
+
+    def packed_size(self):
+        return self._type_().packed_size()
+
+    def alignment(self):
+        return self._type_().alignment()
+
 
 def EnumWrap(enum_type, pack_type):
     return _EnumMeta.enum_type(enum_type, pack_type)
@@ -0,0 +1,173 @@
+import array
+import mmap
+import os
+import struct
+import sys
+
+from ._base import IncompleteError
+
+__all__ = ['RecordFile']
+
+
+# Sidecar index header: magic, and the size and modification time (in
+# nanoseconds) of the data file it describes.
+_INDEX_HEADER = struct.Struct('<8sQq')
+_INDEX_MAGIC = b'TAMPIDX2'
+
+
+class RecordFile:
+    """
+    Random access to a file of concatenated ``record_type`` values. The file
+    is memory mapped and records are only decoded when accessed::
+
+        with RecordFile('capture.bin', mpc_pkt, persist_index=True) as records:
+            last = records[-1]
+            first_late = records.bisect('timestamp', cutoff)
+
+    If every record has the same size, record offsets are computed directly.
+    Otherwise the file is walked once, decoding only length fields, to build
+    an index of record offsets. With ``persist_index``, that index is saved to
+    ``index_path`` (by default ``path + '.idx'``) and reused by later opens as
+    long as the size and modification time of the data file have not
+    changed. A partial record at
+    the end of the file (e.g. one still being written) is ignored.
+    """
+    def __init__(self, path, record_type, index_path=None, persist_index=False):
+        self.path = path
+        self.record_type = record_type
+        self.index_path = index_path or path + '.idx'
+
+        with open(path, 'rb') as fileobj:
+            stat = os.fstat(fileobj.fileno())
+            self._size = stat.st_size
+            self._mtime_ns = stat.st_mtime_ns
+
+            if self._size:
+                self._mmap = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mmap)
+            else:
+                self._mmap = None
+                self._view = memoryview(b'')
+
+        record_size = record_type().static_size()
+
+        if record_size:
+            self._offsets = range(0, self._size - self._size % record_size, record_size)
+
+        else:
+            self._offsets = self._load_index() if persist_index else None
+
+            if self._offsets is None:
+                self._offsets = self._build_index()
+
+                if persist_index:
+                    self._save_index()
+
+    def _build_index(self):
+        offsets = array.array('Q')
+        record = self.record_type()
+
+        offset = 0
+        while offset < self._size:
+            try:
+                size = record.frame_size(self._view[offset:])
+            except IncompleteError:
+                break  # a partial record, as in the fixed size case
+
+            offsets.append(offset)
+            offset += size
+
+        return offsets
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'rb') as fileobj:
+                magic, size, mtime_ns = _INDEX_HEADER.unpack(fileobj.read(_INDEX_HEADER.size))
+                if magic != _INDEX_MAGIC or size != self._size or mtime_ns != self._mtime_ns:
+                    return None
+
+                offsets = array.array('Q')
+                offsets.frombytes(fileobj.read())
+
+        except (OSError, struct.error, ValueError):
+            return None
+
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+
+        return offsets
+
+    def _save_index(self):
+        offsets = array.array('Q', self._offsets)
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+
+        with open(self.index_path, 'wb') as fileobj:
+            fileobj.write(_INDEX_HEADER.pack(_INDEX_MAGIC, self._size, self._mtime_ns))
+            offsets.tofile(fileobj)
+
+    def offset(self, index):
+        """
+        The offset in the file at which record ``index`` starts.
+        """
+        return self._offsets[index]
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(offset) for offset in self._offsets[index]]
+        else:
+            return self._decode(self._offsets[index])
+
+    def __iter__(self):
+        for offset in self._offsets:
+            yield self._decode(offset)
+
+    def _decode(self, offset):
+        record = self.record_type()
+        record.unpack(self._view[offset:])
+
+        return record.value
+
+    def bisect(self, key, value):
+        """
+        The index of the first record whose ``key`` is not less than
+        ``value``, assuming records are sorted by ``key``. ``key`` is a field
+        name or a callable taking a record. Only O(log n) records are decoded.
+        """
+        if not callable(key):
+            field_name = key
+            key = lambda record: getattr(record, field_name)
+
+        low, high = 0, len(self)
+        while low < high:
+            mid = (low + high) // 2
+
+            if key(self[mid]) < value:
+                low = mid + 1
+            else:
+                high = mid
+
+        return low
+
+    def close(self):
+        """
+        Unmap the file. Records with ``ByteView`` fields are views of the
+        mapping; while any of them are alive, it is left to be unmapped once
+        they have been garbage collected.
+        """
+        self._view.release()
+
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
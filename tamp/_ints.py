@@ -1,7 +1,8 @@
+import array
 import struct
 import sys
 
-from ._base import _Type, DataType
+from ._base import _Type, DataType, IncompleteError
 
 class _IntType(_Type):
     def __new__(mcs, name, bases, attrs):
@@ -16,6 +17,10 @@ class _IntType(_Type):
             new_type = super(_IntType, mcs).__new__(mcs, name + '.le', bases, attrs)
             new_type.le = new_type
 
+            # Either variant leads to both.
+            be_type = new_type.be
+            be_type.le, be_type.be, be_type.network = new_type, be_type, be_type
+
             return new_type
 
         else:
@@ -23,6 +28,7 @@ class _IntType(_Type):
 
 
 class _Int(DataType, metaclass=_IntType):
+    _unpack_view_ = True
     _fmt_ = None
 
     # Default little endian
@@ -34,11 +40,12 @@ class _Int(DataType, metaclass=_IntType):
         if new_value is None:
             new_value = 0
 
-        min_val, max_val = self._bounds_
-        if not min_val <= new_value <= max_val:
-            raise TypeError('%s must be %d <= x <= %d.' % (self.__class__.__name__, min_val, max_val))
-        else:
-            self._value = new_value
+        elif self._validate_:
+            min_val, max_val = self._bounds_
+            if not min_val <= new_value <= max_val:
+                raise TypeError('%s must be %d <= x <= %d.' % (self.__class__.__name__, min_val, max_val))
+
+        self._value = new_value
 
     @classmethod
     def _fmt(cls):
@@ -46,19 +53,65 @@ class _Int(DataType, metaclass=_IntType):
 
     def _unpack(self, buf):
         if len(buf) < self.size():
-            raise ValueError('Not enough bytes to unpack.')
+            raise IncompleteError('Not enough bytes to unpack.')
 
         self._value = struct.unpack_from(self._fmt(), buf, 0)[0]
 
         return self.size()
 
     def unpack_stream(self, stream):
-        if len(stream) < self.size():
-            return False
+        size = self.size()
+        yield from stream.wait(size)
+        self._unpack(stream.read(size))
 
-        else:
-            self._unpack(stream.read(self.size()))
-            return True
+    @classmethod
+    def _unpack_chunk(cls, buf):
+        """
+        Unpack the run of values filling ``buf`` into an ``array.array`` (or a
+        list where no array typecode has the right width).
+        """
+        chunk = array.array(cls._fmt_)
+
+        if chunk.itemsize != struct.calcsize(cls._fmt()):
+            return [value for value, in struct.iter_unpack(cls._fmt(), buf)]
+
+        chunk.frombytes(buf)
+        if (cls._endian_ == '<') != (sys.byteorder == 'little'):
+            chunk.byteswap()
+
+        return chunk
+
+    @classmethod
+    def _check_many(cls, values):
+        values = list(values)
+        min_val, max_val = cls._bounds_
+
+        try:
+            if not values or (min_val <= min(values) and max(values) <= max_val):
+                return values
+        except TypeError:
+            pass
+
+        # Find the offending value (or convert ``None``) one at a time.
+        return [cls(value=value).value for value in values]
+
+    @classmethod
+    def _unpack_many(cls, buf, count=None):
+        size = struct.calcsize(cls._fmt())
+        available = len(buf) // size
+
+        # A partial value is an error, as when unpacking one value at a time.
+        if (count is None or count > available) and len(buf) % size:
+            raise IncompleteError('Not enough bytes to unpack.')
+
+        if count is not None:
+            available = min(count, available)
+
+        return list(cls._unpack_chunk(buf[:available * size])), available * size
+
+    @classmethod
+    def _pack_chunk(cls, values):
+        return struct.pack('%s%d%s' % (cls._endian_, len(values), cls._fmt_), *values)
 
     def pack(self):
         return struct.pack(self._fmt(), self._value)
@@ -66,6 +119,15 @@ class _Int(DataType, metaclass=_IntType):
     def size(self):
         return struct.calcsize(self._fmt())
 
+    def static_size(self):
+        return self.size()
+
+    def packed_size(self):
+        return self.size()
+
+    def alignment(self):
+        return self.size()
+
 
 _int_types = [
     ('uint8_t', 'B', (0, 255)),
@@ -84,3 +146,135 @@ for _name, _fmt, _bounds in _int_types:
     _new_type = _IntType(_name, (_Int,), {'_bounds_': _bounds, '_fmt_': _fmt})
     sys.modules[__name__].__dict__[_name] = _new_type
     __all__.append(_name)
+
+
+class _OddInt(_Int):
+    """
+    An integer of a width ``struct`` has no format for (e.g. 24 bits). It is
+    a raw bytes segment (``'3s'``) to ``struct`` and converted with
+    ``int.from_bytes``.
+    """
+    _signed_ = False
+
+    @classmethod
+    def _byteorder(cls):
+        return 'little' if cls._endian_ == '<' else 'big'
+
+    @classmethod
+    def _from_bytes(cls, raw):
+        return int.from_bytes(raw, cls._byteorder(), signed=cls._signed_)
+
+    @classmethod
+    def _to_bytes(cls, value):
+        return value.to_bytes(struct.calcsize(cls._fmt_), cls._byteorder(), signed=cls._signed_)
+
+    def _unpack(self, buf):
+        size = self.size()
+        if len(buf) < size:
+            raise IncompleteError('Not enough bytes to unpack.')
+
+        self._value = self._from_bytes(buf[:size])
+
+        return size
+
+    @classmethod
+    def _unpack_chunk(cls, buf):
+        """
+        Widen each value to the next array typecode by copying its bytes with
+        one strided slice assignment per byte, rather than converting the
+        values one by one. Signed values are extended by filling the extra
+        bytes with their sign, found from the most significant bytes in one
+        ``bytes.translate``.
+        """
+        size = struct.calcsize(cls._fmt_)
+        count = len(buf) // size
+        src = bytes(buf[:count * size])
+
+        typecode = _widened_typecode(size, cls._signed_)
+        if typecode is None:
+            return [cls._from_bytes(src[offset:offset + size]) for offset in range(0, len(src), size)]
+
+        width = array.array(typecode).itemsize
+
+        out = bytearray(count * width)
+        for byte in range(size):
+            src_byte = byte if cls._endian_ == '<' else size - 1 - byte
+            out[byte::width] = src[src_byte::size]
+
+        if cls._signed_:
+            msb = size - 1 if cls._endian_ == '<' else 0
+            sign = src[msb::size].translate(_SIGN_BYTES)
+
+            for byte in range(size, width):
+                out[byte::width] = sign
+
+        chunk = array.array(typecode)
+        chunk.frombytes(out)
+        if sys.byteorder != 'little':
+            chunk.byteswap()
+
+        return chunk
+
+    @classmethod
+    def _pack_chunk(cls, values):
+        return b''.join(cls._to_bytes(value) for value in values)
+
+    def pack(self):
+        return self._to_bytes(self._value)
+
+    def alignment(self):
+        return 1
+
+
+# Maps the most significant byte of a signed value to its sign extension.
+_SIGN_BYTES = bytes(0xff if byte & 0x80 else 0 for byte in range(256))
+
+
+def _widened_typecode(size, signed):
+    for typecode in ('bhilq' if signed else 'BHILQ'):
+        if array.array(typecode).itemsize > size:
+            return typecode
+
+    return None
+
+
+_odd_int_types = {}
+
+
+def uint_t(bits):
+    """
+    The unsigned integer type of ``bits`` bits (a multiple of 8), e.g.
+    ``uint_t(24)``, with ``.le`` and ``.be`` variants like the other integer
+    types. For 8, 16, 32 and 64 bits this is ``uint8_t`` etc.
+    """
+    return _odd_int_type(bits, False)
+
+
+def int_t(bits):
+    """
+    The signed integer type of ``bits`` bits; see :func:`uint_t`.
+    """
+    return _odd_int_type(bits, True)
+
+
+def _odd_int_type(bits, signed):
+    if bits <= 0 or bits % 8:
+        raise ValueError('Integer types must be a positive multiple of 8 bits, not %d.' % bits)
+
+    name = '%sint%d_t' % ('' if signed else 'u', bits)
+    if name in __all__:
+        return sys.modules[__name__].__dict__[name]
+
+    if (bits, signed) not in _odd_int_types:
+        if signed:
+            bounds = (-(1 << (bits - 1)), (1 << (bits - 1)) - 1)
+        else:
+            bounds = (0, (1 << bits) - 1)
+
+        attrs = {'_bounds_': bounds, '_fmt_': '%ds' % (bits // 8), '_signed_': signed}
+        _odd_int_types[(bits, signed)] = _IntType(name, (_OddInt,), attrs)
+
+    return _odd_int_types[(bits, signed)]
+
+
+__all__.extend(['uint_t', 'int_t'])
@@ -0,0 +1,260 @@
+import array
+import collections
+import gc
+import mmap
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, wait
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python < 3.8: in-memory buffers are shared through a temporary file.
+    shared_memory = None
+
+from ._columns import unpack_columns
+
+__all__ = ['parallel_unpack', 'StructBatch']
+
+
+class StructBatch(object):
+    """
+    A batch of ``struct_type`` structures packed back to back into one
+    buffer, with the offset of each (an ``array.array``). It pickles as the
+    buffer and the offsets rather than a structure at a time, so sending it
+    to another process is a single copy::
+
+        batch = StructBatch.pack(responses)
+        executor.submit(handle_batch, batch)
+
+        def handle_batch(batch):
+            for response in batch:
+                ...
+
+    Structures are unpacked when they are accessed. ``struct_type`` must be
+    importable by the receiving process (i.e. defined at module level).
+    """
+    def __init__(self, struct_type, buf, offsets):
+        self.struct_type = struct_type
+        self._buf = buf
+        self._offsets = offsets
+
+    @classmethod
+    def pack(cls, structs, struct_type=None):
+        """
+        Pack ``structs``, all instances of ``struct_type`` (by default, the
+        type of the first one), into a batch.
+        """
+        buf = bytearray()
+        offsets = array.array('Q', [0])
+
+        for obj in structs:
+            if struct_type is None:
+                struct_type = type(obj)
+
+            elif not isinstance(obj, struct_type):
+                raise TypeError('%r is not an instance of %s.' % (obj, struct_type.__name__))
+
+            for piece in obj._pack_iter():
+                buf += piece
+
+            offsets.append(len(buf))
+
+        if struct_type is None:
+            raise ValueError('struct_type is required for an empty batch.')
+
+        return cls(struct_type, buf, offsets)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError('Batch index out of range.')
+
+        obj = self.struct_type()
+        obj.from_bytes(memoryview(self._buf)[self._offsets[index]:self._offsets[index + 1]])
+
+        return obj
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __bytes__(self):
+        return bytes(self._buf)
+
+    def __reduce__(self):
+        return StructBatch, (self.struct_type, self._buf, self._offsets)
+
+
+def parallel_unpack(record_type, source, workers=None, batch_size=10000, executor=None, decode_as='tuple'):
+    """
+    Decode the concatenated ``record_type`` values in ``source`` (a path or a
+    bytes-like object) in a pool of worker processes, yielding batches of
+    records in order. Records are converted as by :meth:`Structure.as_record`
+    (by default to tuples; with ``decode_as=None``, structures are pickled
+    back as their packed values) to be sent back from the workers, or, with
+    ``decode_as='columns'``, each batch is a mapping of columns as returned
+    by :func:`unpack_columns` (with byte strings copied out of the input)::
+
+        for batch in parallel_unpack(mpc_pkt, 'capture.bin', workers=8):
+            for length, cmd, saddr, chksum, data in batch:
+                ...
+
+    Record boundaries are found up front: from the static size for fixed size
+    records, otherwise by a framing pass that only decodes length fields.
+    Workers then read their share of the input directly, from the file via
+    ``mmap`` or from a single shared memory copy of an in-memory buffer (a
+    temporary file before Python 3.8), so only offsets are sent to them.
+
+    ``record_type`` must be importable by the workers (i.e. defined at module
+    level). A running ``executor`` may be given instead of ``workers``.
+    """
+    shm = None
+    temp_path = None
+    own_executor = executor is None
+    pending = collections.deque()
+
+    try:
+        is_path = isinstance(source, str) or hasattr(source, '__fspath__')
+
+        if not is_path and shared_memory is None:
+            with tempfile.NamedTemporaryFile(delete=False) as fileobj:
+                fileobj.write(source)
+
+            source = temp_path = fileobj.name
+            is_path = True
+
+        if is_path:
+            source_path = source if isinstance(source, str) else source.__fspath__()
+            location = ('file', source_path)
+
+            with open(source_path, 'rb') as fileobj:
+                if os.fstat(fileobj.fileno()).st_size:
+                    with mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                        with memoryview(buf) as view:
+                            bounds = _batch_bounds(record_type, view, batch_size)
+                else:
+                    bounds = []
+
+        else:
+            data = memoryview(source).cast('B')
+            shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+            shm.buf[:len(data)] = data
+            location = ('shm', shm.name)
+
+            with shm.buf[:len(data)] as view:
+                bounds = _batch_bounds(record_type, view, batch_size)
+
+        if own_executor:
+            executor = ProcessPoolExecutor(workers)
+
+        # Keep a bounded number of batches in flight so results are not all
+        # held in memory at once.
+        max_pending = 2 * (workers or multiprocessing.cpu_count())
+
+        for start, end in bounds:
+            pending.append(executor.submit(_unpack_batch, record_type, location, start, end, decode_as))
+
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+    finally:
+        # If the generator is closed early, the workers may still be reading
+        # the input: it can only be removed once they are done.
+        for future in pending:
+            future.cancel()
+        wait(pending)
+
+        if own_executor and executor is not None:
+            executor.shutdown()
+
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+        if temp_path is not None:
+            os.remove(temp_path)
+
+
+def _batch_bounds(record_type, view, batch_size):
+    """
+    Split ``view`` into ``(start, end)`` ranges of ``batch_size`` records.
+    """
+    record = record_type()
+    record_size = record.static_size()
+
+    if record_size:
+        end = len(view) - len(view) % record_size
+        step = record_size * batch_size
+
+        return [(start, min(start + step, end)) for start in range(0, end, step)]
+
+    bounds = []
+    start = offset = count = 0
+    while offset < len(view):
+        offset += record.frame_size(view[offset:])
+        count += 1
+
+        if count == batch_size:
+            bounds.append((start, offset))
+            start = offset
+            count = 0
+
+    if start < offset:
+        bounds.append((start, offset))
+
+    return bounds
+
+
+def _unpack_batch(record_type, location, start, end, decode_as):
+    kind, name = location
+
+    if kind == 'file':
+        with open(name, 'rb') as fileobj:
+            buf = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(buf)
+
+    else:
+        buf = shared_memory.SharedMemory(name=name)
+        view = buf.buf
+
+    try:
+        with view[start:end] as batch:
+            if decode_as is None:
+                # The structures are sent back whole; unpack them from a copy
+                # rather than have their ByteView fields hold the buffer.
+                return list(record_type.iter_unpack(bytes(batch)))
+
+            elif decode_as != 'columns':
+                # Records hold copies of ByteView values.
+                return list(record_type.iter_unpack(batch, decode_as=decode_as))
+
+            columns = unpack_columns(record_type, batch)
+            for key, column in columns.items():
+                if column and isinstance(column[0], memoryview):
+                    columns[key] = [bytes(value) for value in column]
+
+            return columns
+
+    finally:
+        if kind == 'file':
+            view.release()
+
+        try:
+            buf.close()
+        except BufferError:
+            # The structure the records were decoded through references itself,
+            # so the views its ByteView fields hold are only released by the
+            # garbage collector.
+            gc.collect()
+            buf.close()
+
@@ -1,9 +1,62 @@
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from ._base import IncompleteError, _Array
+
+
+# Free space offered by StreamUnpacker.get_buffer() when no size is given.
+_DEFAULT_BUFFER_SIZE = 65536
+
+# How often (in seconds) a PipelinedUnpacker reader waiting for room in the
+# queue checks whether it has been closed.
+_PUT_INTERVAL = 0.1
+
+
 class StreamUnpacker:
-    def __init__(self, unpack_type):
+    """
+    Unpack a sequence of ``unpack_type`` values from data that arrives in
+    arbitrarily sized pieces.
+
+    Each type's ``unpack_stream`` is a generator that yields the number of
+    buffered bytes it needs before it can make progress. Decoding suspends at
+    the innermost field and resumes exactly where it left off once at least
+    that many bytes are available, so a record split over many reads is never
+    rescanned.
+
+    ``sinks`` optionally maps array fields, by dotted path from
+    ``unpack_type`` (e.g. ``'data'`` or ``'body.samples'``), to callables.
+    Elements of those arrays are passed to the callable in chunks as they
+    arrive instead of being collected, keeping memory flat for huge arrays.
+    Integer elements arrive as ``array.array`` chunks, others as lists. The
+    array field of the returned value is left empty.
+
+    Data can be passed to :meth:`unpack`, or received directly into the
+    internal buffer, avoiding a ``bytes`` object and a copy per read::
+
+        while True:
+            stream.commit(sock.recv_into(stream.get_buffer(4096)))
+
+            for pkt in stream.unpack():
+                ...
+
+    :meth:`get_buffer` and :meth:`commit` also match the
+    ``get_buffer``/``buffer_updated`` pair of ``asyncio.BufferedProtocol``.
+
+    With ``decode_as`` (see :meth:`Structure.as_record`), structures are
+    decoded through one reused instance and returned as immutable records.
+    """
+    def __init__(self, unpack_type, sinks=None, decode_as=None):
         self.unpack_type = unpack_type
-        self._buf = b''
+        self.sinks = sinks or {}
+        self.decode_as = decode_as
+        self._buf = bytearray()
+        self._start = 0
+        self._end = 0
         self._obj = None
-        self._stack = []
+        self._gen = None
+        self._need = 0
+        self._sink_fields = {}
 
     def unpack(self, buf=None):
         result = self.unpack_one(buf=buf)
@@ -14,38 +67,368 @@ class StreamUnpacker:
 
     def unpack_one(self, buf=None):
         if buf:
-            self._buf += buf
+            self._reserve(len(buf))
+            self._buf[self._end:self._end + len(buf)] = buf
+            self._end += len(buf)
+
+        if self._gen is None:
+            if self._obj is None:
+                self._obj = self.unpack_type()
+
+                if self.sinks:
+                    self._resolve_sinks(self._obj)
+
+            self._gen = self._obj.unpack_stream(self)
+            self._need = 0
+
+        # Nothing can change until the suspended field's request is satisfied.
+        if self._end - self._start < self._need:
+            return None
 
-        if self._obj is None:
-            self._obj = self.unpack_type()
+        try:
+            self._need = next(self._gen)
+        except StopIteration:
+            self._gen = None
+
+            if self.decode_as is not None:
+                return self._obj.value.as_record(self.decode_as)
 
-        result = self._obj.unpack_stream(self)
-        if result:
             obj = self._obj
             self._obj = None
 
             return obj.value
-
+        except BaseException:
+            # Start the next value afresh rather than resuming this one.
+            self._gen = None
+            self._obj = None
+            self._need = 0
+            raise
         else:
             return None
 
+    def _resolve_sinks(self, obj):
+        self._sink_fields = {}
+
+        for path, sink in self.sinks.items():
+            field = obj
+            for name in path.split('.'):
+                try:
+                    field = field._struct_fields[name]
+                except (AttributeError, KeyError):
+                    raise ValueError('%s is not a valid field path for %s.' %
+                                     (path, self.unpack_type.__name__)) from None
+
+            if not isinstance(field, _Array):
+                raise ValueError('%s is not an array field.' % path)
+
+            self._sink_fields[id(field)] = sink
+
+    def sink(self, field):
+        """
+        The sink registered for ``field`` of the value being unpacked, if any.
+        """
+        return self._sink_fields.get(id(field))
+
+    def get_buffer(self, min_size=-1):
+        """
+        A writable ``memoryview`` of at least ``min_size`` bytes (or some
+        reasonable amount if ``min_size`` is not positive) of free space at the
+        end of the internal buffer. Write received data into it, then call
+        :meth:`commit`. The view must not be used after that; when the
+        buffer has to grow, a new one replaces it rather than resizing it, so
+        views that are still held do not prevent that.
+        """
+        self._reserve(min_size if min_size > 0 else _DEFAULT_BUFFER_SIZE)
+
+        return memoryview(self._buf)[self._end:]
+
+    def commit(self, nbytes):
+        """
+        Mark ``nbytes`` written to the view from :meth:`get_buffer` as
+        received.
+        """
+        if not 0 <= nbytes <= len(self._buf) - self._end:
+            raise ValueError('Cannot commit %d bytes; only %d are free.' % (nbytes, len(self._buf) - self._end))
+
+        self._end += nbytes
+
+    def _reserve(self, size):
+        free = len(self._buf) - self._end
+        if free >= size:
+            return
+
+        unread = self._end - self._start
+
+        if len(self._buf) - unread >= size:
+            # Move unread data to the front (without resizing the buffer).
+            self._buf[:unread] = self._buf[self._start:self._end]
+
+        else:
+            # Grow into a new buffer: the old one may still be exported by a
+            # view from get_buffer(), so it cannot be resized in place.
+            new_buf = bytearray(max(unread + size, 2 * len(self._buf)))
+            new_buf[:unread] = memoryview(self._buf)[self._start:self._end]
+            self._buf = new_buf
+
+        self._start, self._end = 0, unread
+
     def __len__(self):
-        return len(self._buf)
+        return self._end - self._start
 
-    def read(self, size):
-        buf = self._buf[:size]
-        self._buf = self._buf[size:]
+    def wait(self, size):
+        """
+        Generator that suspends until at least ``size`` bytes are buffered::
+
+            yield from stream.wait(4)
+            buf = stream.read(4)
+        """
+        while self._end - self._start < size:
+            yield size
 
-        if len(buf) != size:
+    def find(self, sub, start=0, end=None):
+        """
+        The index of ``sub`` in the buffered bytes from ``start`` up to
+        ``end`` (relative to the next byte to read), or -1. Searches the
+        buffer in place.
+        """
+        end = self._end if end is None else min(self._end, self._start + end)
+        index = self._buf.find(sub, self._start + start, end)
+
+        return index if index < 0 else index - self._start
+
+    def read(self, size):
+        if size > self._end - self._start:
             raise IndexError
 
+        with memoryview(self._buf) as view:
+            buf = bytes(view[self._start:self._start + size])
+        self._start += size
+
+        if self._start == self._end:
+            self._start = self._end = 0
+
         return buf
 
-    def push_state(self, obj, state):
-        self._stack.append((obj, state))
 
-    def pop_state(self, obj, default=None):
-        if len(self._stack) > 0 and self._stack[-1][0] is obj:
-            return self._stack.pop()[1]
+class StreamPacker:
+    """
+    The counterpart of :class:`StreamUnpacker`: pack values into a reusable
+    buffer and write them out in batches, so a burst of small records costs
+    one ``write`` rather than one per record::
+
+        packer = StreamPacker(sock.sendall)
+
+        for pkt in pkts:
+            packer.pack(pkt)
+
+        packer.flush()
+
+    ``write`` is called with a ``memoryview`` of the buffer whenever at least
+    ``flush_size`` bytes are pending, and on :meth:`flush`. The view is only
+    valid for the duration of the call.
+    """
+    def __init__(self, write, flush_size=65536):
+        self.write = write
+        self.flush_size = flush_size
+        self._buf = bytearray()
+
+    def pack(self, obj):
+        for piece in obj._pack_iter():
+            self._buf += piece
+
+        if len(self._buf) >= self.flush_size:
+            self.flush()
+
+    def pack_many(self, objs):
+        for obj in objs:
+            self.pack(obj)
+
+    def flush(self):
+        if self._buf:
+            with memoryview(self._buf) as view:
+                self._write(view)
+
+            del self._buf[:]
+
+    def _write(self, view):
+        self.write(view)
+
+    def __len__(self):
+        return len(self._buf)
+
+
+class TransportPacker(StreamPacker):
+    """
+    A :class:`StreamPacker` for ``asyncio`` transports. Besides flushing at
+    ``flush_size``, everything packed during one event loop iteration is
+    flushed in a single ``transport.write`` at the end of that iteration.
+    """
+    def __init__(self, transport, flush_size=65536, loop=None):
+        super(TransportPacker, self).__init__(transport.write, flush_size)
+        self._loop = loop
+        self._flush_scheduled = False
+
+    def pack(self, obj):
+        super(TransportPacker, self).pack(obj)
+
+        if self._buf and not self._flush_scheduled:
+            import asyncio
+
+            loop = self._loop or asyncio.get_event_loop()
+            loop.call_soon(self._scheduled_flush)
+            self._flush_scheduled = True
+
+    def _scheduled_flush(self):
+        self._flush_scheduled = False
+        self.flush()
+
+    def _write(self, view):
+        # Transports may hold on to what they are given; hand over a copy so
+        # the buffer can be reused.
+        self.write(bytes(view))
+
+
+class PipelinedUnpacker:
+    """
+    Unpack ``unpack_type`` values from ``source`` (a socket or a raw file;
+    anything with ``recv_into`` or ``readinto``) with reading and decoding
+    overlapped::
+
+        with PipelinedUnpacker(mpc_pkt, sock, workers=4) as pipeline:
+            for pkt in pipeline:
+                ...
+
+    A reader thread receives into a reusable buffer and only frames records,
+    decoding no more than their length fields. Each complete frame is handed
+    to a worker in ``executor`` (by default a thread pool of ``workers``) for
+    a full decode, and values are yielded in arrival order. At most
+    ``max_pending`` frames are queued before the reader waits for the
+    consumer to catch up.
+
+    Decoding is pure Python, so the default threads only overlap it with
+    receiving and framing; they do not decode in parallel. To do so, give a
+    ``ProcessPoolExecutor`` and a ``decode_as`` (see
+    :meth:`Structure.as_record`): values are sent back from the workers
+    pickled, and structures pickle as their packed value, so they would be
+    unpacked again, whereas records are not. ``unpack_type`` must then be
+    importable by the workers (i.e. defined at module level).
+    """
+    def __init__(self, unpack_type, source, executor=None, workers=None, recv_size=65536, max_pending=64,
+                 decode_as=None):
+        self.unpack_type = unpack_type
+        self.decode_as = decode_as
+        self.recv_size = recv_size
+        self._readinto = getattr(source, 'recv_into', None) or source.readinto
+
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(workers)
+        self._frames = queue.Queue(max_pending)
+        self._closed = False
+
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        try:
+            self._frame_all()
+        except Exception as err:
+            self._put(err)
         else:
-            return default
+            self._put(None)
+
+    def _put(self, item):
+        """
+        Queue ``item`` for the consumer, waiting for room until the pipeline
+        is closed. Returns whether it was queued.
+        """
+        while not self._closed:
+            try:
+                self._frames.put(item, timeout=_PUT_INTERVAL)
+            except queue.Full:
+                continue
+
+            return True
+
+        return False
+
+    def _frame_all(self):
+        framer = self.unpack_type()
+        chunk = bytearray(self.recv_size)
+        pending = bytearray()
+
+        with memoryview(chunk) as chunk_view:
+            while not self._closed:
+                received = self._readinto(chunk_view)
+                if not received:
+                    break
+
+                pending += chunk_view[:received]
+
+                offset = 0
+                with memoryview(pending) as view:
+                    while offset < len(view) and not self._closed:
+                        try:
+                            size = framer.frame_size(view[offset:])
+                        except IncompleteError:
+                            break  # wait for more data
+
+                        frame = bytes(view[offset:offset + size])
+                        future = self._executor.submit(_decode_frame, self.unpack_type, frame, self.decode_as)
+                        offset += size
+
+                        if not self._put(future):
+                            future.cancel()
+
+                del pending[:offset]
+
+        if pending and not self._closed:
+            raise ValueError('Stream ended with %d bytes of an incomplete value.' % len(pending))
+
+    def __iter__(self):
+        while True:
+            item = self._frames.get()
+
+            if item is None:
+                return
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item.result()
+
+    def close(self):
+        """
+        Stop reading and drop the values not yet yielded. The reader thread
+        stops once it is done with the data it has received (or is waiting
+        for room in the queue); a read in progress is not interrupted.
+        """
+        self._closed = True
+
+        # Make room for the reader if it is waiting for it, and skip decoding
+        # frames that won't be used.
+        while True:
+            try:
+                item = self._frames.get_nowait()
+            except queue.Empty:
+                break
+
+            if isinstance(item, Future):
+                item.cancel()
+
+        if self._own_executor:
+            self._executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _decode_frame(unpack_type, frame, decode_as):
+    obj = unpack_type()
+    obj.from_bytes(frame)
+
+    if decode_as is not None:
+        return obj.value.as_record(decode_as)
+
+    return obj.value
@@ -1,11 +1,16 @@
 from ._arrays import _ArrayType
-from ._base import DataType
+from ._base import DataType, IncompleteError, _find_bytes
+from ._struct import wrap_type
 
 
-__all__ = ['Byte', 'String']
+__all__ = ['Byte', 'ByteView', 'CString', 'String', 'Text']
 
 
 class String(_ArrayType):
+    """
+    An array of :class:`Byte`, stored as ``bytes``. Runs of bytes are
+    unpacked and packed with a single slice.
+    """
     def __init__(self, string_type, *args, **kwargs):
         self.string_type = string_type
         super(String, self).__init__(*args, **kwargs)
@@ -14,6 +19,8 @@ class String(_ArrayType):
         if value is not None:
             if isinstance(value, self.string_type):
                 self._value = value
+            elif isinstance(value, (bytearray, memoryview)):
+                self._value = self.string_type(value)
             else:
                 self._value = self.string_type().join(self.elem_type(value=elem_value).value for elem_value in value)
 
@@ -31,29 +38,60 @@ class String(_ArrayType):
 
         return consumed
 
+    def unpack_many(self, buf, count=None):
+        size = len(buf) if count is None else min(count, len(buf))
+        self._value += bytes(buf[:size])
+
+        return size
+
     def unpack_stream(self, stream):
-        elem = stream.pop_state(self) or self.elem_type()
+        elem = self.elem_type()
+        yield from elem.unpack_stream(stream)
+        self._value += elem.value
 
-        result = elem.unpack_stream(stream)
-        if result:
-            self._value += elem.value
-        else:
-            stream.push_state(self, elem)
+    def unpack_stream_many(self, stream, count=None):
+        # Take as much as is available, rather than waiting for all of it.
+        yield from stream.wait(1)
 
-        return result
+        size = len(stream) if count is None else min(count, len(stream))
+        self._value += bytes(stream.read(size))
 
     def __bytes__(self):
-        return self.string_type().join(bytes(self.elem_type(value=value)) for value in self._value)
+        return bytes(self._value)
+
+    def packed_size(self):
+        return len(self._value)
 
     def size(self):
-        return len(bytes(self))
+        return len(self._value)
+
+
+class _ByteViewString(String):
+    """
+    A :class:`String` unpacked as a ``memoryview`` of the unpacked buffer.
+    """
+    def __init__(self, *args, **kwargs):
+        super(_ByteViewString, self).__init__(bytes, *args, **kwargs)
+
+    def unpack_many(self, buf, count=None):
+        if self._value:
+            return super(_ByteViewString, self).unpack_many(buf, count)
+
+        size = len(buf) if count is None else min(count, len(buf))
+        self._value = memoryview(buf).cast('B')[:size]
+
+        return size
 
 
 class Byte(DataType):
+    _unpack_view_ = True
     _array_type_ = lambda *args, **kwargs: String(bytes, *args, **kwargs)
 
     def _unpack(self, buf):
-        self._value = buf[0:1]
+        if len(buf) < 1:
+            raise IncompleteError('Not enough bytes to unpack.')
+
+        self._value = bytes(buf[0:1])
         return 1
 
     @DataType.value.setter
@@ -71,15 +109,210 @@ class Byte(DataType):
             raise TypeError('Value must be a 1-char byte string.')
 
     def unpack_stream(self, stream):
-        if len(stream) < self.size():
-            return False
-
-        else:
-            self._unpack(stream.read(self.size()))
-            return True
+        yield from stream.wait(1)
+        self._unpack(stream.read(1))
 
     def size(self):
         return 1
 
+    def static_size(self):
+        return 1
+
+    def packed_size(self):
+        return 1
+
     def pack(self):
         return self._value
+
+
+class ByteView(Byte):
+    """
+    Like :class:`Byte`, but arrays of ``ByteView`` unpacked from a buffer
+    (rather than a stream) are ``memoryview`` slices of it instead of
+    copies::
+
+        class Blob(Structure):
+            _fields_ = [
+                ('len', uint32_t),
+                ('data', ByteView[LengthField('len')]),
+            ]
+
+    The views keep the buffer alive (and, e.g., an ``mmap`` open), so copy
+    values that need to outlive it with ``bytes()``.
+    """
+    _array_type_ = lambda *args, **kwargs: _ByteViewString(*args, **kwargs)
+
+
+@wrap_type
+class CString(DataType):
+    """
+    CString(max_len=None)
+
+    A NUL terminated byte string. The value excludes the terminator. With
+    ``max_len``, the string and its terminator occupy at most ``max_len``
+    bytes; longer values raise ``TypeError`` and unpacking more bytes than
+    that without finding the terminator raises ``ValueError``.
+    """
+    _unpack_view_ = True
+
+    def __init__(self, max_len=None, **kwargs):
+        self.max_len = max_len
+        DataType.__init__(self, **kwargs)
+
+    @DataType.value.setter
+    def value(self, new_value):
+        if new_value is None:
+            new_value = b''
+
+        elif isinstance(new_value, (bytearray, memoryview)):
+            new_value = bytes(new_value)
+
+        if self._validate_:
+            if not isinstance(new_value, bytes):
+                raise TypeError('Value must be a byte string.')
+
+            elif b'\x00' in new_value:
+                raise TypeError('Value must not contain NUL bytes.')
+
+            elif self.max_len is not None and len(new_value) >= self.max_len:
+                raise TypeError('Value must be shorter than %d bytes.' % self.max_len)
+
+        self._value = new_value
+
+    def _limit(self, available):
+        return available if self.max_len is None else min(available, self.max_len)
+
+    def _unpack(self, buf):
+        limit = self._limit(len(buf))
+        index = _find_bytes(buf, b'\x00', 0, limit)
+
+        if index < 0:
+            if limit == self.max_len:
+                raise ValueError('No terminator within %d bytes.' % self.max_len)
+
+            raise IncompleteError('Not enough bytes to unpack.')
+
+        self._value = bytes(buf[:index])
+
+        return index + 1
+
+    def unpack_stream(self, stream):
+        # Bytes that were already scanned are not searched again when more
+        # arrive.
+        scanned = 0
+
+        while True:
+            limit = self._limit(len(stream))
+            index = stream.find(b'\x00', scanned, limit)
+
+            if index >= 0:
+                break
+
+            elif limit == self.max_len:
+                raise ValueError('No terminator within %d bytes.' % self.max_len)
+
+            scanned = limit
+            yield from stream.wait(scanned + 1)
+
+        self._value = stream.read(index + 1)[:-1]
+
+    def pack(self):
+        return self._value + b'\x00'
+
+    def size(self):
+        return 0  # always like a variable length member.
+
+    def packed_size(self):
+        return len(self._value) + 1
+
+
+@wrap_type
+class Text(DataType):
+    """
+    Text(encoding='utf-8', length=None)
+
+    A ``str`` stored as encoded bytes, which are decoded once when unpacked.
+    ``length`` is the number of bytes: a fixed number (shorter values are
+    padded with NUL bytes, which are stripped when unpacking), a
+    ``LengthField``, or ``None`` for a NUL terminated :class:`CString`::
+
+        class Person(Structure):
+            _fields_ = [
+                ('name_len', uint8_t),
+                ('name', Text('utf-8', LengthField('name_len'))),
+                ('city', Text('utf-8', 32)),
+                ('note', Text('utf-8')),
+            ]
+    """
+    _unpack_view_ = True
+
+    def __init__(self, encoding='utf-8', length=None, value=None, parent=None, validate=None):
+        self.encoding = encoding
+        self._init_validate(validate, parent)
+
+        if length is None:
+            self._raw = CString()(parent=parent, validate=self._validate_)
+        else:
+            self._raw = Byte[length](parent=parent, validate=self._validate_)
+
+        # Fixed length fields are NUL padded.
+        self._pad_to = self._raw.static_size()
+
+        DataType.__init__(self, value=value, parent=parent, validate=validate)
+
+    @DataType.value.setter
+    def value(self, new_value):
+        if new_value is None:
+            new_value = ''
+
+        elif not isinstance(new_value, str):
+            raise TypeError('Value must be a str.')
+
+        raw = new_value.encode(self.encoding)
+
+        if self._pad_to is not None:
+            if len(raw) > self._pad_to:
+                raise TypeError('Value must encode to at most %d bytes.' % self._pad_to)
+
+            raw += b'\x00' * (self._pad_to - len(raw))
+
+        self._raw.value = raw
+        self._value = new_value
+
+    def _decode(self):
+        raw = self._raw.value
+
+        if self._pad_to is not None:
+            index = raw.find(b'\x00')
+            if index >= 0:
+                raw = raw[:index]
+
+        self._value = bytes(raw).decode(self.encoding)
+
+    def _unpack(self, buf):
+        consumed = self._raw.unpack(buf)
+        self._decode()
+
+        return consumed
+
+    def unpack_stream(self, stream):
+        yield from self._raw.unpack_stream(stream)
+        self._decode()
+
+    def frame_size(self, buf):
+        return self._raw.frame_size(buf)
+
+    def pack(self):
+        return bytes(self._raw)
+
+    def _pack_iter(self):
+        return self._raw._pack_iter()
+
+    def size(self):
+        return self._raw.size()
+
+    def static_size(self):
+        return self._raw.static_size()
+
+    def packed_size(self):
+        return self._raw.packed_size()
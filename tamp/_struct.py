@@ -1,6 +1,8 @@
 import inspect
 import functools
-from collections import OrderedDict
+import struct
+import types
+from collections import OrderedDict, namedtuple
 
 try:
     import enum
@@ -8,9 +10,44 @@ except ImportError:
     import enum34 as enum
 
 
-from ._base import _Type, DataType
+from ._base import _Type, DataType, IncompleteError, _Array, _ArrayType, ListArray, _ArrayLengthWrapper
+from ._ints import _Int, _OddInt
+from ._bits import _Bits
 
-__all__ = ['Structure', 'Const', 'Computed']
+__all__ = ['Structure', 'StructArray', 'Const', 'Computed']
+
+
+def _field_dependencies(field_type):
+    """
+    The ``(kind, target)`` pairs of what ``field_type`` depends on,
+    including those of the types it is made of (e.g. the length of an
+    array wrapped in a ``PackedLength``): the fields it is the length of
+    (``'length-of'``) or the packed size of (``'size-of'``), or the method
+    it is computed by (``'computed-from'``).
+    """
+    if isinstance(field_type, functools.partial):
+        cls, args, kwargs = field_type.func, field_type.args, field_type.keywords
+
+    elif isinstance(field_type, _ArrayLengthWrapper):
+        cls, args, kwargs = field_type.cls, field_type.args, field_type.kwargs
+
+    elif inspect.isclass(field_type) and getattr(field_type, '_array_length_', None) is not None:
+        return _field_dependencies(field_type._array_length_)
+
+    else:
+        return []
+
+    dependencies = []
+
+    if getattr(cls, '_depends_on_', None) is not None:
+        kind, argument = cls._depends_on_
+        bound = inspect.signature(cls.__init__).bind_partial(None, *args, **kwargs)
+        dependencies.append((kind, bound.arguments[argument]))
+
+    for arg in list(args) + list(kwargs.values()):
+        dependencies.extend(_field_dependencies(arg))
+
+    return dependencies
 
 
 class _StructType(_Type):
@@ -32,7 +69,55 @@ class _StructType(_Type):
             # else:
             #     raise ValueError('Invalid type %r for field %s.' % (field_type, field_name))
 
-        return _Type.__new__(mcs, name, bases, attrs)
+        # Bit fields are accessed as fields of the structure.
+        attrs['_struct_subfields_'] = {}
+        field_names = set(field_name for field_name, _ in fields)
+
+        for field_name, field_type in fields:
+            if inspect.isclass(field_type) and issubclass(field_type, _Bits):
+                for bit_field in field_type._bit_fields_:
+                    if bit_field in attrs['_struct_subfields_'] or bit_field in field_names:
+                        raise ValueError('Duplicate field %s in %s.' % (bit_field, name))
+
+                    attrs['_struct_subfields_'][bit_field] = (field_name, field_type)
+
+        # Check that length fields come first when the structure is defined,
+        # rather than when it is first used. Computed fields' methods may be
+        # defined by subclasses, so they are only checked once the structure
+        # is instantiated (see Structure._cls_prototype).
+        callbacks = []
+        defined = set()
+        sized = {}
+
+        for field_name, field_type in fields:
+            for kind, target in _field_dependencies(field_type):
+                if kind in ('length-of', 'size-of'):
+                    if target not in defined:
+                        raise ValueError('Length field %s of %s must be defined before it in %s.' %
+                                         (target, field_name, name))
+
+                    elif target in sized:
+                        raise ValueError('Field %s of %s is already the length of %s.' %
+                                         (target, name, sized[target]))
+
+                    sized[target] = field_name
+
+                else:
+                    callbacks.append((field_name, target))
+
+            defined.add(field_name)
+
+        attrs['_struct_callbacks_'] = callbacks
+        new_type = _Type.__new__(mcs, name, bases, attrs)
+
+        # Immutable record type for Structure.as_record('namedtuple'), named
+        # so that it can be pickled by reference.
+        record_type = namedtuple(name + 'Record', [field_name for field_name, _ in fields], rename=True)
+        record_type.__module__ = new_type.__module__
+        record_type.__qualname__ = new_type.__qualname__ + '._record_type_'
+        new_type._record_type_ = record_type
+
+        return new_type
 
 
 class Structure(DataType, metaclass=_StructType):
@@ -53,17 +138,132 @@ class Structure(DataType, metaclass=_StructType):
         t.unpack(b'\\x0F')
 
         t.foo == 15  # True
+
+    Fields are packed back to back. To lay them out like a C compiler does,
+    set ``_pack_`` to the largest alignment to use (as with ``ctypes``):
+    each field is then padded to a multiple of the smaller of ``_pack_`` and
+    its natural alignment (see :meth:`DataType.alignment`), and the
+    structure to a multiple of its own alignment::
+
+        class Aligned(Structure):
+            _pack_ = 8
+            _fields_ = [('a', uint8_t), ('b', uint32_t)]  # 3 padding bytes
+
+    Structures of only integer fields are unpacked and packed with a single
+    ``struct.Struct`` (including the padding).
+
+    Arrays of fixed size structures (``Test[100]``) are stored as a
+    :class:`StructArray`.
+
+    The fields of a new instance are copied from a default instance built
+    once per class, rather than constructed one by one; :meth:`copy` copies
+    an instance the same way.
     """
     _fields_ = []
+    _pack_ = 1
+    _unpack_view_ = True
+    _array_type_ = lambda *args, **kwargs: _struct_array_type(*args, **kwargs)
+    _buffer_view = None
 
-    def __init__(self, *args, **kwargs):
-        self.__dict__['_struct_fields'] = OrderedDict()
-        self._unpacked_callbacks = []
+    _unpacked_callbacks = ()
+
+    def __init__(self, *args, validate=None, **kwargs):
+        # Fields inherit this, so it has to be known before they are created.
+        self._init_validate(validate, kwargs.get('parent'))
+
+        prototype = self._cls_prototype(self._validate_)
+
+        if prototype is None:
+            self.__dict__['_struct_fields'] = OrderedDict()
+            self.__dict__['_struct_computed'] = []
+
+            for field, field_type in self._cls_iter_fields():
+                self.__dict__['_struct_fields'][field] = field_type(parent=self)
+
+        else:
+            prototype.clone(self)
+
+            # The copy already holds the default value.
+            if not args and not kwargs:
+                return
+
+        super(Structure, self).__init__(*args, validate=self._validate_, **kwargs)
+
+    @classmethod
+    def _cls_prototype(cls, validate):
+        """
+        The :class:`_Prototype` of the default instance new instances are
+        copied from, built once per class (and per ``validate``). ``None``
+        while it is being built. ``AttributeError`` is raised if the method of
+        a ``Computed`` field does not exist.
+        """
+        prototypes = cls.__dict__.get('_struct_prototypes_')
+        if prototypes is None:
+            prototypes = cls._struct_prototypes_ = {}
+
+        try:
+            return prototypes[validate]
+        except KeyError:
+            pass
+
+        for field_name, callback in cls._struct_callbacks_:
+            if not callable(getattr(cls, callback, None)):
+                raise AttributeError('%s has no method %s to compute %s.' % (cls.__name__, callback, field_name))
+
+        prototypes[validate] = None
+
+        try:
+            prototypes[validate] = _Prototype(cls._cls_new(validate))
+        except BaseException:
+            del prototypes[validate]
+            raise
+
+        return prototypes[validate]
+
+    @classmethod
+    def _cls_new(cls, validate=True):
+        """
+        A default instance created by the :class:`Structure` constructor only,
+        so that subclasses whose constructor takes arguments can be used.
+        """
+        obj = cls.__new__(cls)
+        Structure.__init__(obj, validate=validate)
+
+        return obj
+
+    def copy(self):
+        """
+        A copy of this structure, including nested structures and arrays,
+        made without packing and unpacking it. The copy is not part of any
+        enclosing structure. Copies of structures created by
+        :meth:`from_buffer` are unpacked from the buffer instead.
+        """
+        if self._buffer_view is not None:
+            other = self._cls_new(self._validate_)
+            other.unpack(bytes(self))
 
-        for field, field_type in self._cls_iter_fields():
-            self.__dict__['_struct_fields'][field] = field_type(parent=self)
+            return other
 
-        super(Structure, self).__init__(*args, **kwargs)
+        # Structures are usually laid out like the default instance, so its
+        # plan can be reused; otherwise, plan this one.
+        prototype = self._cls_prototype(self._validate_)
+        other = prototype.copy(self, detached=('_parent',)) if prototype is not None else None
+
+        if other is None:
+            other = _Prototype(self, detached=(self._parent,)).clone()
+
+        return other
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __reduce__(self):
+        # The field objects are not picklable (their types are generated),
+        # but the packed value is all that is needed to recreate them.
+        return _unpickle_struct, (type(self), bytes(self), self._validate_)
 
     def wrap_field(self, field, wrapper):
         try:
@@ -76,64 +276,445 @@ class Structure(DataType, metaclass=_StructType):
 
         return real_field
 
+    @classmethod
+    def _cls_static_size(cls):
+        """
+        :meth:`static_size`, computed once per class.
+        """
+        try:
+            return cls.__dict__['_struct_static_size_']
+        except KeyError:
+            cls._struct_static_size_ = cls._cls_new().static_size()
+            return cls._struct_static_size_
+
+    @classmethod
+    def _cls_codec(cls):
+        """
+        A ``struct.Struct`` for the whole structure if all of its fields are
+        integers of the same byte order, otherwise ``None``. Computed once per
+        class. Odd width integers (:func:`uint_t`) are bytes segments,
+        converted by the codec's ``decoders`` and ``encoders``.
+        """
+        try:
+            return cls.__dict__['_struct_codec_']
+        except KeyError:
+            pass
+
+        codec = None
+        if all(inspect.isclass(field_type) and issubclass(field_type, _Int) for _, field_type in cls._cls_iter_fields()):
+            proto = cls._cls_new()
+            endians = set(field._endian_ for _, field in proto._iter_fields()
+                          if field.size() > 1 and not isinstance(field, _OddInt))
+
+            if proto._struct_fields and len(endians) <= 1:
+                fmt = [endians.pop() if endians else '<']
+                decoders = []
+                encoders = []
+                offset = 0
+
+                for index, (_, field) in enumerate(proto._iter_fields()):
+                    padding = proto._padding(field, offset)
+                    fmt.append('%dx%s' % (padding, field._fmt_))
+                    offset += padding + field.size()
+
+                    if isinstance(field, _OddInt):
+                        decoders.append((index, field._from_bytes))
+                        encoders.append((index, field._to_bytes))
+
+                fmt.append('%dx' % proto._padding(proto, offset))
+                codec = _StructCodec(''.join(fmt), decoders, encoders)
+
+        cls._struct_codec_ = codec
+        return codec
+
     @classmethod
     def _cls_iter_fields(cls):
         for field, field_type in cls._struct_type_fields_:
             yield field, field_type
 
     def _iter_fields(self):
-        for field_name, field in self.__dict__['_struct_fields'].items():
+        for field_name, field in self._struct_fields.items():
             yield field_name, field
 
+    def alignment(self):
+        if self._pack_ == 1:
+            return 1
+
+        return max([min(field.alignment(), self._pack_) for _, field in self._iter_fields()], default=1)
+
+    def _padding(self, field, offset):
+        """
+        The number of padding bytes before ``field`` (or after the last field,
+        if ``field`` is the structure itself) at ``offset`` into the structure.
+        """
+        if self._pack_ == 1:
+            return 0
+
+        alignment = self.alignment() if field is self else min(field.alignment(), self._pack_)
+        return -offset % alignment
+
     def _unpack(self, buf):
-        offset = 0
-        total_consumed_bytes = 0
+        codec = self._cls_codec()
+        if codec is not None and self._buffer_view is None:
+            return self._unpack_codec(codec, buf)
 
+        # Slicing a view doesn't copy the rest of the buffer for every field.
+        view = memoryview(buf).cast('B')
+
+        offset = 0
         for _, field in self._iter_fields():
-            consumed_bytes = field.unpack(buf[offset:])
-            offset += consumed_bytes
-            total_consumed_bytes += consumed_bytes
+            offset += self._padding(field, offset)
+            offset += field.unpack(_field_input(field, buf, view, offset))
+
+        offset += self._padding(self, offset)
+        if len(view) < offset:
+            raise IncompleteError('Not enough bytes to unpack.')
+
+        self._unpacked()
+
+        return offset
+
+    def _unpack_codec(self, codec, buf):
+        if len(buf) < codec.size:
+            raise IncompleteError('Not enough bytes to unpack.')
+
+        values = codec.unpack_from(buf)
+        if codec.decoders:
+            values = list(values)
+            for index, decode in codec.decoders:
+                values[index] = decode(values[index])
+
+        # Values unpacked by the codec are always in range for their fields.
+        for (_, field), value in zip(self._iter_fields(), values):
+            field._value = value
 
         self._unpacked()
 
-        return total_consumed_bytes
+        return codec.size
 
     def unpack_stream(self, stream):
-        first_field = stream.pop_state(self)
-        if first_field is None:
-            skip = False
-        else:
-            skip = True
+        if self._pack_ == 1:
+            for _, field in self._iter_fields():
+                yield from field.unpack_stream(stream)
+
+            self._unpacked()
+            return
+
+        offset = 0
+        for _, field in self._iter_fields():
+            padding = self._padding(field, offset)
+            if padding:
+                yield from stream.wait(padding)
+                stream.read(padding)
 
-        for field_name, field in self._iter_fields():
-            if skip and field is first_field:
-                skip = False
+            yield from field.unpack_stream(stream)
 
-            if not skip:
-                result = field.unpack_stream(stream)
+            # Only variable size fields need to be packed to be measured.
+            size = field.static_size()
+            offset += padding + (field.packed_size() if size is None else size)
 
-                if not result:
-                    stream.push_state(self, field)
-                    return False
+        padding = self._padding(self, offset)
+        if padding:
+            yield from stream.wait(padding)
+            stream.read(padding)
 
         self._unpacked()
-        return True
+
+    @classmethod
+    def iter_unpack(cls, buf, decode_as=None):
+        """
+        Unpack consecutive values filling ``buf``, like ``struct.iter_unpack``.
+        By default each value is a new instance; see :meth:`as_record` for the
+        other values of ``decode_as``. Records are decoded through a single
+        reused instance, so all checks (``Const``, ``Computed``, ...) still
+        run.
+        """
+        obj = None if decode_as is None else cls()
+
+        # Slicing a view doesn't copy the rest of the buffer for every value.
+        view = memoryview(buf).cast('B')
+
+        offset = 0
+        while offset < len(view):
+            if decode_as is None:
+                obj = cls()
+
+            offset += obj.unpack(view[offset:])
+            yield obj if decode_as is None else obj.as_record(decode_as)
+
+    @classmethod
+    def from_buffer(cls, buf, offset=0):
+        """
+        An instance backed by the writable buffer ``buf`` (a ``bytearray``,
+        ``mmap``, ``shared_memory.SharedMemory.buf``, ctypes object, ...)
+        starting at ``offset``, like ``ctypes.Structure.from_buffer``. Reading
+        a field decodes it from the buffer and assigning a field encodes it
+        into the buffer, so changes are shared with anything else using the
+        buffer. Nested structures and arrays of structures are views of the
+        same buffer, and assigning an item of another array writes it back;
+        ``Computed`` fields are re-encoded whenever another field is assigned.
+
+        Only structures with a static size can be used. The buffer stays
+        exported (e.g. an ``mmap`` cannot be closed) until :meth:`release` is
+        called.
+        """
+        view = memoryview(buf).cast('B')
+
+        if view.readonly:
+            raise TypeError('from_buffer() requires a writable buffer.')
+
+        size = cls._cls_static_size()
+        if size is None:
+            raise ValueError('%s does not have a static size.' % cls.__name__)
+
+        elif offset < 0 or len(view) < offset + size:
+            raise ValueError('Buffer size too small (%d instead of at least %d bytes).' % (len(view), offset + size))
+
+        obj = cls()
+        obj._bind_buffer(view, offset, None)
+
+        return obj
+
+    @classmethod
+    def as_ctypes(cls):
+        """
+        An equivalent ``ctypes.LittleEndianStructure`` (or
+        ``BigEndianStructure``) with the same ``_pack_``, created once per
+        class::
+
+            c_pkt = mpc_pkt.as_ctypes()
+            lib.handle_pkt(ctypes.byref(pkt.to_ctypes()))
+
+        Integer and enum fields become integers, fixed length arrays become
+        arrays (``Byte`` arrays ``c_char`` arrays), nested structures become
+        nested ctypes structures, ``Const`` fields become byte arrays and
+        ``Computed`` fields their packed type. ``ValueError`` is raised for
+        other fields, or if the fields use different byte orders.
+        """
+        # Imported here: the bridge depends on the field type modules, which
+        # depend on this one.
+        from ._ctypes_bridge import struct_ctypes_type
+
+        return struct_ctypes_type(cls)
+
+    def to_ctypes(self):
+        """
+        A copy of this structure as an instance of :meth:`as_ctypes`.
+        """
+        return self.as_ctypes().from_buffer_copy(bytes(self))
+
+    @classmethod
+    def from_ctypes(cls, obj):
+        """
+        An instance sharing memory with the ctypes object ``obj`` (e.g. an
+        instance of :meth:`as_ctypes`), as by :meth:`from_buffer`.
+        """
+        return cls.from_buffer(obj)
+
+    def release(self):
+        """
+        Release the buffer of an instance created by :meth:`from_buffer`. The
+        instance can no longer be used afterwards.
+        """
+        if self._buffer_view is not None:
+            self._buffer_view.release()
+
+    def _bind_buffer(self, view, offset, on_write):
+        self._buffer_view = view
+        computed = []
+
+        def _written():
+            for field in computed:
+                field.write()
+
+            if on_write is not None:
+                on_write()
+
+        start = offset
+        for field_name, field in list(self._iter_fields()):
+            offset += self._padding(field, offset - start)
+
+            if isinstance(field, Structure):
+                field._bind_buffer(view, offset, _written)
+
+            self.wrap_field(field_name, functools.partial(_BufferField, view=view, offset=offset, on_write=_written))
+            buffer_field = self._struct_fields[field_name]
+
+            if isinstance(field, Computed.__wrapped__):
+                computed.append(buffer_field)
+
+            offset += buffer_field.size()
+
+    @classmethod
+    def _cls_element(cls, view, offset, on_write, validate):
+        """
+        An element of a :class:`StructArray`: an instance backed by ``view``
+        at ``offset``, like one created by :meth:`from_buffer`, but which only
+        binds its fields to the buffer when it is first used other than by
+        reading (or, if all fields are integers, assigning) integer fields.
+        Those go through the codecs of :meth:`_cls_layout`.
+        """
+        readers, writers = cls._cls_layout(validate)
+
+        obj = cls.__new__(cls)
+        obj_dict = obj.__dict__
+        obj_dict['_buffer_view'] = view
+        obj_dict['_struct_element'] = (offset, on_write, readers, writers)
+
+        if not validate:
+            obj_dict['_validate_'] = False
+
+        return obj
+
+    @classmethod
+    def _cls_layout(cls, validate):
+        """
+        ``(readers, writers)`` for :meth:`_cls_element`, computed once per
+        class (and per ``validate``): the ``(offset, codec, field)`` of each
+        integer field by name, with a ``struct.Struct`` to read and write it
+        and a field of a default instance to check assigned values with.
+        ``writers`` is empty unless all fields are integers, as assigning
+        other fields may have to update them (e.g. ``Computed`` fields).
+        """
+        layouts = cls.__dict__.get('_struct_layouts_')
+        if layouts is None:
+            layouts = cls._struct_layouts_ = {}
+
+        try:
+            return layouts[validate]
+        except KeyError:
+            pass
+
+        proto = cls._cls_new(validate)
+        readers = {}
+        offset = 0
+
+        for field_name, field in proto._iter_fields():
+            offset += proto._padding(field, offset)
+
+            if isinstance(field, _Int) and not isinstance(field, _OddInt):
+                readers[field_name] = (offset, struct.Struct(field._fmt()), field)
+
+            offset += field.size()
+
+        writers = readers if cls._cls_codec() is not None else {}
+        layouts[validate] = (readers, writers)
+
+        return layouts[validate]
+
+    def _bind_element(self):
+        """
+        Bind the fields of an element created by :meth:`_cls_element` to its
+        buffer.
+        """
+        offset, on_write, _, _ = self.__dict__.pop('_struct_element')
+
+        Structure.__init__(self, validate=self._validate_)
+        self._bind_buffer(self.__dict__['_buffer_view'], offset, on_write)
+
+    def as_record(self, decode_as='tuple'):
+        """
+        A lightweight copy of the field values, without any of the field
+        machinery: a ``'tuple'``, a ``'namedtuple'`` (of a type generated once
+        per class) or a ``'dict'``. Nested structures are converted the same
+        way, arrays become tuples and ``ByteView`` values ``bytes``.
+        """
+        values = [_as_record_value(field.value, decode_as) for _, field in self._iter_fields()]
+
+        if decode_as == 'tuple':
+            return tuple(values)
+
+        elif decode_as == 'namedtuple':
+            return self._record_type_._make(values)
+
+        elif decode_as == 'dict':
+            return dict(zip(self._struct_fields, values))
+
+        else:
+            raise ValueError('Invalid decode_as: %r.' % (decode_as,))
 
     def pack(self):
         return bytes(self)
 
     def _unpacked(self):
+        for field in self._struct_computed:
+            field._parent_unpacked(self)
+
         for cb in self._unpacked_callbacks:
             cb(self)
 
+    def _add_computed(self, field):
+        """
+        Register a :class:`Computed` field (possibly nested in another field)
+        to be checked once this structure has been unpacked.
+        """
+        self._struct_computed.append(field)
+
     def add_unpacked_callback(self, cb):
-        self._unpacked_callbacks.append(cb)
+        self._unpacked_callbacks = self._unpacked_callbacks + (cb,)
 
     def __bytes__(self):
-        return b''.join(bytes(field) for _, field in self._iter_fields())
+        codec = self._cls_codec()
+        if codec is not None and self._buffer_view is None:
+            values = [field._value for _, field in self._iter_fields()]
+            for index, encode in codec.encoders:
+                values[index] = encode(values[index])
+
+            return codec.pack(*values)
+
+        return b''.join(self._pack_iter())
+
+    def _pack_iter(self):
+        offset = 0
+        for _, field in self._iter_fields():
+            padding = self._padding(field, offset)
+            if padding:
+                offset += padding
+                yield bytes(padding)
+
+            for piece in field._pack_iter():
+                offset += len(piece)
+                yield piece
+
+        padding = self._padding(self, offset)
+        if padding:
+            yield bytes(padding)
+
+    def _padded_size(self, field_size):
+        """
+        The size of the structure, including padding, given the size of each
+        field (or ``None`` if any is ``None``).
+        """
+        offset = 0
+        for _, field in self._iter_fields():
+            size = field_size(field)
+            if size is None:
+                return None
+
+            offset += self._padding(field, offset) + size
+
+        return offset + self._padding(self, offset)
 
     def size(self):
-        return sum(field.size() for _, field in self._iter_fields())
+        return self._padded_size(lambda field: field.size())
+
+    def static_size(self):
+        return self._padded_size(lambda field: field.static_size())
+
+    def packed_size(self):
+        return self._padded_size(lambda field: field.packed_size())
+
+    def frame_size(self, buf):
+        offset = 0
+        for _, field in self._iter_fields():
+            offset += self._padding(field, offset)
+            offset += field.frame_size(buf[offset:])
+
+        offset += self._padding(self, offset)
+        if len(buf) < offset:
+            raise IncompleteError('Not enough bytes to unpack.')
+
+        return offset
 
     @DataType.value.setter
     def value(self, new_value):
@@ -161,12 +742,42 @@ class Structure(DataType, metaclass=_StructType):
         return self
 
     def __setattr__(self, field, value):
-        if field in self.__dict__['_struct_fields']:
+        element = self.__dict__.get('_struct_element')
+        if element is not None:
+            offset, on_write, _, writers = element
+
+            if field not in writers:
+                self._bind_element()
+                return setattr(self, field, value)
+
+            field_offset, codec, check = writers[field]
+            try:
+                check.value = value
+            except TypeError as err:
+                raise TypeError('%r cannot be assigned to %s.%s: %s' %
+                                (value, type(self).__name__, field, err.args[0])) from None
+
+            codec.pack_into(self.__dict__['_buffer_view'], offset + field_offset, check.value)
+            if on_write is not None:
+                on_write()
+
+        elif field in self.__dict__['_struct_fields']:
             try:
                 self._struct_fields[field].value = value
             except TypeError as err:
                 raise TypeError('%r cannot be assigned to %s.%s: %s' %
                                 (value, type(self).__name__, field, err.args[0])) from None
+
+        elif field in self._struct_subfields_:
+            field_name, bits_type = self._struct_subfields_[field]
+            word = self._struct_fields[field_name]
+
+            try:
+                word.value = bits_type.set_bits(word.value, field, value)
+            except TypeError as err:
+                raise TypeError('%r cannot be assigned to %s.%s: %s' %
+                                (value, type(self).__name__, field, err.args[0])) from None
+
         else:
             return super(Structure, self).__setattr__(field, value)
 
@@ -174,8 +785,24 @@ class Structure(DataType, metaclass=_StructType):
         """
         Get a field. Yeah, for real.
         """
+        element = self.__dict__.get('_struct_element')
+        if element is not None:
+            offset, _, readers, _ = element
+
+            if attr not in readers:
+                self._bind_element()
+                return getattr(self, attr)
+
+            field_offset, codec, _ = readers[attr]
+            return codec.unpack_from(self.__dict__['_buffer_view'], offset + field_offset)[0]
+
         if attr in self._struct_fields:
             return self._struct_fields[attr].value
+
+        elif attr in self._struct_subfields_:
+            field_name, bits_type = self._struct_subfields_[attr]
+            return bits_type.get_bits(self._struct_fields[field_name].value, attr)
+
         else:
             raise AttributeError('%s is not a valid field for %s.' % (attr, type(self).__name__))
 
@@ -191,7 +818,7 @@ class Structure(DataType, metaclass=_StructType):
         if not isinstance(value, Structure):
             return False
 
-        elif len(self.__dict__['_struct_fields']) != len(value.__dict__['_struct_fields']):
+        elif len(self._struct_fields) != len(value._struct_fields):
             return False
 
         else:
@@ -204,7 +831,658 @@ class Structure(DataType, metaclass=_StructType):
             return True
 
 
+class _Prototype(object):
+    """
+    A plan for copying a structure and everything it holds: its fields,
+    their wrappers and the lists, dicts and ``bytearray`` objects of their
+    values. The objects are listed once, each with a template of its
+    ``__dict__``, the entries referring to other copied objects (e.g. a
+    field's parent, or the length field a ``LengthField`` wraps) and the
+    containers to copy. Tuples holding any of these are copied, and methods
+    bound to a copied object (e.g. callbacks added with
+    :meth:`Structure.add_unpacked_callback`) are bound to its copy. Other
+    values (ints, bytes, enum members, types, functions, ...) are shared.
+    References to ``detached`` objects become ``None``.
+
+    The plan also records where each object was found (the attribute, and
+    the keys into the containers, of an object listed before it), so that
+    it can copy other objects laid out the same way (see :meth:`copy`).
+    """
+    _COPY, _LIST, _DICT, _REF_DICT, _TUPLE, _METHOD = range(6)
+
+    # Values which are not shared, i.e. which :meth:`copy` cannot take as is.
+    _HELD = (DataType, _ArrayType, list, dict, bytearray)
+
+    def __init__(self, obj, detached=()):
+        self._classes = []
+        self._paths = []
+        self._plan = []
+        self._index = dict((id(other), None) for other in detached)
+        self._add(obj, None)
+        del self._index
+
+    def _add(self, obj, path):
+        index = len(self._classes)
+        self._index[id(obj)] = index
+        self._classes.append(obj.__class__)
+        self._paths.append(path)
+        self._plan.append(None)
+
+        template = {}
+        refs = []
+        copies = []
+
+        for name, value in obj.__dict__.items():
+            ref, spec = self._spec(value, (index, name))
+
+            if ref is not None:
+                refs.append((name, ref))
+            elif spec is not None:
+                copies.append((name, spec))
+            elif id(value) in self._index:
+                template[name] = None  # detached
+            else:
+                template[name] = value
+
+        self._plan[index] = (template, refs, copies)
+
+        return index
+
+    def _spec(self, value, path):
+        """
+        ``(index, None)`` for a copied object, ``(None, spec)`` for a container
+        to copy and ``(None, None)`` for a shared value, found at ``path``.
+        """
+        if id(value) in self._index:
+            return self._index[id(value)], None
+
+        elif isinstance(value, (DataType, _ArrayType)):
+            return self._add(value, path), None
+
+        elif isinstance(value, bytearray):
+            return None, (self._COPY, value)
+
+        elif isinstance(value, list):
+            items = [self._spec(item, path + (i,)) + (item,) for i, item in enumerate(value)]
+
+            if all(ref is None and spec is None for ref, spec, _ in items):
+                return None, (self._COPY, value)
+
+            return None, (self._LIST, items)
+
+        elif type(value) is tuple:
+            items = [self._spec(item, path + (i,)) + (item,) for i, item in enumerate(value)]
+
+            if all(ref is None and spec is None for ref, spec, _ in items):
+                return None, None
+
+            return None, (self._TUPLE, items)
+
+        elif isinstance(value, types.MethodType) and self._index.get(id(value.__self__)) is not None:
+            return None, (self._METHOD, (self._index[id(value.__self__)], value.__func__))
+
+        elif isinstance(value, dict):
+            items = [(key,) + self._spec(item, path + (key,)) + (item,) for key, item in value.items()]
+
+            if all(ref is not None for _, ref, _, _ in items):
+                return None, (self._REF_DICT, (value.__class__, [(key, ref) for key, ref, _, _ in items]))
+
+            return None, (self._DICT, (value.__class__, items))
+
+        else:
+            return None, None
+
+    @classmethod
+    def _build(cls, spec, objects):
+        kind, arg = spec
+
+        if kind == cls._COPY:
+            return arg.copy()
+
+        elif kind == cls._REF_DICT:
+            dict_type, items = arg
+            return dict_type([(key, objects[ref]) for key, ref in items])
+
+        elif kind == cls._LIST:
+            return [cls._item(item, objects) for item in arg]
+
+        elif kind == cls._TUPLE:
+            return tuple([cls._item(item, objects) for item in arg])
+
+        elif kind == cls._METHOD:
+            ref, func = arg
+            return types.MethodType(func, objects[ref])
+
+        else:
+            dict_type, items = arg
+            return dict_type([(key, cls._item(item, objects)) for key, *item in items])
+
+    @classmethod
+    def _item(cls, item, objects):
+        ref, spec, value = item
+
+        if ref is not None:
+            return objects[ref]
+
+        elif spec is not None:
+            return cls._build(spec, objects)
+
+        else:
+            return value
+
+    def clone(self, new=None):
+        """
+        A copy of the planned object. ``new`` (an instance of its class) is
+        filled in rather than creating one.
+        """
+        objects = [cls.__new__(cls) for cls in self._classes]
+        if new is not None:
+            objects[0] = new
+
+        for obj, (template, refs, copies) in zip(objects, self._plan):
+            # Structures override __setattr__; fill the __dict__ directly.
+            obj_dict = obj.__dict__
+            obj_dict.update(template)
+
+            for name, ref in refs:
+                obj_dict[name] = objects[ref]
+
+            for name, spec in copies:
+                obj_dict[name] = self._build(spec, objects)
+
+        return objects[0]
+
+    def copy(self, src, detached=()):
+        """
+        A copy of ``src``, an object laid out like the planned one (the same
+        classes, holding each other in the same way), made by following the
+        plan with the values of ``src`` rather than building a new plan. The
+        ``detached`` attributes of the copy are ``None``. ``None`` is returned
+        if ``src`` is laid out differently (e.g. an array of structures has
+        grown).
+        """
+        try:
+            sources = self._find(src)
+            objects = [cls.__new__(cls) for cls in self._classes]
+
+            for obj, source, (template, refs, copies) in zip(objects, sources, self._plan):
+                src_dict = source.__dict__
+                if len(src_dict) != len(template) + len(refs) + len(copies):
+                    return None
+
+                obj_dict = obj.__dict__
+
+                for name in template:
+                    if obj is objects[0] and name in detached:
+                        obj_dict[name] = None
+                    else:
+                        obj_dict[name] = self._shared(src_dict[name])
+
+                for name, ref in refs:
+                    obj_dict[name] = objects[ref]
+
+                for name, spec in copies:
+                    obj_dict[name] = self._build_from(spec, src_dict[name], objects)
+
+        except _LayoutChanged:
+            return None
+
+        return objects[0]
+
+    def _find(self, src):
+        """
+        The objects of ``src`` corresponding to the planned ones.
+        """
+        sources = [src]
+
+        for cls, path in zip(self._classes[1:], self._paths[1:]):
+            owner, name, *keys = path
+
+            try:
+                value = sources[owner].__dict__[name]
+                for key in keys:
+                    value = value[key]
+            except (KeyError, IndexError):
+                raise _LayoutChanged from None
+
+            if value.__class__ is not cls:
+                raise _LayoutChanged
+
+            sources.append(value)
+
+        return sources
+
+    @classmethod
+    def _shared(cls, value):
+        if isinstance(value, cls._HELD) or isinstance(getattr(value, '__self__', None), cls._HELD):
+            raise _LayoutChanged
+
+        elif type(value) is tuple:
+            for item in value:
+                cls._shared(item)
+
+        return value
+
+    @classmethod
+    def _build_from(cls, spec, value, objects):
+        kind, arg = spec
+
+        if kind == cls._COPY:
+            # Lists of values (arrays) hold one type of value.
+            if value.__class__ is not arg.__class__ or (isinstance(value, list) and value and
+                                                        isinstance(value[0], cls._HELD)):
+                raise _LayoutChanged
+
+            return value.copy()
+
+        elif kind == cls._METHOD:
+            ref, func = arg
+            if not isinstance(value, types.MethodType) or value.__func__ is not func:
+                raise _LayoutChanged
+
+            return types.MethodType(func, objects[ref])
+
+        elif value.__class__ is not (tuple if kind == cls._TUPLE else list if kind == cls._LIST else arg[0]):
+            raise _LayoutChanged
+
+        elif len(value) != len(arg[1] if kind in (cls._DICT, cls._REF_DICT) else arg):
+            raise _LayoutChanged
+
+        elif kind == cls._REF_DICT:
+            dict_type, items = arg
+            return dict_type([(key, objects[ref]) for key, ref in items])
+
+        elif kind == cls._LIST:
+            return [cls._item_from(item, src_item, objects) for item, src_item in zip(arg, value)]
+
+        elif kind == cls._TUPLE:
+            return tuple([cls._item_from(item, src_item, objects) for item, src_item in zip(arg, value)])
+
+        else:
+            dict_type, items = arg
+            return dict_type([(key, cls._item_from(item, value[key], objects)) for key, *item in items])
+
+    @classmethod
+    def _item_from(cls, item, value, objects):
+        ref, spec, _ = item
+
+        if ref is not None:
+            return objects[ref]
+
+        elif spec is not None:
+            return cls._build_from(spec, value, objects)
+
+        else:
+            return cls._shared(value)
+
+
+class _LayoutChanged(Exception):
+    """
+    Raised by :meth:`_Prototype.copy` when the copied object is not laid out
+    like the planned one.
+    """
+
+
+def _unpickle_struct(struct_type, packed, validate):
+    obj = struct_type(validate=validate)
+    obj.from_bytes(packed)
+
+    return obj
+
+
+class _StructCodec(struct.Struct):
+    """
+    The codec of :meth:`Structure._cls_codec`: a ``struct.Struct`` plus
+    ``(index, function)`` conversions of the values of odd width integers.
+    """
+    def __init__(self, fmt, decoders, encoders):
+        super(_StructCodec, self).__init__(fmt)
+        self.decoders = decoders
+        self.encoders = encoders
+
+
+class _BufferField(object):
+    """
+    A field of a structure created by :meth:`Structure.from_buffer`: its
+    value lives in ``view[offset:offset + field.static_size()]``. Arrays of
+    structures are :class:`StructArray` views of the buffer, and other arrays
+    are lists whose item assignments are written back (see
+    :class:`_BufferList`).
+    """
+    def __init__(self, field, view, offset, on_write):
+        self.field = field
+        self._view = view
+        self._start = offset
+        self._end = offset + field.static_size()
+        self._on_write = on_write
+
+        if isinstance(field, _Int) and not isinstance(field, _OddInt):
+            self._codec = struct.Struct(field._fmt())
+        else:
+            self._codec = None
+
+    @property
+    def value(self):
+        if self._codec is not None:
+            return self._codec.unpack_from(self._view, self._start)[0]
+
+        elif isinstance(self.field, (Structure, Const.__wrapped__, Computed.__wrapped__)):
+            # Nested structures are views; the others do not depend on the buffer.
+            return self.field.value
+
+        elif isinstance(self.field, _Array) and isinstance(self.field._value, StructArray):
+            array = StructArray(self.field._value.elem_type, validate=self.field._validate_)
+            array._buf = self._view[self._start:self._end]
+            array._on_write = self._on_write
+
+            return array
+
+        self.field.unpack(self._view[self._start:self._end])
+        value = self.field.value
+
+        if isinstance(self.field, _Array) and isinstance(value, list):
+            return _BufferList(value, self)
+        else:
+            return value
+
+    @value.setter
+    def value(self, new_value):
+        if isinstance(self.field, Structure):
+            if not isinstance(new_value, type(self.field)):
+                raise TypeError('value must be an instance of %s.' % (type(self.field).__name__))
+
+            self._view[self._start:self._end] = bytes(new_value)
+
+        elif self._codec is not None:
+            self.field.value = new_value
+            self._codec.pack_into(self._view, self._start, self.field.value)
+
+        else:
+            self.field.value = new_value
+            self._view[self._start:self._end] = bytes(self.field)
+
+        self._on_write()
+
+    def write(self):
+        """
+        Encode the field's current value into the buffer.
+        """
+        self._view[self._start:self._end] = bytes(self.field)
+
+    def unpack(self, buf):
+        consumed = self.field.unpack(buf)
+
+        if not isinstance(self.field, Structure):
+            self._view[self._start:self._start + consumed] = buf[:consumed]
+
+        return consumed
+
+    def unpack_stream(self, stream):
+        size = self.size()
+        yield from stream.wait(size)
+        self.unpack(stream.read(size))
+
+    def frame_size(self, buf):
+        return self.field.frame_size(buf)
+
+    def __bytes__(self):
+        return bytes(self._view[self._start:self._end])
+
+    def _pack_iter(self):
+        yield bytes(self)
+
+    def size(self):
+        return self._end - self._start
+
+    def static_size(self):
+        return self.size()
+
+    def packed_size(self):
+        return self.size()
+
+    def alignment(self):
+        return self.field.alignment()
+
+    @property
+    def _unpack_view_(self):
+        return self.field._unpack_view_
+
+
+class _BufferList(list):
+    """
+    The value of an array field of a structure created by
+    :meth:`Structure.from_buffer`: a copy of the elements, whose item
+    assignments are checked and written back to the buffer like assigning
+    the field. Its length cannot be changed. Copies are plain lists.
+    """
+    def __init__(self, values, buffer_field):
+        super(_BufferList, self).__init__(values)
+        self._buffer_field = buffer_field
+
+    def __setitem__(self, index, value):
+        values = list(self)
+        values[index] = value
+
+        self._buffer_field.value = values
+        super(_BufferList, self).__setitem__(slice(None), self._buffer_field.field.value)
+
+    def _resize(self, *args, **kwargs):
+        raise TypeError('Cannot change the length of an array in a buffer.')
+
+    __delitem__ = __iadd__ = __imul__ = append = extend = insert = pop = remove = clear = _resize
+
+    def sort(self, *args, **kwargs):
+        values = list(self)
+        values.sort(*args, **kwargs)
+        self[:] = values
+
+    def reverse(self):
+        self[:] = self[::-1]
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+def _struct_array_type(elem_type, value=None, length=None, validate=True):
+    if elem_type._cls_static_size() is not None:
+        return StructArray(elem_type, value=value, length=length, validate=validate)
+    else:
+        return ListArray(elem_type, value=value, length=length, validate=validate)
+
+
+class StructArray(_ArrayType):
+    """
+    An array of fixed size structures stored in one contiguous buffer rather
+    than as a list of instances. Elements are views of the buffer (see
+    :meth:`Structure.from_buffer`), so assigning one of their fields changes
+    the array; assigning an element, or a slice of the same length, packs it
+    into the buffer. Slices are new arrays copied from the buffer. Elements
+    accessed before the array is unpacked further stay views of the data it
+    had then.
+
+    A ``StructArray`` compares equal to another array or list of equal
+    structures.
+    """
+    # Called after writing to the buffer, for the arrays of a structure
+    # created by Structure.from_buffer, whose buffer is a view of its own.
+    _on_write = None
+
+    def init(self, length, value):
+        if isinstance(value, _ArrayType) and not isinstance(value, StructArray):
+            raise Exception
+
+        self._elem_size = self.elem_type._cls_static_size()
+        self._scratch = None
+        self._value = self
+
+        if isinstance(value, StructArray):
+            self._buf = bytearray(value._buf)
+
+        elif value is not None:
+            self._buf = bytearray()
+            for elem in value:
+                self._buf += self._pack_elem(elem)
+
+        elif length is not None:
+            self._buf = bytearray(bytes(self.elem_type._cls_new()) * length)
+
+        else:
+            self._buf = bytearray()
+
+    def _pack_elem(self, elem):
+        if not self._validate:
+            return bytes(elem)
+
+        # This will raise a TypeError if the element is not a valid value.
+        obj = self.elem_type._cls_new()
+        obj.value = elem
+
+        return bytes(obj)
+
+    def _check(self, buf):
+        # Unpack into a reused instance so Const/Computed/Enum checks run.
+        if self._scratch is None:
+            self._scratch = self.elem_type._cls_new(self._validate)
+
+        return self._scratch.unpack(buf)
+
+    def _extend(self, buf):
+        try:
+            self._buf += buf
+        except BufferError:
+            # Element views export the buffer, so it cannot be resized; they
+            # keep the old one.
+            self._buf = self._buf + buf
+
+    def unpack(self, buf):
+        consumed = self._check(buf)
+        self._extend(buf[:consumed])
+
+        return consumed
+
+    def unpack_stream(self, stream):
+        yield from stream.wait(self._elem_size)
+
+        buf = stream.read(self._elem_size)
+        self._check(buf)
+        self._extend(buf)
+
+    def _elem(self, index):
+        return self.elem_type._cls_element(memoryview(self._buf), index * self._elem_size, self._on_write,
+                                           self._validate)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            array = StructArray(self.elem_type)
+            size = self._elem_size
+            array._buf = bytearray().join(self._buf[i * size:(i + 1) * size] for i in range(*index.indices(len(self))))
+
+            return array
+
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError('StructArray index out of range')
+
+        return self._elem(index)
+
+    def __setitem__(self, index, value):
+        size = self._elem_size
+
+        if isinstance(index, slice):
+            indices = range(*index.indices(len(self)))
+            values = list(value)
+
+            if len(values) != len(indices):
+                raise TypeError('Cannot change the length of a StructArray; expected %d elements, but got %d.' %
+                                (len(indices), len(values)))
+
+            for i, elem in zip(indices, values):
+                self._buf[i * size:(i + 1) * size] = self._pack_elem(elem)
+
+        else:
+            if index < 0:
+                index += len(self)
+
+            if not 0 <= index < len(self):
+                raise IndexError('StructArray assignment index out of range')
+
+            self._buf[index * size:(index + 1) * size] = self._pack_elem(value)
+
+        if self._on_write is not None:
+            self._on_write()
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._elem(index)
+
+    def __len__(self):
+        return len(self._buf) // self._elem_size
+
+    def __eq__(self, other):
+        if isinstance(other, StructArray):
+            return self._buf == other._buf
+
+        try:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return False
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, list(self))
+
+    def __bytes__(self):
+        return bytes(self._buf)
+
+    def to_ctypes(self):
+        """
+        A copy of the array as a ``ctypes`` array of :meth:`Structure.as_ctypes`.
+        """
+        from ._ctypes_bridge import struct_array_ctypes
+
+        return struct_array_ctypes(self)
+
+    def packed_size(self):
+        return len(self._buf)
+
+    def size(self):
+        return len(self._buf)
+
+
+def _field_input(field, buf, view, offset):
+    """
+    What ``field`` unpacks from at ``offset`` into ``buf``: a slice of
+    ``view`` if the field takes views, otherwise a slice of ``buf`` as it
+    is, or ``bytes`` if ``buf`` is itself a view.
+    """
+    if field._unpack_view_:
+        return view[offset:]
+
+    elif isinstance(buf, memoryview):
+        return view[offset:].tobytes()
+
+    else:
+        return buf[offset:]
+
+
+def _as_record_value(value, decode_as):
+    if isinstance(value, Structure):
+        return value.as_record(decode_as)
+
+    elif isinstance(value, (list, StructArray)):
+        return tuple(_as_record_value(elem, decode_as) for elem in value)
+
+    elif isinstance(value, memoryview):
+        # Records outlive the buffer ByteView values are views of.
+        return bytes(value)
+
+    else:
+        return value
+
+
 def wrap_type(cls):
+    @functools.wraps(cls, updated=())
     def _wrapper(*wrap_args, **wrap_kwargs):
         # The downside of this is the result is not subscriptable. But why
         # would you need an array of consts? (rather than a Const array)?
@@ -215,6 +1493,8 @@ def wrap_type(cls):
 
 @wrap_type
 class Const(DataType):
+    _unpack_view_ = True
+
     def __init__(self, *args, mismatch_exc=ValueError, **kwargs):
         """
         Const(type, value) | Const(value)
@@ -252,11 +1532,9 @@ class Const(DataType):
         return len(self._bytes_value)
 
     def unpack_stream(self, stream):
-        if len(stream) < len(self._bytes_value):
-            return False
-        else:
-            self._unpack(stream.read(len(self._bytes_value)))
-            return True
+        size = len(self._bytes_value)
+        yield from stream.wait(size)
+        self._unpack(stream.read(size))
 
     def pack(self):
         return self._bytes_value
@@ -264,6 +1542,12 @@ class Const(DataType):
     def size(self):
         return len(self._bytes_value)
 
+    def static_size(self):
+        return len(self._bytes_value)
+
+    def packed_size(self):
+        return len(self._bytes_value)
+
 
 @wrap_type
 class Computed(DataType):
@@ -280,15 +1564,32 @@ class Computed(DataType):
             def calc_baz(self):
                 return self.foo + self.bar
     """
+    _depends_on_ = ('computed-from', 'callback')
+
     def __init__(self, pack_type, callback, mismatch_exc=ValueError, **kwargs):
         self.pack_field = pack_type(**kwargs)
         DataType.__init__(self, **kwargs)
 
-        self.callback = getattr(self._parent, callback)
+        # The structure checks the value once it is unpacked. The method is
+        # looked up by name when it is needed (the structure checked it
+        # exists), so new instances, which are copies, do not bind it.
+        self._callback_name = callback
         self.mismatch_exc_type = mismatch_exc
-        kwargs.get('parent').add_unpacked_callback(self._parent_unpacked)
+
+        if self._parent is not None:
+            self._parent._add_computed(self)
+
+    def callback(self):
+        return getattr(self._parent, self._callback_name)()
+
+    @property
+    def _unpack_view_(self):
+        return self.pack_field._unpack_view_
 
     def _parent_unpacked(self, _):
+        if not self._validate_:
+            return
+
         value = self.callback()
 
         if value != self.pack_field.value:
@@ -310,11 +1611,24 @@ class Computed(DataType):
         return self.pack_field.unpack(buf)
 
     def unpack_stream(self, stream):
-        return self.pack_field.unpack_stream(stream)
+        yield from self.pack_field.unpack_stream(stream)
 
     def pack(self):
         self.pack_field.value = self.callback()
         return self.pack_field.pack()
 
+    def _pack_iter(self):
+        self.pack_field.value = self.callback()
+        yield from self.pack_field._pack_iter()
+
     def size(self):
         return self.pack_field.size()
+
+    def static_size(self):
+        return self.pack_field.static_size()
+
+    def packed_size(self):
+        return self.pack_field.packed_size()
+
+    def alignment(self):
+        return self.pack_field.alignment()
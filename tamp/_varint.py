@@ -0,0 +1,143 @@
+from ._base import DataType, IncompleteError
+
+__all__ = ['varuint', 'varint']
+
+# 64 bits take at most 10 bytes; a continuation bit on the 10th is invalid.
+_MAX_SHIFT = 70
+
+
+class varuint(DataType):
+    """
+    An unsigned LEB128 variable length integer of up to 64 bits: 7 bits per
+    byte, least significant first, with the high bit set on all but the last
+    byte. Can be used as a ``LengthField``. Arrays of varints are unpacked in
+    bulk, without an object per element.
+    """
+    _unpack_view_ = True
+    _bounds_ = (0, 0xffffffffffffffff)
+
+    @DataType.value.setter
+    def value(self, new_value):
+        if new_value is None:
+            new_value = 0
+
+        elif self._validate_:
+            min_val, max_val = self._bounds_
+            if not min_val <= new_value <= max_val:
+                raise TypeError('%s must be %d <= x <= %d.' % (self.__class__.__name__, min_val, max_val))
+
+        self._value = new_value
+
+    @staticmethod
+    def _to_raw(value):
+        return value
+
+    @staticmethod
+    def _from_raw(raw):
+        return raw
+
+    @classmethod
+    def _check_raw(cls, raw):
+        if raw > 0xffffffffffffffff:
+            raise ValueError('%s does not fit in 64 bits.' % cls.__name__)
+
+    def _unpack(self, buf):
+        values, consumed = self._unpack_many(buf, 1)
+
+        if not values:
+            raise IncompleteError('Not enough bytes to unpack.')
+
+        self._value = values[0]
+
+        return consumed
+
+    def unpack_stream(self, stream):
+        raw = shift = 0
+
+        while True:
+            yield from stream.wait(1)
+            byte = stream.read(1)[0]
+
+            raw |= (byte & 0x7f) << shift
+            shift += 7
+
+            if not byte & 0x80:
+                break
+
+            elif shift >= _MAX_SHIFT:
+                raise ValueError('%s is longer than %d bytes.' % (self.__class__.__name__, _MAX_SHIFT // 7))
+
+        self._check_raw(raw)
+        self._value = self._from_raw(raw)
+
+    @classmethod
+    def _unpack_many(cls, buf, count=None):
+        """
+        Unpack up to ``count`` (by default all) consecutive values from
+        ``buf``. Returns the values and the number of bytes consumed.
+        """
+        values = []
+        raw = shift = consumed = 0
+
+        for offset, byte in enumerate(memoryview(buf).cast('B')):
+            if count is not None and len(values) == count:
+                break
+
+            raw |= (byte & 0x7f) << shift
+
+            if byte & 0x80:
+                shift += 7
+
+                if shift >= _MAX_SHIFT:
+                    raise ValueError('%s is longer than %d bytes.' % (cls.__name__, _MAX_SHIFT // 7))
+            else:
+                cls._check_raw(raw)
+                values.append(cls._from_raw(raw))
+                raw = shift = 0
+                consumed = offset + 1
+
+        if shift:
+            raise IncompleteError('Not enough bytes to unpack.')
+
+        return values, consumed
+
+    @classmethod
+    def _pack_chunk(cls, values):
+        out = bytearray()
+
+        for value in values:
+            raw = cls._to_raw(value)
+
+            while raw > 0x7f:
+                out.append(0x80 | (raw & 0x7f))
+                raw >>= 7
+
+            out.append(raw)
+
+        return bytes(out)
+
+    def pack(self):
+        return self._pack_chunk([self._value])
+
+    def size(self):
+        return 0  # always like a variable length member.
+
+    def packed_size(self):
+        return max(1, (self._to_raw(self._value).bit_length() + 6) // 7)
+
+
+class varint(varuint):
+    """
+    A signed variable length integer of up to 64 bits: the zigzag encoding
+    (0, -1, 1, -2, ... as 0, 1, 2, 3, ...) of the value, as a
+    :class:`varuint`.
+    """
+    _bounds_ = (-0x8000000000000000, 0x7fffffffffffffff)
+
+    @staticmethod
+    def _to_raw(value):
+        return value << 1 if value >= 0 else (-value << 1) - 1
+
+    @staticmethod
+    def _from_raw(raw):
+        return (raw >> 1) ^ -(raw & 1)
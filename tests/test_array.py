@@ -122,6 +122,37 @@ class TestArray(unittest.TestCase):
         with self.assertRaises(TypeError):
             s.test = [-1]
 
+    def test_assign_bulk(self):
+        """
+        Assigning many values reports the first invalid value like assigning
+        it alone does.
+        """
+        s = _test_field_struct(uint16_t[0])
+
+        s.test = list(range(10000))
+        self.assertEqual(s.test, list(range(10000)))
+
+        # The second invalid value would raise a different error.
+        values = list(range(10000)) + [70000, 'x']
+        with self.assertRaises(TypeError) as bulk_err:
+            s.test = values
+
+        with self.assertRaises(TypeError) as elem_err:
+            uint16_t(70000)
+
+        self.assertEqual(bulk_err.exception.args[0],
+                         '%r cannot be assigned to _test.test: %s' % (values, elem_err.exception.args[0]))
+        self.assertEqual(s.test, list(range(10000)))
+
+    def test_assign_bulk_none(self):
+        """
+        ``None`` elements are still assigned the default value.
+        """
+        s = _test_field_struct(uint8_t[3])
+        s.test = [1, None, 3]
+
+        self.assertEqual(s.test, [1, 0, 3])
+
     def test_array_default(self):
         """
         An array defaults to a list of default element values.
@@ -298,6 +329,70 @@ class TestArray(unittest.TestCase):
         self.assertEqual(values[0].len, 5)
         self.assertEqual(values[0].data, [0, 1, 2, 3, 4])
 
+    def test_length_field_array_unpack_stream_sink(self):
+        """
+        Elements of a streamed array are handed to its sink in chunks as they
+        arrive.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('len', uint8_t),
+                ('data', uint16_t.be[LengthField('len')]),
+                ('end', uint8_t),
+            ]
+
+        chunks = []
+        stream = StreamUnpacker(_test, sinks={'data': chunks.append})
+
+        self.assertEqual(list(stream.unpack(b'\x03\x00\x01\x00')), [])
+        self.assertEqual(list(stream.unpack(b'\x02\x00')), [])
+        values = list(stream.unpack(b'\x03\xff'))
+
+        self.assertEqual([list(chunk) for chunk in chunks], [[1], [2], [3]])
+        self.assertEqual(len(values), 1)
+        self.assertEqual(values[0].len, 3)
+        self.assertEqual(values[0].data, [])
+        self.assertEqual(values[0].end, 0xff)
+
+    def test_unpack_stream_sink_nested(self):
+        """
+        A sink can be registered for an array in a nested struct.
+        """
+        class _inner(Structure):
+            _fields_ = [
+                ('len', uint8_t),
+                ('data', Byte[LengthField('len')]),
+            ]
+
+        class _test(Structure):
+            _fields_ = [
+                ('inner', _inner),
+            ]
+
+        chunks = []
+        stream = StreamUnpacker(_test, sinks={'inner.data': chunks.extend})
+
+        values = list(stream.unpack(b'\x02ab\x01c'))
+
+        self.assertEqual(len(values), 2)
+        self.assertEqual(chunks, [b'a', b'b', b'c'])
+
+    def test_unpack_stream_sink_invalid(self):
+        """
+        Registering a sink for something other than an array field raises
+        ``ValueError``.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('len', uint8_t),
+            ]
+
+        with self.assertRaises(ValueError):
+            list(StreamUnpacker(_test, sinks={'len': print}).unpack(b'\x00'))
+
+        with self.assertRaises(ValueError):
+            list(StreamUnpacker(_test, sinks={'nope': print}).unpack(b'\x00'))
+
     # def test_array_length_field_pack(self):
     #     """
     #     An array's length can be determined from a struct field.
@@ -399,6 +494,127 @@ class PackedLengthTests(unittest.TestCase):
             self.s.dsize = 1
 
 
+class TerminatedTests(unittest.TestCase):
+    def setUp(self):
+        class _test(Structure):
+            _fields_ = [
+                ('hops', uint16_t[Terminated(0)]),
+                ('name', Byte[Terminated(b'\x00')]),
+                ('end', uint8_t),
+            ]
+
+        self.test_type = _test
+        self.packed = b'\x01\x00\x00\x01\x00\x00ab\x00\x07'
+
+    def test_pack(self):
+        """
+        A terminated array packs with its sentinel.
+        """
+        s = self.test_type()
+        s.hops = [1, 0x100]
+        s.name = b'ab'
+        s.end = 7
+
+        self.assertEqual(bytes(s), self.packed)
+        self.assertEqual(s.packed_size(), len(self.packed))
+
+    def test_unpack(self):
+        """
+        A terminated array unpacks up to its sentinel, which must be at an
+        element boundary.
+        """
+        s = self.test_type()
+
+        self.assertEqual(s.unpack(self.packed), len(self.packed))
+        self.assertEqual(s.hops, [1, 0x100])
+        self.assertEqual(s.name, b'ab')
+        self.assertEqual(s.end, 7)
+
+    def test_unpack_stream(self):
+        """
+        A terminated array can be unpacked from a stream a byte at a time.
+        """
+        stream = StreamUnpacker(self.test_type)
+        values = []
+
+        for i in range(len(self.packed)):
+            values.extend(stream.unpack(self.packed[i:i + 1]))
+
+        self.assertEqual(len(values), 1)
+        self.assertEqual(values[0].hops, [1, 0x100])
+        self.assertEqual(values[0].name, b'ab')
+
+    def test_variable_size_elements(self):
+        """
+        Arrays of variable size elements are terminated too.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('values', varuint[Terminated(0)]),
+            ]
+
+        s = _test()
+        s.values = [300, 1]
+
+        self.assertEqual(bytes(s), b'\xac\x02\x01\x00')
+
+        other = _test()
+        self.assertEqual(other.unpack(b'\xac\x02\x01\x00\xff'), 4)
+        self.assertEqual(other.values, [300, 1])
+
+    def test_invalid(self):
+        """
+        Values containing the sentinel raise ``TypeError``; a missing
+        sentinel raises ``ValueError``.
+        """
+        s = self.test_type()
+
+        with self.assertRaises(TypeError):
+            s.hops = [1, 0, 2]
+
+        with self.assertRaises(ValueError):
+            s.unpack(b'\x01\x00\x02\x00')
+
+
+class RemainingTests(unittest.TestCase):
+    def setUp(self):
+        class _test(Structure):
+            _fields_ = [
+                ('dsize', uint8_t),
+                ('data', PackedLength(uint32_t[Remaining()], 'dsize')),
+                ('end', uint8_t),
+            ]
+
+        self.test_type = _test
+
+    def test_unpack(self):
+        """
+        A Remaining array unpacks all the bytes of its PackedLength.
+        """
+        s = self.test_type()
+        packed = b'\x08' + bytes(uint32_t[2](value=[1, 2])) + b'\x07'
+
+        self.assertEqual(s.unpack(packed), len(packed))
+        self.assertEqual(s.data, [1, 2])
+        self.assertEqual(s.end, 7)
+
+    def test_pack(self):
+        """
+        A Remaining array packs its elements.
+        """
+        s = self.test_type()
+        s.data = [1, 2, 3]
+
+        self.assertEqual(bytes(s), b'\x0c' + bytes(uint32_t[3](value=[1, 2, 3])) + b'\x00')
+
+    def test_partial_element(self):
+        """
+        Bytes that are not a whole number of elements raise ``ValueError``.
+        """
+        with self.assertRaises(ValueError):
+            self.test_type().unpack(b'\x06' + bytes(6) + b'\x07')
+
+
 def _test_field_struct(field_type):
     class _test(Structure):
         _fields_ = [
@@ -0,0 +1,121 @@
+import unittest
+
+from tamp import *
+
+
+class _header(Structure):
+    _fields_ = [
+        ('hdr', Bits(uint16_t.be, [('ver', 3), ('flags', 5), ('seq', 8)])),
+        ('len', uint8_t),
+    ]
+
+
+class BitsTests(unittest.TestCase):
+    def test_get_bits(self):
+        """
+        Bit fields are read from the word, least significant bits first.
+        """
+        s = _header()
+        s.unpack(b'\xab\x0a\x01')
+
+        self.assertEqual(s.hdr, 0xab0a)
+        self.assertEqual(s.ver, 0x2)
+        self.assertEqual(s.flags, 0x1)
+        self.assertEqual(s.seq, 0xab)
+
+    def test_set_bits(self):
+        """
+        Setting a bit field only changes its bits of the word.
+        """
+        s = _header()
+        s.hdr = 0xffff
+        s.flags = 0
+
+        self.assertEqual(s.hdr, 0xff07)
+        self.assertEqual(bytes(s), b'\xff\x07\x00')
+
+    def test_set_invalid(self):
+        """
+        Values that do not fit in a bit field raise ``TypeError``.
+        """
+        s = _header()
+
+        with self.assertRaises(TypeError):
+            s.ver = 8
+
+        with self.assertRaises(TypeError):
+            s.seq = -1
+
+    def test_reserved(self):
+        """
+        Reserved bits are skipped.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('flags', Bits(uint8_t, [('a', 1), (None, 6), ('b', 1)])),
+            ]
+
+        s = _test()
+        s.b = 1
+
+        self.assertEqual(s.flags, 0x80)
+        self.assertEqual(s.a, 0)
+
+    def test_byte_order_variants(self):
+        """
+        The ``.le`` and ``.be`` variants of a bits type have the same bit
+        fields.
+        """
+        hdr_type = Bits(uint16_t, [('lo', 8), ('hi', 8)])
+        self.assertIs(hdr_type.le, hdr_type)
+        self.assertIs(hdr_type.be.le, hdr_type)
+
+        for field_type, packed in ((hdr_type.le, b'\x01\x02'), (hdr_type.be, b'\x02\x01')):
+            class _test(Structure):
+                _fields_ = [
+                    ('hdr', field_type),
+                ]
+
+            s = _test()
+            s.unpack(packed)
+            self.assertEqual((s.lo, s.hi), (0x01, 0x02))
+
+            s.hi = 0x03
+            self.assertEqual(bytes(s), packed.replace(b'\x02', b'\x03'))
+
+    def test_codec(self):
+        """
+        Bit fields are part of a struct's compiled codec.
+        """
+        self.assertIsNotNone(_header._cls_codec())
+
+    def test_from_buffer(self):
+        """
+        Bit fields of buffer backed structs are written to the buffer.
+        """
+        buf = bytearray(3)
+        s = _header.from_buffer(buf)
+        s.seq = 0x12
+
+        self.assertEqual(buf, b'\x12\x00\x00')
+
+    def test_invalid_definition(self):
+        """
+        Bit fields must fit in an unsigned type and not shadow other fields.
+        """
+        with self.assertRaises(ValueError):
+            Bits(uint8_t, [('a', 4), ('b', 5)])
+
+        with self.assertRaises(ValueError):
+            Bits(int8_t, [('a', 4)])
+
+        with self.assertRaises(ValueError):
+            class _test(Structure):
+                _fields_ = [
+                    ('a', uint8_t),
+                    ('flags', Bits(uint8_t, [('a', 1)])),
+                ]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import array
+import enum
+import unittest
+
+from tamp import *
+
+
+class _Color(enum.IntEnum):
+    red = 1
+    green = 2
+
+
+class _point(Structure):
+    _fields_ = [
+        ('x', int16_t),
+        ('y', uint32_t),
+        ('color', EnumWrap(_Color, uint8_t)),
+    ]
+
+
+class _inner(Structure):
+    _fields_ = [
+        ('len', uint8_t),
+        ('name', Byte[LengthField('len')]),
+    ]
+
+
+class _record(Structure):
+    _fields_ = [
+        ('id', uint16_t.be),
+        ('inner', _inner),
+        ('samples', uint8_t[2]),
+        ('check', Computed(uint8_t, '_calc_check')),
+    ]
+
+    def _calc_check(self):
+        return (self.id + self.inner.len) & 0xff
+
+
+def _make_record(i):
+    record = _record()
+    record.id = i
+    record.inner.name = b'n' * i
+    record.samples = [i, i + 1]
+
+    return record
+
+
+class UnpackColumnsTests(unittest.TestCase):
+    def test_flat(self):
+        """
+        A struct of integer and enum fields unpacks into arrays.
+        """
+        points = []
+        for i in range(5):
+            point = _point()
+            point.x = -i
+            point.y = i * 1000
+            point.color = _Color.green if i % 2 else _Color.red
+            points.append(point)
+
+        columns = unpack_columns(_point, b''.join(bytes(point) for point in points))
+
+        self.assertEqual(list(columns), ['x', 'y', 'color'])
+        self.assertEqual(columns['x'], array.array('h', [0, -1, -2, -3, -4]))
+        self.assertEqual(list(columns['y']), [0, 1000, 2000, 3000, 4000])
+        self.assertIs(columns['color'].enum, _Color)
+        self.assertEqual(list(columns['color'].codes), [1, 2, 1, 2, 1])
+
+    def test_flat_invalid_enum(self):
+        """
+        Enum codes are still validated.
+        """
+        with self.assertRaises(ValueError):
+            unpack_columns(_point, b'\x00\x00\x00\x00\x00\x00\x03')
+
+    def test_count(self):
+        """
+        At most ``count`` values are unpacked.
+        """
+        columns = unpack_columns(_point, bytes(_point()) * 3, count=2)
+        self.assertEqual(len(columns['x']), 2)
+
+        columns = unpack_columns(_record, b''.join(bytes(_make_record(i)) for i in range(3)), count=2)
+        self.assertEqual(list(columns['id']), [0, 1])
+
+    def test_variable(self):
+        """
+        Variable length structs unpack into columns, flattening nested
+        structs.
+        """
+        buf = b''.join(bytes(_make_record(i)) for i in range(4))
+        columns = unpack_columns(_record, buf)
+
+        self.assertEqual(list(columns), ['id', 'inner.len', 'inner.name', 'samples', 'check'])
+        self.assertEqual(list(columns['id']), [0, 1, 2, 3])
+        self.assertEqual(list(columns['inner.len']), [0, 1, 2, 3])
+        self.assertIsInstance(columns['inner.name'][0], memoryview)
+        self.assertEqual([bytes(name) for name in columns['inner.name']], [b'', b'n', b'nn', b'nnn'])
+        self.assertEqual(columns['samples'], [(0, 1), (1, 2), (2, 3), (3, 4)])
+        self.assertEqual(list(columns['check']), [0, 2, 4, 6])
+
+    def test_variable_checks(self):
+        """
+        Computed fields are still checked.
+        """
+        buf = bytearray(bytes(_make_record(1)))
+        buf[-1] = 0
+
+        with self.assertRaises(ValueError):
+            unpack_columns(_record, buf)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from tamp import *
+
+
+class _fixed(Structure):
+    _fields_ = [
+        ('timestamp', uint32_t),
+        ('reading', uint16_t),
+    ]
+
+
+class _variable(Structure):
+    _fields_ = [
+        ('timestamp', uint32_t),
+        ('len', uint8_t),
+        ('data', uint8_t[LengthField('len')]),
+    ]
+
+
+class RecordFileTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def _write(self, records, name='records.bin'):
+        path = os.path.join(self.dir, name)
+
+        with open(path, 'wb') as fileobj:
+            for record in records:
+                record.pack_to(fileobj)
+
+        return path
+
+    def _variable_records(self, count):
+        records = []
+        for i in range(count):
+            record = _variable()
+            record.timestamp = i * 10
+            record.data = list(range(i % 7))
+            records.append(record)
+
+        return records
+
+    def test_fixed_size_records(self):
+        """
+        Fixed size records are located without walking the file.
+        """
+        records = []
+        for i in range(5):
+            record = _fixed()
+            record.timestamp = i
+            record.reading = i * 2
+            records.append(record)
+
+        with RecordFile(self._write(records), _fixed) as record_file:
+            self.assertEqual(len(record_file), 5)
+            self.assertEqual(record_file.offset(3), 18)
+            self.assertEqual(record_file[3], records[3])
+            self.assertEqual(record_file[-1], records[-1])
+            self.assertEqual(list(record_file), records)
+
+    def test_variable_size_records(self):
+        """
+        Variable size records are indexed by walking the file.
+        """
+        records = self._variable_records(20)
+
+        with RecordFile(self._write(records), _variable) as record_file:
+            self.assertEqual(len(record_file), 20)
+            self.assertEqual(record_file[13], records[13])
+            self.assertEqual(record_file[2:5], records[2:5])
+
+    def test_bisect(self):
+        """
+        Records can be located by a sorted field.
+        """
+        records = self._variable_records(20)
+
+        with RecordFile(self._write(records), _variable) as record_file:
+            self.assertEqual(record_file.bisect('timestamp', 55), 6)
+            self.assertEqual(record_file.bisect('timestamp', 60), 6)
+            self.assertEqual(record_file.bisect(lambda r: r.timestamp, 1000), 20)
+
+    def test_persist_index(self):
+        """
+        A persisted index is reused while the data file is unchanged.
+        """
+        records = self._variable_records(10)
+        path = self._write(records)
+
+        RecordFile(path, _variable, persist_index=True).close()
+        self.assertTrue(os.path.exists(path + '.idx'))
+
+        with mock.patch.object(RecordFile, '_build_index', side_effect=AssertionError):
+            with RecordFile(path, _variable, persist_index=True) as record_file:
+                self.assertEqual(list(record_file), records)
+
+        # A stale index is rebuilt.
+        with open(path, 'ab') as fileobj:
+            records[0].pack_to(fileobj)
+
+        with RecordFile(path, _variable, persist_index=True) as record_file:
+            self.assertEqual(len(record_file), 11)
+            self.assertEqual(record_file[-1], records[0])
+
+    def test_persist_index_rewritten(self):
+        """
+        A persisted index is rebuilt if the data file was rewritten, even to
+        the same size.
+        """
+        records = self._variable_records(10)
+        path = self._write(records)
+        RecordFile(path, _variable, persist_index=True).close()
+        mtime_ns = os.stat(path).st_mtime_ns
+
+        records = records[1:] + records[:1]
+        self._write(records)
+        os.utime(path, ns=(mtime_ns + 10 ** 9, mtime_ns + 10 ** 9))
+
+        with RecordFile(path, _variable, persist_index=True) as record_file:
+            self.assertEqual(list(record_file), records)
+
+    def test_empty_file(self):
+        """
+        An empty file contains no records.
+        """
+        with RecordFile(self._write([]), _variable) as record_file:
+            self.assertEqual(len(record_file), 0)
+            self.assertEqual(list(record_file), [])
+
+    def test_partial_record(self):
+        """
+        A partial record at the end of the file is ignored, whether records
+        have a fixed size or not; invalid records still raise.
+        """
+        for record_type, records in ((_fixed, [_fixed(), _fixed()]), (_variable, self._variable_records(3))):
+            path = self._write(records)
+            with open(path, 'ab') as fileobj:
+                fileobj.write(bytes(records[-1])[:-1])
+
+            with RecordFile(path, record_type) as record_file:
+                self.assertEqual(list(record_file), records)
+
+        class _checked(Structure):
+            _fields_ = [
+                ('len', varuint),
+                ('data', uint8_t[LengthField('len')]),
+            ]
+
+        path = self._write([])
+        with open(path, 'wb') as fileobj:
+            fileobj.write(b'\x80' * 11)
+
+        with self.assertRaisesRegex(ValueError, 'longer than 10 bytes'):
+            RecordFile(path, _checked)
+
+    def test_close_with_views(self):
+        """
+        A file can be closed while records with ``ByteView`` fields, which
+        are views of it, are alive.
+        """
+        class _blob(Structure):
+            _fields_ = [
+                ('len', uint8_t),
+                ('data', ByteView[LengthField('len')]),
+            ]
+
+        record = _blob()
+        record.data = b'abc'
+
+        with RecordFile(self._write([record, record]), _blob) as record_file:
+            first = record_file[0]
+
+        self.assertEqual(bytes(first.data), b'abc')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+import array
 import struct
 
 from tamp import *
@@ -149,6 +150,118 @@ class TestIntTypes(unittest.TestCase):
             f = field_type(min_val - 1)
 
 
+class OddIntTests(unittest.TestCase):
+    def test_factory(self):
+        """
+        ``uint_t``/``int_t`` return one type per width, with byte order
+        variants, and the standard types for standard widths.
+        """
+        self.assertIs(uint_t(24), uint_t(24))
+        self.assertIs(uint_t(24).le, uint_t(24))
+        self.assertIsNot(uint_t(24).be, uint_t(24))
+        self.assertIs(uint_t(24).be.le, uint_t(24))
+        self.assertIs(uint16_t.be.be, uint16_t.network)
+        self.assertIs(uint_t(16), uint16_t)
+        self.assertIs(int_t(64), int64_t)
+
+        with self.assertRaises(ValueError):
+            uint_t(12)
+
+    def test_pack_unpack(self):
+        """
+        Odd width integers pack and unpack in either byte order.
+        """
+        for int_type, value, packed in (
+                (uint_t(24), 0x010203, b'\x03\x02\x01'),
+                (uint_t(24).be, 0x010203, b'\x01\x02\x03'),
+                (int_t(24), -2, b'\xfe\xff\xff'),
+                (int_t(48).be, -(2 ** 47), b'\x80\x00\x00\x00\x00\x00')):
+            self.assertEqual(bytes(int_type(value)), packed)
+
+            field = int_type()
+            self.assertEqual(field.unpack(packed + b'\x00'), len(packed))
+            self.assertEqual(field.value, value)
+
+    def test_bounds(self):
+        """
+        Values outside of the range of the width raise ``TypeError``.
+        """
+        _test_int_bounds = TestIntTypes._test_int_bounds
+
+        _test_int_bounds(self, uint_t(24), 24, False)
+        _test_int_bounds(self, int_t(40).be, 40, True)
+
+    def test_array(self):
+        """
+        Arrays of odd width integers unpack in bulk.
+        """
+        for int_type in (uint_t(24), uint_t(24).be, int_t(24), int_t(24).be, int_t(72)):
+            values = [0, 1, int_type._bounds_[0], int_type._bounds_[1], 12345]
+            array = int_type[5]()
+            array.value = values
+
+            packed = b''.join(bytes(int_type(value)) for value in values)
+            self.assertEqual(bytes(array), packed)
+
+            other = int_type[5]()
+            self.assertEqual(other.unpack(packed), len(packed))
+            self.assertEqual(other.value, values)
+
+    def test_unpack_chunk_signed(self):
+        """
+        Signed odd width integers are unpacked in bulk into an array, with
+        their sign extended.
+        """
+        for int_type in (int_t(24), int_t(24).be, int_t(40)):
+            values = [0, -1, 1, int_type._bounds_[0], int_type._bounds_[1], -12345]
+            packed = b''.join(bytes(int_type(value)) for value in values)
+
+            chunk = int_type._unpack_chunk(packed)
+            self.assertIsInstance(chunk, array.array)
+            self.assertEqual(list(chunk), values)
+
+    def test_struct_codec(self):
+        """
+        Odd width integers are part of a struct's compiled codec.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('a', uint8_t),
+                ('b', uint_t(24).be),
+                ('c', int_t(48)),
+            ]
+
+        self.assertIsNotNone(_test._cls_codec())
+
+        s = _test()
+        s.a = 1
+        s.b = 0x020304
+        s.c = -1
+
+        packed = b'\x01\x02\x03\x04' + b'\xff' * 6
+        self.assertEqual(bytes(s), packed)
+
+        other = _test()
+        other.unpack(packed)
+        self.assertEqual(other, s)
+
+    def test_from_buffer(self):
+        """
+        Odd width integers can be part of buffer backed structs.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('a', uint_t(24)),
+            ]
+
+        buf = bytearray(3)
+        s = _test.from_buffer(buf)
+        s.a = 0x010203
+
+        self.assertEqual(buf, b'\x03\x02\x01')
+        self.assertEqual(s.a, 0x010203)
+
+
 def _test_field_struct(field_type):
     class _test(Structure):
         _fields_ = [
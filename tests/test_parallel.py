@@ -0,0 +1,263 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+from tamp import *
+import tamp._parallel
+
+
+class _fixed(Structure):
+    _fields_ = [
+        ('a', uint16_t),
+        ('b', int8_t[2]),
+    ]
+
+
+class _blob(Structure):
+    _fields_ = [
+        ('len', uint8_t),
+        ('data', ByteView[LengthField('len')]),
+    ]
+
+
+class _variable(Structure):
+    _fields_ = [
+        ('len', uint8_t),
+        ('data', uint16_t[LengthField('len')]),
+        ('end', uint8_t),
+    ]
+
+
+class ParallelUnpackTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def _records(self, count):
+        records = []
+        for i in range(count):
+            record = _variable()
+            record.data = list(range(i % 5))
+            record.end = i % 256
+            records.append(record)
+
+        return records
+
+    def test_fixed_size_buffer(self):
+        """
+        Fixed size records are decoded from a buffer in ordered batches.
+        """
+        records = []
+        for i in range(25):
+            record = _fixed()
+            record.a = i
+            record.b = [-i % 128, 1]
+            records.append(record)
+
+        packed = b''.join(bytes(record) for record in records)
+        batches = list(parallel_unpack(_fixed, packed, batch_size=10, executor=self.executor))
+
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        self.assertEqual([value for batch in batches for value in batch],
+                         [(i, (-i % 128, 1)) for i in range(25)])
+
+    def test_variable_size_file(self):
+        """
+        Variable size records are framed by their length fields and decoded
+        from a file.
+        """
+        records = self._records(33)
+
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'records.bin')
+
+        with open(path, 'wb') as fileobj:
+            for record in records:
+                record.pack_to(fileobj)
+
+        batches = list(parallel_unpack(_variable, path, batch_size=8, executor=self.executor))
+
+        self.assertEqual([len(batch) for batch in batches], [8, 8, 8, 8, 1])
+        self.assertEqual([value for batch in batches for value in batch],
+                         [(r.len, tuple(r.data), r.end) for r in records])
+
+    def test_namedtuple_records(self):
+        """
+        Records can be returned as namedtuples.
+        """
+        records = self._records(3)
+        packed = b''.join(bytes(record) for record in records)
+
+        batches = list(parallel_unpack(_variable, packed, executor=self.executor, decode_as='namedtuple'))
+
+        self.assertEqual([value.data for value in batches[0]], [(), (0,), (0, 1)])
+
+    def test_columns(self):
+        """
+        Batches can be returned as columns.
+        """
+        records = self._records(12)
+        packed = b''.join(bytes(record) for record in records)
+
+        batches = list(parallel_unpack(_variable, packed, batch_size=5, executor=self.executor, decode_as='columns'))
+
+        self.assertEqual([list(batch['end']) for batch in batches], [[0, 1, 2, 3, 4], [5, 6, 7, 8, 9], [10, 11]])
+
+    def test_own_pool(self):
+        """
+        A worker pool is created when no executor is given.
+        """
+        records = self._records(5)
+        packed = b''.join(bytes(record) for record in records)
+
+        batches = list(parallel_unpack(_variable, packed, workers=2))
+
+        self.assertEqual(len(batches[0]), 5)
+
+    def test_close_early(self):
+        """
+        Closing the generator early waits for the batches being decoded
+        before removing the shared copy of the input.
+        """
+        records = self._records(40)
+        packed = b''.join(bytes(record) for record in records)
+
+        batches = parallel_unpack(_variable, packed, batch_size=1, executor=self.executor)
+        self.assertEqual(len(next(batches)), 1)
+
+        with mock.patch.object(tamp._parallel, 'wait', wraps=tamp._parallel.wait) as wait:
+            batches.close()
+
+        pending, = wait.call_args[0]
+        self.assertTrue(pending)
+        self.assertTrue(all(future.done() for future in pending))
+
+    def test_without_shared_memory(self):
+        """
+        Without ``multiprocessing.shared_memory``, a buffer is shared through
+        a temporary file.
+        """
+        records = self._records(12)
+        packed = b''.join(bytes(record) for record in records)
+
+        with mock.patch.object(tamp._parallel, 'shared_memory', None):
+            batches = list(parallel_unpack(_variable, packed, batch_size=5, executor=self.executor))
+
+        self.assertEqual([len(batch) for batch in batches], [5, 5, 2])
+
+    def test_empty(self):
+        """
+        Empty input yields no batches.
+        """
+        self.assertEqual(list(parallel_unpack(_variable, b'', executor=self.executor)), [])
+
+    def test_structures(self):
+        """
+        Structures can be returned as they are.
+        """
+        records = self._records(4)
+        packed = b''.join(bytes(record) for record in records)
+
+        batches = list(parallel_unpack(_variable, packed, executor=self.executor, decode_as=None))
+
+        self.assertEqual(batches, [records])
+
+    def test_byte_views(self):
+        """
+        ``ByteView`` values are copied out of the input.
+        """
+        blob = _blob()
+        blob.data = b'abc'
+        packed = bytes(blob) * 3
+
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'blobs.bin')
+
+        with open(path, 'wb') as fileobj:
+            fileobj.write(packed)
+
+        for source in (packed, path):
+            for decode_as in ('tuple', None):
+                batches = list(parallel_unpack(_blob, source, executor=self.executor, decode_as=decode_as))
+                self.assertEqual([bytes(value[1] if decode_as else value.data) for value in batches[0]],
+                                 [b'abc'] * 3)
+
+
+def _batch_ends(batch):
+    return [record.end for record in batch]
+
+
+class StructBatchTests(unittest.TestCase):
+    def _records(self, count):
+        records = []
+        for i in range(count):
+            record = _variable()
+            record.data = list(range(i % 3))
+            record.end = i
+            records.append(record)
+
+        return records
+
+    def test_pack(self):
+        """
+        A batch packs structures back to back and unpacks them by index.
+        """
+        records = self._records(4)
+        batch = StructBatch.pack(records)
+
+        self.assertEqual(len(batch), 4)
+        self.assertEqual(bytes(batch), b''.join(bytes(record) for record in records))
+        self.assertEqual(batch[2], records[2])
+        self.assertEqual(batch[-1], records[3])
+        self.assertEqual(list(batch), records)
+
+        with self.assertRaises(IndexError):
+            batch[4]
+
+    def test_pickle(self):
+        """
+        A batch pickles as its buffer and offsets.
+        """
+        records = self._records(5)
+        batch = pickle.loads(pickle.dumps(StructBatch.pack(records)))
+
+        self.assertIs(batch.struct_type, _variable)
+        self.assertEqual(list(batch), records)
+
+    def test_executor(self):
+        """
+        A batch can be sent to worker processes.
+        """
+        records = self._records(6)
+
+        with ProcessPoolExecutor(1) as executor:
+            ends = executor.submit(_batch_ends, StructBatch.pack(records)).result()
+
+        self.assertEqual(ends, list(range(6)))
+
+    def test_invalid(self):
+        """
+        Structures of other types raise ``TypeError``; an empty batch needs a
+        type.
+        """
+        with self.assertRaises(TypeError):
+            StructBatch.pack([_variable(), _fixed()])
+
+        with self.assertRaises(ValueError):
+            StructBatch.pack([])
+
+        self.assertEqual(len(StructBatch.pack([], _fixed)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,310 @@
+import unittest
+import asyncio
+import io
+import socket
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from tamp import *
+
+
+class _pkt(Structure):
+    _fields_ = [
+        ('len', uint8_t),
+        ('data', uint8_t[LengthField('len')]),
+    ]
+
+
+def _make_pkt(data):
+    pkt = _pkt()
+    pkt.data = data
+
+    return pkt
+
+
+class StreamUnpackerTests(unittest.TestCase):
+    def test_receive_into_buffer(self):
+        """
+        Data can be received directly into the unpacker's buffer.
+        """
+        pkts = [_make_pkt(list(range(i))) for i in range(10)]
+        source = io.BytesIO(b''.join(bytes(pkt) for pkt in pkts))
+        stream = StreamUnpacker(_pkt)
+
+        values = []
+        while True:
+            received = source.readinto(stream.get_buffer(5)[:5])
+            if not received:
+                break
+
+            stream.commit(received)
+            values.extend(stream.unpack())
+
+        self.assertEqual(values, pkts)
+        self.assertEqual(len(stream), 0)
+
+    def test_get_buffer_size(self):
+        """
+        ``get_buffer`` offers at least the requested amount of space.
+        """
+        stream = StreamUnpacker(_pkt)
+
+        self.assertGreaterEqual(len(stream.get_buffer(100000)), 100000)
+        self.assertGreater(len(stream.get_buffer()), 0)
+
+    def test_grow_with_view_held(self):
+        """
+        The buffer can grow while a view from ``get_buffer`` is still held.
+        """
+        stream = StreamUnpacker(_pkt)
+        buf = stream.get_buffer(10)
+        buf[:3] = b'\x02\x01\x02'
+        stream.commit(3)
+
+        self.assertGreaterEqual(len(stream.get_buffer(100000)), 100000)
+        self.assertEqual(stream.unpack_one(b'\x01' * 200000), _make_pkt([1, 2]))
+        self.assertEqual(len(stream), 200000)
+        del buf
+
+    def test_commit_too_much(self):
+        """
+        Committing more than the free space raises ``ValueError``.
+        """
+        stream = StreamUnpacker(_pkt)
+        free = len(stream.get_buffer(10))
+
+        with self.assertRaises(ValueError):
+            stream.commit(free + 1)
+
+    def test_recover_after_error(self):
+        """
+        After a value fails to unpack, the next value is unpacked afresh from
+        the following bytes.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('a', uint8_t),
+                ('c', Const(b'\xff')),
+            ]
+
+        stream = StreamUnpacker(_test)
+
+        with self.assertRaises(ValueError):
+            list(stream.unpack(b'\x01\x00'))
+
+        values = list(stream.unpack(b'\x02\xff'))
+        self.assertEqual([value.a for value in values], [2])
+
+    def test_buffered_protocol(self):
+        """
+        The unpacker can back an ``asyncio.BufferedProtocol``.
+        """
+        pkts = [_make_pkt([i] * i) for i in range(50)]
+        values = []
+
+        class _protocol(asyncio.BufferedProtocol):
+            def __init__(self):
+                self.stream = StreamUnpacker(_pkt)
+                self.done = loop.create_future()
+
+            def get_buffer(self, sizehint):
+                return self.stream.get_buffer(sizehint)
+
+            def buffer_updated(self, nbytes):
+                self.stream.commit(nbytes)
+                values.extend(self.stream.unpack())
+
+            def eof_received(self):
+                self.done.set_result(None)
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        reader, writer = socket.socketpair()
+        self.addCleanup(writer.close)
+
+        writer.sendall(b''.join(bytes(pkt) for pkt in pkts))
+        writer.shutdown(socket.SHUT_WR)
+
+        transport, protocol = loop.run_until_complete(loop.connect_accepted_socket(_protocol, reader))
+        loop.run_until_complete(protocol.done)
+        transport.close()
+
+        self.assertEqual(values, pkts)
+
+
+class StreamPackerTests(unittest.TestCase):
+    def setUp(self):
+        self.writes = []
+        self.packer = StreamPacker(lambda buf: self.writes.append(bytes(buf)), flush_size=8)
+
+    def test_pack_flush(self):
+        """
+        Packed values are written in one batch on flush.
+        """
+        self.packer.pack(_make_pkt([1]))
+        self.packer.pack(_make_pkt([2, 3]))
+
+        self.assertEqual(self.writes, [])
+        self.assertEqual(len(self.packer), 5)
+
+        self.packer.flush()
+
+        self.assertEqual(self.writes, [b'\x01\x01\x02\x02\x03'])
+        self.assertEqual(len(self.packer), 0)
+
+    def test_flush_size(self):
+        """
+        Pending values are written once ``flush_size`` bytes are buffered.
+        """
+        self.packer.pack_many(_make_pkt([i, i]) for i in range(4))
+
+        self.assertEqual(self.writes, [b'\x02\x00\x00\x02\x01\x01\x02\x02\x02'])
+        self.assertEqual(len(self.packer), 3)
+
+    def test_flush_empty(self):
+        """
+        Flushing with nothing pending writes nothing.
+        """
+        self.packer.flush()
+
+        self.assertEqual(self.writes, [])
+
+    def test_round_trip(self):
+        """
+        Batched output unpacks to the original values.
+        """
+        pkts = [_make_pkt(list(range(i))) for i in range(10)]
+
+        self.packer.pack_many(pkts)
+        self.packer.flush()
+
+        stream = StreamUnpacker(_pkt)
+        values = []
+        for buf in self.writes:
+            values.extend(stream.unpack(buf))
+
+        self.assertEqual(values, pkts)
+
+
+class TransportPackerTests(unittest.TestCase):
+    def test_flush_per_loop_iteration(self):
+        """
+        Everything packed in one event loop iteration is written at once.
+        """
+        class _transport:
+            def __init__(self):
+                self.writes = []
+
+            def write(self, data):
+                self.writes.append(data)
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        transport = _transport()
+        packer = TransportPacker(transport, loop=loop)
+
+        def _send():
+            packer.pack(_make_pkt([1]))
+            packer.pack(_make_pkt([2]))
+            loop.call_soon(_send_more)
+
+        def _send_more():
+            packer.pack(_make_pkt([3]))
+            loop.call_soon(loop.stop)
+
+        loop.call_soon(_send)
+        loop.run_forever()
+
+        self.assertEqual(transport.writes, [b'\x01\x01\x01\x02', b'\x01\x03'])
+
+
+class PipelinedUnpackerTests(unittest.TestCase):
+    def test_unpack_file(self):
+        """
+        Values are unpacked in order from a file read in small pieces.
+        """
+        pkts = [_make_pkt(list(range(i % 9))) for i in range(100)]
+        source = io.BytesIO(b''.join(bytes(pkt) for pkt in pkts))
+
+        with PipelinedUnpacker(_pkt, source, workers=3, recv_size=7) as pipeline:
+            self.assertEqual(list(pipeline), pkts)
+
+    def test_unpack_socket(self):
+        """
+        Values are unpacked from a socket as they arrive.
+        """
+        pkts = [_make_pkt([i, i + 1]) for i in range(20)]
+        reader, writer = socket.socketpair()
+        self.addCleanup(reader.close)
+
+        def _send():
+            with writer:
+                for pkt in pkts:
+                    writer.sendall(bytes(pkt))
+
+        sender = threading.Thread(target=_send)
+        sender.start()
+
+        with PipelinedUnpacker(_pkt, reader, max_pending=4) as pipeline:
+            self.assertEqual(list(pipeline), pkts)
+
+        sender.join()
+
+    def test_incomplete(self):
+        """
+        ``ValueError`` is raised if the stream ends inside a value.
+        """
+        source = io.BytesIO(bytes(_make_pkt([1, 2])) + b'\x05\x01')
+
+        with PipelinedUnpacker(_pkt, source) as pipeline:
+            values = iter(pipeline)
+
+            self.assertEqual(next(values), _make_pkt([1, 2]))
+            with self.assertRaises(ValueError):
+                next(values)
+
+    def test_invalid(self):
+        """
+        A value that cannot be framed raises its error rather than waiting
+        for more bytes.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('len', varuint),
+                ('data', uint8_t[LengthField('len')]),
+            ]
+
+        source = io.BytesIO(b'\x80' * 20 + b'\x00' * 100)
+
+        with PipelinedUnpacker(_test, source, recv_size=8) as pipeline:
+            with self.assertRaisesRegex(ValueError, 'longer than 10 bytes'):
+                list(pipeline)
+
+    def test_close(self):
+        """
+        Closing the pipeline stops a reader waiting for room in the queue.
+        """
+        source = io.BytesIO(bytes(_make_pkt([1, 2])) * 100)
+
+        with PipelinedUnpacker(_pkt, source, max_pending=2) as pipeline:
+            self.assertEqual(next(iter(pipeline)), _make_pkt([1, 2]))
+
+        pipeline._reader.join(5)
+        self.assertFalse(pipeline._reader.is_alive())
+
+    def test_process_pool(self):
+        """
+        Values can be decoded as records by worker processes.
+        """
+        pkts = [_make_pkt([i, i + 1]) for i in range(20)]
+        source = io.BytesIO(b''.join(bytes(pkt) for pkt in pkts))
+
+        with ProcessPoolExecutor(2) as executor:
+            with PipelinedUnpacker(_pkt, source, executor=executor, decode_as='tuple') as pipeline:
+                self.assertEqual(list(pipeline), [pkt.as_record('tuple') for pkt in pkts])
+
+
+if __name__ == '__main__':
+    unittest.main()
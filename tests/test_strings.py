@@ -150,3 +150,251 @@ class BytesTests(unittest.TestCase):
         # ArrayType
         self.assertEqual(Byte[5]().size(), 5)
         self.assertEqual(Byte[0]().size(), 0)
+
+    def test_bytes_unpack_stream_partial(self):
+        """
+        A Byte array takes whatever part of it is available from a stream.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('len', uint16_t),
+                ('data', Byte[LengthField('len')]),
+            ]
+
+        data = bytes(range(256)) * 4
+        packed = len(data).to_bytes(2, 'little') + data
+
+        stream = StreamUnpacker(_test)
+        values = []
+        for start in range(0, len(packed), 100):
+            values.extend(stream.unpack(packed[start:start + 100]))
+
+        self.assertEqual(len(values), 1)
+        self.assertEqual(values[0].data, data)
+
+    def test_bytes_init_bytearray(self):
+        """
+        A Byte array can be initialized from any bytes-like object.
+        """
+        self.assertEqual(Byte[3](value=bytearray(b'123')).value, b'123')
+        self.assertEqual(Byte[3](value=memoryview(b'123')).value, b'123')
+
+
+class ByteViewTests(unittest.TestCase):
+    def setUp(self):
+        class _test(Structure):
+            _fields_ = [
+                ('len', uint8_t),
+                ('data', ByteView[LengthField('len')]),
+                ('end', uint8_t),
+            ]
+
+        self.test_type = _test
+
+    def test_unpack_view(self):
+        """
+        A ByteView array unpacked from a buffer is a view of the buffer.
+        """
+        buf = bytearray(b'\x03abc\x01')
+        s = self.test_type()
+        s.unpack(buf)
+
+        self.assertIsInstance(s.data, memoryview)
+        self.assertEqual(s.data, b'abc')
+        self.assertEqual(s.end, 1)
+
+        buf[1:2] = b'x'
+        self.assertEqual(s.data, b'xbc')
+
+    def test_pack(self):
+        """
+        A ByteView array packs like a Byte array.
+        """
+        s = self.test_type()
+        s.unpack(b'\x03abc\x01')
+
+        self.assertEqual(bytes(s), b'\x03abc\x01')
+
+        s.data = b'de'
+        self.assertEqual(bytes(s), b'\x02de\x01')
+
+    def test_record(self):
+        """
+        A ByteView array is copied into records.
+        """
+        s = self.test_type()
+        s.unpack(b'\x03abc\x01')
+
+        self.assertEqual(s.as_record(), (3, b'abc', 1))
+
+    def test_unpack_stream(self):
+        """
+        A ByteView array unpacked from a stream is a copy.
+        """
+        stream = StreamUnpacker(self.test_type)
+        s, = stream.unpack(b'\x03abc\x01')
+
+        self.assertEqual(bytes(s.data), b'abc')
+
+
+class CStringTests(unittest.TestCase):
+    def setUp(self):
+        class _test(Structure):
+            _fields_ = [
+                ('name', CString(8)),
+                ('end', uint8_t),
+            ]
+
+        self.test_type = _test
+
+    def test_unpack(self):
+        """
+        A CString unpacks up to and including its terminator.
+        """
+        s = self.test_type()
+
+        self.assertEqual(s.unpack(b'abc\x00\x01'), 5)
+        self.assertEqual(s.name, b'abc')
+        self.assertEqual(s.end, 1)
+
+    def test_unpack_memoryview(self):
+        """
+        A CString can be unpacked from a memoryview.
+        """
+        s = CString()()
+        buf = memoryview(b'x' * 500 + b'\x00yz')
+
+        self.assertEqual(s.unpack(buf), 501)
+        self.assertEqual(s.value, b'x' * 500)
+
+    def test_pack(self):
+        """
+        A CString packs with its terminator.
+        """
+        s = self.test_type()
+        s.name = b'abc'
+
+        self.assertEqual(bytes(s), b'abc\x00\x00')
+        self.assertEqual(s.name, b'abc')
+
+    def test_invalid(self):
+        """
+        Values that are too long or contain NUL bytes raise ``TypeError``;
+        missing terminators raise ``ValueError``.
+        """
+        s = self.test_type()
+
+        with self.assertRaises(TypeError):
+            s.name = b'a' * 8
+
+        with self.assertRaises(TypeError):
+            s.name = b'a\x00b'
+
+        with self.assertRaises(ValueError):
+            s.unpack(b'abc')
+
+        with self.assertRaises(ValueError):
+            s.unpack(b'a' * 10 + b'\x00\x01')
+
+    def test_unpack_max_len(self):
+        """
+        Unpacking exactly ``max_len`` bytes without a terminator raises
+        ``ValueError``, as more bytes could not complete the value.
+        """
+        s = self.test_type()
+
+        with self.assertRaises(ValueError) as cm:
+            s.unpack(b'a' * 8)
+
+        self.assertNotIsInstance(cm.exception, IncompleteError)
+
+    def test_unpack_stream(self):
+        """
+        A CString can be unpacked from a stream a byte at a time.
+        """
+        packed = b'hello\x00\x01'
+        stream = StreamUnpacker(self.test_type)
+        values = []
+
+        for i in range(len(packed)):
+            values.extend(stream.unpack(packed[i:i + 1]))
+
+        self.assertEqual(len(values), 1)
+        self.assertEqual(values[0].name, b'hello')
+        self.assertEqual(values[0].end, 1)
+
+    def test_unpack_stream_max_len(self):
+        """
+        Streaming ``max_len`` bytes without a terminator raises ``ValueError``.
+        """
+        stream = StreamUnpacker(self.test_type)
+
+        with self.assertRaises(ValueError):
+            list(stream.unpack(b'a' * 8))
+
+
+class TextTests(unittest.TestCase):
+    def setUp(self):
+        class _test(Structure):
+            _fields_ = [
+                ('name_len', uint8_t),
+                ('name', Text('utf-8', LengthField('name_len'))),
+                ('city', Text('utf-8', 6)),
+                ('note', Text('latin-1')),
+            ]
+
+        self.test_type = _test
+
+    def test_pack(self):
+        """
+        Text is encoded; fixed length text is NUL padded.
+        """
+        s = self.test_type()
+        s.name = 'J\u00f6rg'
+        s.city = 'Ulm'
+        s.note = '\u00e9'
+
+        self.assertEqual(bytes(s), b'\x05J\xc3\xb6rgUlm\x00\x00\x00\xe9\x00')
+
+    def test_unpack(self):
+        """
+        Text is decoded when unpacked.
+        """
+        packed = b'\x05J\xc3\xb6rgUlm\x00\x00\x00\xe9\x00'
+        s = self.test_type()
+
+        self.assertEqual(s.unpack(packed), len(packed))
+        self.assertEqual(s.name, 'J\u00f6rg')
+        self.assertEqual(s.city, 'Ulm')
+        self.assertEqual(s.note, '\u00e9')
+
+    def test_unpack_stream(self):
+        """
+        Text can be unpacked from a stream a byte at a time.
+        """
+        packed = b'\x05J\xc3\xb6rgUlm\x00\x00\x00\xe9\x00'
+        stream = StreamUnpacker(self.test_type)
+        values = []
+
+        for i in range(len(packed)):
+            values.extend(stream.unpack(packed[i:i + 1]))
+
+        self.assertEqual(len(values), 1)
+        self.assertEqual(values[0].name, 'J\u00f6rg')
+        self.assertEqual(values[0].note, '\u00e9')
+
+    def test_invalid(self):
+        """
+        Non-str values and values too long for a fixed length raise
+        ``TypeError``; undecodable bytes raise ``ValueError``.
+        """
+        s = self.test_type()
+
+        with self.assertRaises(TypeError):
+            s.name = b'abc'
+
+        with self.assertRaises(TypeError):
+            s.city = 'Ulm an der Donau'
+
+        with self.assertRaises(ValueError):
+            s.unpack(b'\x01\xffUlm\x00\x00\x00\x00')
@@ -1,7 +1,11 @@
 import unittest
 import enum
+import io
+import pickle
+import struct
 
 from tamp import *
+from tamp._struct import _field_dependencies
 
 
 class TestStruct(unittest.TestCase):
@@ -144,6 +148,45 @@ class TestStruct(unittest.TestCase):
         # TODO: test that the fields copy!
         t.test2 = _test1()
 
+    def test_custom_field_buffer(self):
+        """
+        Field types that do not set ``_unpack_view_`` are given slices of the
+        buffer being unpacked, or bytes if it is a view (e.g. in a nested
+        structure), rather than views.
+        """
+        buffers = []
+
+        class _custom(DataType):
+            def _unpack(self, buf):
+                buffers.append(type(buf))
+                self._value = buf[0]
+                return 1
+
+        class _test(Structure):
+            _fields_ = [
+                ('a', uint8_t),
+                ('b', _custom),
+                ('c', _custom[2]),
+            ]
+
+        s = _test()
+        s.unpack(b'\x01\x02\x03\x04')
+
+        self.assertEqual(buffers, [bytes] * 3)
+        self.assertEqual(s.c, [3, 4])
+
+        class _outer(Structure):
+            _fields_ = [
+                ('inner', _test),
+            ]
+
+        del buffers[:]
+        _outer().unpack(b'\x01\x02\x03\x04')
+        list(_test.iter_unpack(b'\x01\x02\x03\x04'))
+        unpack_columns(_test, b'\x01\x02\x03\x04')
+
+        self.assertEqual(buffers, [bytes] * 9)
+
     def test_unpack_callback(self):
         """
         A structure calls its unpacked callbacks after unpacking all fields.
@@ -191,6 +234,241 @@ class TestStruct(unittest.TestCase):
 
         self.assertEqual([s], values)
 
+    def test_unpack_stream_resumes(self):
+        """
+        Resuming a partially unpacked struct does not restart its fields.
+        """
+        started = []
+
+        class _counted(uint16_t):
+            def unpack_stream(self, stream):
+                started.append(self)
+                yield from super(_counted, self).unpack_stream(stream)
+
+        class _test(Structure):
+            _fields_ = [
+                ('a', _counted),
+                ('b', _counted),
+            ]
+
+        stream = StreamUnpacker(_test)
+
+        for byte in b'\x01\x00\x02':
+            self.assertIsNone(stream.unpack_one(bytes([byte])))
+
+        value = stream.unpack_one(b'\x00')
+
+        self.assertEqual(len(started), 2)
+        self.assertEqual((value.a, value.b), (1, 2))
+
+    def test_unpack_stream_waits(self):
+        """
+        A suspended stream is not resumed until the bytes it asked for arrive.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('a', uint32_t),
+            ]
+
+        stream = StreamUnpacker(_test)
+
+        self.assertIsNone(stream.unpack_one(b'\x01'))
+        self.assertIsNone(stream.unpack_one(b'\x00\x00'))
+        self.assertEqual(stream.unpack_one(b'\x00').a, 1)
+
+    def test_pack_iter(self):
+        """
+        A struct packs incrementally to the same bytes as ``bytes()``.
+        """
+        class _inner(Structure):
+            _fields_ = [
+                ('data', uint16_t[0]),
+            ]
+
+        class _test(Structure):
+            _fields_ = [
+                ('len', uint8_t),
+                ('dsize', uint16_t),
+                ('samples', uint32_t.be[LengthField('len')]),
+                ('inner', PackedLength(_inner, 'dsize')),
+            ]
+
+        s = _test()
+        s.samples = list(range(200))
+        s.inner.data = list(range(5000))
+        packed = bytes(s)
+
+        self.assertEqual(b''.join(s.pack_iter()), packed)
+
+        chunks = list(s.pack_iter(chunk_size=1000))
+        self.assertEqual(b''.join(chunks), packed)
+        self.assertTrue(all(len(chunk) == 1000 for chunk in chunks[:-1]))
+        self.assertEqual(packed[:3], b'\xc8\x10\x27')
+
+    def test_pack_to(self):
+        """
+        A struct can be written to a file object.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('a', uint8_t),
+                ('b', Byte[3]),
+            ]
+
+        s = _test()
+        s.a = 1
+        s.b = b'xyz'
+
+        fileobj = io.BytesIO()
+
+        self.assertEqual(s.pack_to(fileobj, chunk_size=2), 4)
+        self.assertEqual(fileobj.getvalue(), b'\x01xyz')
+
+    def test_static_size(self):
+        """
+        A struct's static size is the sum of its fields' static sizes, or
+        ``None`` if any field varies in size.
+        """
+        class _fixed(Structure):
+            _fields_ = [
+                ('a', uint8_t),
+                ('b', uint32_t[2]),
+                ('c', Const(b'xy')),
+            ]
+
+        class _variable(Structure):
+            _fields_ = [
+                ('len', uint8_t),
+                ('data', uint8_t[LengthField('len')]),
+            ]
+
+        self.assertEqual(_fixed().static_size(), 11)
+        self.assertIsNone(_variable().static_size())
+
+
+class RecordTests(unittest.TestCase):
+    def setUp(self):
+        self.s = _record_struct()
+        self.s.a = 1
+        self.s.inner.data = [2, 3]
+
+    def test_as_tuple(self):
+        """
+        A struct converts to a tuple, with nested structs and arrays as
+        tuples.
+        """
+        self.assertEqual(self.s.as_record(), (1, (2, (2, 3)), 3))
+
+    def test_as_namedtuple(self):
+        """
+        A struct converts to a namedtuple generated for its class.
+        """
+        record = self.s.as_record('namedtuple')
+
+        self.assertIsInstance(record, _record_struct._record_type_)
+        self.assertEqual(record.a, 1)
+        self.assertEqual(record.inner.data, (2, 3))
+        self.assertEqual(record.check, 3)
+        self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+
+    def test_as_dict(self):
+        """
+        A struct converts to a dict.
+        """
+        self.assertEqual(self.s.as_record('dict'), {'a': 1, 'inner': {'len': 2, 'data': (2, 3)}, 'check': 3})
+
+    def test_as_invalid(self):
+        """
+        An unknown record kind raises ``ValueError``.
+        """
+        with self.assertRaises(ValueError):
+            self.s.as_record('list')
+
+    def test_iter_unpack(self):
+        """
+        Consecutive structs can be unpacked from a buffer.
+        """
+        packed = bytes(self.s) * 3
+
+        values = list(_record_struct.iter_unpack(packed))
+        self.assertEqual(values, [self.s] * 3)
+        self.assertEqual(len(set(map(id, values))), 3)
+
+        self.assertEqual(list(_record_struct.iter_unpack(packed, decode_as='tuple')), [self.s.as_record()] * 3)
+
+    def test_iter_unpack_checks(self):
+        """
+        Computed fields are still checked when unpacking records.
+        """
+        packed = bytearray(bytes(self.s))
+        packed[-1] = 0
+
+        with self.assertRaises(ValueError):
+            list(_record_struct.iter_unpack(packed, decode_as='tuple'))
+
+    def test_unpack_stream(self):
+        """
+        A stream can produce records.
+        """
+        stream = StreamUnpacker(_record_struct, decode_as='namedtuple')
+        packed = bytes(self.s) * 2
+
+        values = []
+        for byte in (packed[i : i + 1] for i in range(len(packed))):
+            values.extend(stream.unpack(byte))
+
+        self.assertEqual(values, [self.s.as_record('namedtuple')] * 2)
+
+
+class PickleTests(unittest.TestCase):
+    def setUp(self):
+        self.s = _record_struct()
+        self.s.a = 1
+        self.s.inner.data = [2, 3]
+
+    def test_pickle(self):
+        """
+        A structure pickles as its type and packed value.
+        """
+        other = pickle.loads(pickle.dumps(self.s))
+
+        self.assertIsInstance(other, _record_struct)
+        self.assertEqual(other, self.s)
+        self.assertEqual(other.inner.data, [2, 3])
+        self.assertEqual(other.check, 3)
+
+    def test_pickle_nested(self):
+        """
+        A nested structure pickles on its own.
+        """
+        other = pickle.loads(pickle.dumps(self.s.inner))
+
+        self.assertEqual(other, self.s.inner)
+        self.assertIsNone(other._parent)
+
+    def test_pickle_trusted(self):
+        """
+        Trusted structures stay trusted.
+        """
+        s = _point(validate=False)
+        s.x = 5
+
+        other = pickle.loads(pickle.dumps(s))
+        self.assertEqual(other, s)
+        self.assertFalse(other._validate_)
+
+    def test_copy_module(self):
+        """
+        ``copy.copy`` and ``copy.deepcopy`` use :meth:`Structure.copy`.
+        """
+        import copy
+
+        for other in (copy.copy(self.s), copy.deepcopy(self.s)):
+            self.assertEqual(other, self.s)
+
+            other.inner.data = [4]
+            self.assertEqual(self.s.inner.data, [2, 3])
+
 
 class ConstFieldTests(unittest.TestCase):
     def test_const_bytes_unpack(self):
@@ -371,6 +649,1050 @@ class ComputedFieldTests(unittest.TestCase):
             s.unpack(b'\x05\x07\x00')
 
 
+class DependencyTests(unittest.TestCase):
+    def test_dependencies(self):
+        """
+        The dependencies of a field are found in the field types it is made
+        of, as well as its own.
+        """
+        field_type = PackedLength(Text('utf-8', LengthField('nlen')), 'dsize')
+
+        self.assertEqual(set(_field_dependencies(field_type)), {
+            ('size-of', 'dsize'),
+            ('length-of', 'nlen'),
+        })
+
+    def test_computed_missing_callback(self):
+        """
+        A computed field whose method does not exist raises
+        ``AttributeError`` when the structure is instantiated.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('a', uint8_t),
+                ('check', Computed(uint8_t, '_calc_chekc')),
+            ]
+
+            def _calc_check(self):
+                return self.a
+
+        with self.assertRaises(AttributeError):
+            _test()
+
+    def test_computed_subclass_callback(self):
+        """
+        The method of a computed field can be defined by subclasses.
+        """
+        class _base(Structure):
+            _fields_ = [
+                ('a', uint8_t),
+                ('check', Computed(uint8_t, '_calc_check')),
+            ]
+
+        class _test(_base):
+            def _calc_check(self):
+                return self.a + 1
+
+        s = _test()
+        s.a = 1
+
+        self.assertEqual(bytes(s), b'\x01\x02')
+
+    def test_nested_computed(self):
+        """
+        A computed field nested in another field is checked once the
+        structure is unpacked.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('size', uint8_t),
+                ('check', PackedLength(Computed(uint8_t, '_calc_check'), 'size')),
+            ]
+
+            def _calc_check(self):
+                return 9
+
+        s = _test()
+        s.unpack(b'\x01\x09')
+        self.assertEqual(s.check, 9)
+
+        with self.assertRaises(ValueError):
+            _test().unpack(b'\x01\x08')
+
+    def test_length_field_order(self):
+        """
+        A length field defined after its array raises ``ValueError`` when the
+        structure type is created.
+        """
+        with self.assertRaises(ValueError):
+            class _test(Structure):
+                _fields_ = [
+                    ('data', uint8_t[LengthField('len')]),
+                    ('len', uint8_t),
+                ]
+
+        with self.assertRaises(ValueError):
+            class _test(Structure):
+                _fields_ = [
+                    ('data', PackedLength(uint8_t[0], 'dsize')),
+                    ('dsize', uint8_t),
+                ]
+
+        # The lengths of nested field types are checked too.
+        with self.assertRaises(ValueError):
+            class _test(Structure):
+                _fields_ = [
+                    ('dsize', uint8_t),
+                    ('name', PackedLength(Text('utf-8', LengthField('nlen')), 'dsize')),
+                ]
+
+    def test_length_field_shared(self):
+        """
+        A field can only be the length of one other field.
+        """
+        with self.assertRaises(ValueError):
+            class _test(Structure):
+                _fields_ = [
+                    ('len', uint8_t),
+                    ('a', uint8_t[LengthField('len')]),
+                    ('b', uint8_t[LengthField('len')]),
+                ]
+
+    def test_inherited_length_field(self):
+        """
+        A length field can be inherited from a base structure.
+        """
+        class _base(Structure):
+            _fields_ = [
+                ('len', uint8_t),
+            ]
+
+        class _test(_base):
+            _fields_ = [
+                ('data', uint8_t[LengthField('len')]),
+            ]
+
+        s = _test()
+        s.data = [1, 2]
+        self.assertEqual(bytes(s), b'\x02\x01\x02')
+
+
+class ConstructorTests(unittest.TestCase):
+    def test_constructor_arguments(self):
+        """
+        Subclasses can have a constructor which requires arguments.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('kind', uint8_t),
+                ('data', uint16_t),
+            ]
+
+            def __init__(self, kind, **kwargs):
+                super().__init__(**kwargs)
+                self.kind = kind
+
+        s = _test(3)
+        s.data = 0x102
+
+        self.assertEqual(s.kind, 3)
+        self.assertEqual(s.copy().kind, 3)
+        self.assertEqual(bytes(s), b'\x03\x02\x01')
+
+        s.unpack(b'\x04\x05\x00')
+        self.assertEqual((s.kind, s.data), (4, 5))
+
+        points = StructArray(_test, length=2)
+        points[1] = s
+        self.assertEqual(bytes(points), b'\x00\x00\x00\x04\x05\x00')
+
+
+class CopyTests(unittest.TestCase):
+    def setUp(self):
+        class _test(Structure):
+            _fields_ = [
+                ('len', uint8_t),
+                ('data', uint8_t[LengthField('len')]),
+                ('point', _point),
+                ('points', _point[2]),
+                ('check', Computed(uint8_t, '_calc_check')),
+            ]
+
+            def _calc_check(self):
+                return sum(self.data) & 0xff
+
+        self.test_type = _test
+
+    def test_new_instances_independent(self):
+        """
+        New instances copied from the class's default instance do not share
+        any values.
+        """
+        a = self.test_type()
+        b = self.test_type()
+
+        a.data = [1, 2]
+        a.point.x = 5
+        a.points[0] = _make_point(1, 2)
+
+        self.assertEqual(bytes(b), bytes(self.test_type()))
+        self.assertEqual(b.len, 0)
+        self.assertEqual(a.len, 2)
+        self.assertEqual(a.check, 3)
+        self.assertEqual(b.point.x, 0)
+
+    def test_copy(self):
+        """
+        A copy is equal to the original, but independent of it.
+        """
+        s = self.test_type()
+        s.data = [1, 2]
+        s.point.x = 5
+        s.points[1] = _make_point(3, 4)
+
+        other = s.copy()
+        self.assertEqual(bytes(other), bytes(s))
+
+        other.data = [7, 8, 9]
+        other.point.y = 6
+        other.points[1] = _make_point(0, 0)
+
+        self.assertEqual(other.len, 3)
+        self.assertEqual(other.check, 24)
+        self.assertEqual(s.len, 2)
+        self.assertEqual(s.check, 3)
+        self.assertEqual(s.point.y, 0)
+        self.assertEqual(s.points[1], _make_point(3, 4))
+
+    def test_copy_layout_changed(self):
+        """
+        Structures laid out differently from a new instance (e.g. holding a
+        longer array of structures) are copied too.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('n', uint8_t),
+                ('items', _record_inner[LengthField('n')]),
+            ]
+
+        s = _test()
+        s.unpack(b'\x02\x01\x07\x02\x08\x09')
+
+        other = s.copy()
+        other.items[1].data = [1]
+
+        self.assertEqual(bytes(other), b'\x02\x01\x07\x01\x01')
+        self.assertEqual(bytes(s), b'\x02\x01\x07\x02\x08\x09')
+
+    def test_unpacked_callbacks(self):
+        """
+        Callbacks a field adds to its structure are bound to the field of
+        each new instance and of each copy.
+        """
+        seen = []
+
+        class _checked(uint8_t):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self._parent.add_unpacked_callback(self._check)
+
+            def _check(self, parent):
+                seen.append((self.value, parent))
+
+        class _test(Structure):
+            _fields_ = [
+                ('a', _checked),
+            ]
+
+        s = _test()
+        s.unpack(b'\x07')
+        self.assertEqual(seen, [(7, s)])
+
+        other = s.copy()
+        other.unpack(b'\x08')
+        self.assertEqual(seen[1:], [(8, other)])
+
+    def test_copy_nested(self):
+        """
+        A copy of a nested structure is not part of the enclosing structure.
+        """
+        s = self.test_type()
+        point = s.point.copy()
+        point.x = 9
+
+        self.assertEqual(s.point.x, 0)
+        self.assertEqual(point.x, 9)
+
+    def test_copy_from_buffer(self):
+        """
+        A copy of a structure created by ``from_buffer`` does not use the
+        buffer.
+        """
+        buf = bytearray(b'\x01\x02\x00')
+        s = _point.from_buffer(buf)
+        other = s.copy()
+        other.x = 7
+
+        self.assertEqual(other, _make_point(7, 2))
+        self.assertEqual(buf, b'\x01\x02\x00')
+
+    def test_copy_trusted(self):
+        """
+        Copies of trusted structures do not validate either.
+        """
+        s = self.test_type(validate=False)
+        s.point.x = 0x1ff
+
+        self.assertEqual(s.copy().point.x, 0x1ff)
+        self.assertFalse(s.copy()._validate_)
+
+
+class StructArrayTests(unittest.TestCase):
+    def setUp(self):
+        self.points = _point[3]()
+        self.points.value = [_make_point(1, 2), _make_point(3, 4), _make_point(5, 6)]
+
+    def test_array_type(self):
+        """
+        Arrays of fixed size structs are stored in one buffer, and arrays of
+        variable size structs as lists.
+        """
+        self.assertIsInstance(self.points.value, StructArray)
+        self.assertIsInstance(_record_inner[3]().value, list)
+
+    def test_default_elements(self):
+        """
+        Default elements are distinct structs.
+        """
+        points = _point[2]()
+        points.value[0] = _make_point(7, 8)
+
+        self.assertEqual(points.value[1], _point())
+
+    def test_pack_unpack(self):
+        """
+        An array of structs packs to and unpacks from the packed structs.
+        """
+        packed = b'\x01\x02\x00\x03\x04\x00\x05\x06\x00'
+        self.assertEqual(bytes(self.points), packed)
+
+        points = _point[3]()
+        self.assertEqual(points.unpack(packed), 9)
+        self.assertEqual(points.value, self.points.value)
+        self.assertEqual(points.value[2].y, 6)
+
+    def test_unpack_stream(self):
+        """
+        An array of structs can be unpacked from a stream.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('points', _point[2]),
+            ]
+
+        stream = StreamUnpacker(_test)
+        packed = b'\x01\x02\x00\x03\x04\x00'
+
+        self.assertEqual(list(stream.unpack(packed[:4])), [])
+        value, = stream.unpack(packed[4:])
+        self.assertEqual(list(value.points), [_make_point(1, 2), _make_point(3, 4)])
+
+    def test_equal_list(self):
+        """
+        An array of structs is equal to a list of the same structs.
+        """
+        self.assertEqual(self.points.value, [_make_point(1, 2), _make_point(3, 4), _make_point(5, 6)])
+        self.assertNotEqual(self.points.value, [_make_point(1, 2)])
+
+    def test_slice(self):
+        """
+        Slicing an array of structs gives a new array.
+        """
+        points = self.points.value[1:]
+
+        self.assertIsInstance(points, StructArray)
+        self.assertEqual(list(points), [_make_point(3, 4), _make_point(5, 6)])
+
+        points[0] = _make_point(0, 0)
+        self.assertEqual(self.points.value[1], _make_point(3, 4))
+
+    def test_element_view(self):
+        """
+        Assigning a field of an element changes the array.
+        """
+        self.points.value[0].x = 9
+        for point in self.points.value:
+            point.y += 1
+
+        self.assertEqual(self.points.value, [_make_point(9, 3), _make_point(3, 5), _make_point(5, 7)])
+        self.assertEqual(bytes(self.points), b'\x09\x03\x00\x03\x05\x00\x05\x07\x00')
+
+    def test_element_fields(self):
+        """
+        Fields of an element are read and assigned like those of a struct,
+        and checked.
+        """
+        point = self.points.value[1]
+
+        with self.assertRaises(TypeError):
+            point.x = 256
+
+        point.y = 0x102
+
+        self.assertEqual(point, _make_point(3, 0x102))
+        self.assertEqual(bytes(point), b'\x03\x02\x01')
+        self.assertEqual(point.copy(), _make_point(3, 0x102))
+        self.assertEqual(bytes(self.points), b'\x01\x02\x00\x03\x02\x01\x05\x06\x00')
+
+    def test_element_computed(self):
+        """
+        Assigning a field of an element updates its computed fields.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('x', uint8_t),
+                ('check', Computed(uint8_t, '_calc_check')),
+            ]
+
+            def _calc_check(self):
+                return self.x + 1
+
+        array = _test[2]()
+        array.value[0].x = 4
+
+        self.assertEqual(array.value[0].check, 5)
+        self.assertEqual(bytes(array), b'\x04\x05\x00\x01')
+
+    def test_unpack_element_held(self):
+        """
+        An array of structs can be unpacked further while an element is in
+        use; the element keeps the data it had.
+        """
+        points = StructArray(_point)
+        points.unpack(b'\x01\x02\x00')
+        point = points[0]
+
+        points.unpack(b'\x03\x04\x00')
+        point.x = 7
+
+        self.assertEqual(list(points), [_make_point(1, 2), _make_point(3, 4)])
+        self.assertEqual(point, _make_point(7, 2))
+
+    def test_set_slice(self):
+        """
+        A slice of an array of structs can be replaced by as many structs.
+        """
+        self.points.value[:2] = [_make_point(9, 9), _make_point(8, 8)]
+        self.assertEqual(self.points.value[1], _make_point(8, 8))
+
+        with self.assertRaises(TypeError):
+            self.points.value[:2] = [_make_point(9, 9)]
+
+    def test_set_invalid(self):
+        """
+        Only structs of the element type can be stored.
+        """
+        with self.assertRaises(TypeError):
+            self.points.value[0] = _record_inner()
+
+    def test_index_error(self):
+        """
+        Indexing past the end raises ``IndexError``.
+        """
+        self.assertEqual(self.points.value[-1], _make_point(5, 6))
+
+        with self.assertRaises(IndexError):
+            self.points.value[3]
+
+    def test_checks(self):
+        """
+        Unpacked structs are still checked.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('magic', Const(b'\xaa')),
+                ('x', uint8_t),
+            ]
+
+        with self.assertRaises(ValueError):
+            _test[2]().unpack(b'\xaa\x01\xab\x02')
+
+    def test_as_record(self):
+        """
+        An array of structs converts to a tuple of records.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('points', _point[2]),
+            ]
+
+        s = _test()
+        s.points = [_make_point(1, 2), _make_point(3, 4)]
+
+        self.assertEqual(s.as_record(), (((1, 2), (3, 4)),))
+
+
+class FromBufferTests(unittest.TestCase):
+    def setUp(self):
+        class _test(Structure):
+            _fields_ = [
+                ('magic', Const(b'\xaa')),
+                ('a', uint8_t),
+                ('point', _point),
+                ('data', uint8_t[2]),
+                ('check', Computed(uint16_t, '_calc_check')),
+            ]
+
+            def _calc_check(self):
+                return self.a + self.point.x + sum(self.data)
+
+        self.test_type = _test
+        self.buf = bytearray(b'\x00' + bytes(_test()) + b'\x00')
+        self.s = _test.from_buffer(self.buf, 1)
+
+    def test_read(self):
+        """
+        Fields are read from the buffer.
+        """
+        self.buf[2] = 5
+        self.buf[4:6] = b'\x01\x02'
+
+        self.assertEqual(self.s.a, 5)
+        self.assertEqual(self.s.point.y, 0x201)
+
+    def test_write(self):
+        """
+        Assigned fields are written to the buffer, and computed fields are
+        kept up to date.
+        """
+        self.s.a = 1
+        self.s.point.x = 2
+        self.s.data = [3, 4]
+
+        self.assertEqual(self.buf, b'\x00\xaa\x01\x02\x00\x00\x03\x04\x0a\x00\x00')
+        self.assertEqual(bytes(self.s), bytes(self.buf[1:-1]))
+
+    def test_write_arrays(self):
+        """
+        Assigning an element of an array, or a field of an element of an
+        array of structs, writes it to the buffer.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('pts', _point[2]),
+                ('raw', uint8_t[2]),
+                ('check', Computed(uint8_t, '_calc_check')),
+            ]
+
+            def _calc_check(self):
+                return self.pts[1].x + sum(self.raw)
+
+        buf = bytearray(bytes(_test()))
+        s = _test.from_buffer(buf)
+
+        s.pts[1].x = 5
+        s.raw[0] = 9
+        s.pts[0] = _make_point(1, 2)
+
+        self.assertEqual(buf, b'\x01\x02\x00\x05\x00\x00\x09\x00\x0e')
+        self.assertEqual(s.pts, [_make_point(1, 2), _make_point(5, 0)])
+        self.assertEqual(s.raw, [9, 0])
+
+    def test_write_array_invalid(self):
+        """
+        Array elements are checked, and arrays cannot change length.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('raw', uint8_t[2]),
+            ]
+
+        buf = bytearray(2)
+        s = _test.from_buffer(buf)
+        raw = s.raw
+
+        with self.assertRaises(TypeError):
+            raw[0] = 256
+
+        with self.assertRaises(TypeError):
+            raw.append(1)
+
+        self.assertEqual(raw, [0, 0])
+        self.assertEqual(buf, b'\x00\x00')
+
+    def test_write_struct(self):
+        """
+        Assigning a nested struct copies it into the buffer.
+        """
+        self.s.point = _make_point(1, 2)
+
+        self.assertEqual(self.buf[3:6], b'\x01\x02\x00')
+        self.assertEqual(self.s.check, 1)
+
+    def test_write_invalid(self):
+        """
+        Invalid values are rejected without touching the buffer.
+        """
+        before = bytes(self.buf)
+
+        with self.assertRaises(TypeError):
+            self.s.a = 256
+
+        with self.assertRaises(TypeError):
+            self.s.point = _record_inner()
+
+        self.assertEqual(self.buf, before)
+
+    def test_unpack(self):
+        """
+        Unpacking into a buffer backed struct writes to the buffer.
+        """
+        other = self.test_type()
+        other.a = 7
+        other.point = _make_point(1, 1)
+
+        self.s.unpack(bytes(other))
+
+        self.assertEqual(self.buf[1:-1], bytes(other))
+        self.assertEqual(self.s, other)
+
+    def test_shared_memory(self):
+        """
+        Changes are shared through shared memory.
+        """
+        from multiprocessing import shared_memory
+
+        shm = shared_memory.SharedMemory(create=True, size=16)
+        self.addCleanup(shm.unlink)
+        self.addCleanup(shm.close)
+
+        writer = _point.from_buffer(shm.buf)
+        other = shared_memory.SharedMemory(name=shm.name)
+        self.addCleanup(other.close)
+        reader = _point.from_buffer(other.buf)
+
+        writer.y = 1000
+        self.assertEqual(reader.y, 1000)
+
+        writer.release()
+        reader.release()
+
+    def test_ctypes(self):
+        """
+        ctypes objects can be used as buffers.
+        """
+        import ctypes
+
+        class _c_point(ctypes.LittleEndianStructure):
+            _pack_ = 1
+            _fields_ = [('x', ctypes.c_uint8), ('y', ctypes.c_uint16)]
+
+        c_point = _c_point(1, 2)
+        point = _point.from_buffer(c_point)
+
+        self.assertEqual(point, _make_point(1, 2))
+
+        point.y = 300
+        self.assertEqual(c_point.y, 300)
+
+    def test_invalid_buffer(self):
+        """
+        The buffer must be writable and large enough, and the struct must
+        have a static size.
+        """
+        with self.assertRaises(TypeError):
+            _point.from_buffer(b'\x00\x00\x00')
+
+        with self.assertRaises(ValueError):
+            _point.from_buffer(bytearray(3), 1)
+
+        with self.assertRaises(ValueError):
+            _record_inner.from_buffer(bytearray(3))
+
+
+class CtypesTests(unittest.TestCase):
+    def setUp(self):
+        class _Color(enum.IntEnum):
+            Red = 1
+            Blue = 2
+
+        class _test(Structure):
+            _fields_ = [
+                ('magic', Const(b'\xaa')),
+                ('a', uint16_t.be),
+                ('color', EnumWrap(_Color, uint8_t)),
+                ('points', _be_point[2]),
+                ('name', Byte[4]),
+                ('check', Computed(uint32_t.be, '_calc_check')),
+            ]
+
+            def _calc_check(self):
+                return self.a
+
+        self.test_type = _test
+        self.color_type = _Color
+
+    def test_as_ctypes(self):
+        """
+        A struct converts to an equivalent ctypes structure.
+        """
+        import ctypes
+
+        ctype = self.test_type.as_ctypes()
+
+        self.assertTrue(issubclass(ctype, ctypes.BigEndianStructure))
+        self.assertEqual(ctypes.sizeof(ctype), self.test_type().size())
+        self.assertIs(self.test_type.as_ctypes(), ctype)
+
+    def test_to_ctypes(self):
+        """
+        A struct's values are copied to a ctypes structure.
+        """
+        s = self.test_type()
+        s.a = 0x102
+        s.color = self.color_type.Blue
+        s.points = [_make_point(1, 2, _be_point), _make_point(3, 4, _be_point)]
+        s.name = b'ab\x00d'
+
+        c_s = s.to_ctypes()
+
+        self.assertEqual(bytes(c_s), bytes(s))
+        self.assertEqual(c_s.a, 0x102)
+        self.assertEqual(c_s.color, 2)
+        self.assertEqual(c_s.points[1].y, 4)
+        self.assertEqual(c_s.name, b'ab')
+        self.assertEqual(c_s.check, 0x102)
+
+    def test_from_ctypes(self):
+        """
+        A ctypes structure converts back to a struct sharing its memory.
+        """
+        c_s = self.test_type.as_ctypes()()
+        c_s.magic[0] = 0xaa
+        c_s.a = 5
+        c_s.color = 1
+        c_s.check = 5
+
+        s = self.test_type.from_ctypes(c_s)
+        self.assertEqual(s.a, 5)
+        self.assertEqual(s.color, self.color_type.Red)
+
+        s.a = 6
+        self.assertEqual(c_s.a, 6)
+        self.assertEqual(c_s.check, 6)
+
+    def test_struct_array(self):
+        """
+        An array of structs converts to a ctypes array.
+        """
+        points = _point[2]()
+        points.value = [_make_point(1, 2), _make_point(3, 4)]
+
+        c_points = points.value.to_ctypes()
+
+        self.assertEqual(len(c_points), 2)
+        self.assertEqual(c_points[1].y, 4)
+        self.assertEqual(bytes(c_points), bytes(points))
+
+    def test_mixed_byte_order(self):
+        """
+        Structs with fields of different byte orders cannot be converted.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('a', uint16_t.le),
+                ('b', uint16_t.be),
+            ]
+
+        with self.assertRaises(ValueError):
+            _test.as_ctypes()
+
+    def test_variable_size(self):
+        """
+        Variable sized fields cannot be converted.
+        """
+        with self.assertRaises(ValueError):
+            _record_inner.as_ctypes()
+
+
+class AlignmentTests(unittest.TestCase):
+    def setUp(self):
+        class _inner(Structure):
+            _pack_ = 8
+            _fields_ = [
+                ('a', uint32_t),
+                ('b', uint8_t),
+            ]
+
+        class _test(Structure):
+            _pack_ = 8
+            _fields_ = [
+                ('a', uint8_t),
+                ('b', uint16_t),
+                ('inner', _inner),
+                ('c', uint64_t),
+            ]
+
+        self.inner_type = _inner
+        self.test_type = _test
+
+    def test_size(self):
+        """
+        Fields and structs are padded to their alignment.
+        """
+        self.assertEqual(self.inner_type().size(), 8)
+        self.assertEqual(self.test_type().static_size(), 24)
+
+    def test_pack_unpack(self):
+        """
+        Padding is zero filled when packing and skipped when unpacking.
+        """
+        s = self.test_type()
+        s.a = 1
+        s.b = 2
+        s.inner.a = 3
+        s.inner.b = 4
+        s.c = 5
+
+        packed = struct.pack('<BxHIB3x4xQ', 1, 2, 3, 4, 5)
+        self.assertEqual(bytes(s), packed)
+        self.assertEqual(b''.join(s.pack_iter()), packed)
+
+        other = self.test_type()
+        self.assertEqual(other.unpack(packed), 24)
+        self.assertEqual(other, s)
+
+    def test_unpack_stream(self):
+        """
+        Padding is skipped when unpacking from a stream.
+        """
+        packed = struct.pack('<BxHIB3x4xQ', 1, 2, 3, 4, 5)
+        stream = StreamUnpacker(self.test_type)
+
+        values = []
+        for i in range(len(packed)):
+            values.extend(stream.unpack(packed[i:i + 1]))
+
+        self.assertEqual(len(values), 1)
+        self.assertEqual(values[0].inner.b, 4)
+        self.assertEqual(values[0].c, 5)
+
+    def test_unpack_stream_variable(self):
+        """
+        Padding after variable size fields is skipped when unpacking from a
+        stream.
+        """
+        class _test(Structure):
+            _pack_ = 8
+            _fields_ = [
+                ('n', uint8_t),
+                ('data', uint8_t[LengthField('n')]),
+                ('c', uint32_t),
+            ]
+
+        s = _test()
+        s.data = [1, 2, 3]
+        s.c = 5
+
+        stream = StreamUnpacker(_test)
+        value, = stream.unpack(bytes(s))
+        self.assertEqual(value, s)
+
+    def test_pack_empty_array(self):
+        """
+        Padding before an empty array still counts towards the offset of the
+        fields after it.
+        """
+        class _test(Structure):
+            _pack_ = 8
+            _fields_ = [
+                ('n', uint8_t),
+                ('d', uint32_t[LengthField('n')]),
+                ('x', uint8_t),
+                ('y', uint16_t),
+            ]
+
+        s = _test()
+        s.x = 1
+        s.y = 2
+
+        packed = bytes(s)
+        self.assertEqual(packed, struct.pack('<B3xBxH', 0, 1, 2))
+        self.assertEqual(len(packed), s.packed_size())
+
+        other = _test()
+        self.assertEqual(other.unpack(packed), 8)
+        self.assertEqual(other, s)
+
+    def test_pack_limit(self):
+        """
+        ``_pack_`` limits the alignment.
+        """
+        class _test(Structure):
+            _pack_ = 2
+            _fields_ = [
+                ('a', uint8_t),
+                ('b', uint32_t),
+            ]
+
+        self.assertEqual(_test().size(), 6)
+
+    def test_codec(self):
+        """
+        Structs of integers are handled by a single ``struct.Struct``
+        matching the native layout.
+        """
+        class _test(Structure):
+            _pack_ = 8
+            _fields_ = [
+                ('a', uint8_t),
+                ('b', uint32_t),
+                ('c', uint16_t),
+            ]
+
+        codec = _test._cls_codec()
+        self.assertEqual(codec.size, struct.calcsize('@BIH0I'))
+
+        s = _test()
+        s.unpack(codec.pack(1, 2, 3))
+        self.assertEqual((s.a, s.b, s.c), (1, 2, 3))
+
+    def test_ctypes(self):
+        """
+        Aligned structs have the same layout as ctypes structures.
+        """
+        import ctypes
+
+        self.assertEqual(ctypes.sizeof(self.test_type.as_ctypes()), 24)
+
+    def test_columns(self):
+        """
+        Aligned structs can be unpacked into columns.
+        """
+        packed = struct.pack('<BxHIB3x4xQ', 1, 2, 3, 4, 5) * 2
+        columns = unpack_columns(self.test_type, packed)
+
+        self.assertEqual(list(columns['inner.b']), [4, 4])
+        self.assertEqual(list(columns['c']), [5, 5])
+
+
+class TrustedTests(unittest.TestCase):
+    def setUp(self):
+        class _Color(enum.IntEnum):
+            Red = 1
+
+        class _test(Structure):
+            _validate_ = False
+            _fields_ = [
+                ('magic', Const(b'\xaa')),
+                ('color', EnumWrap(_Color, uint8_t)),
+                ('inner', _record_inner),
+                ('data', uint8_t[2]),
+                ('check', Computed(uint8_t, '_calc_check')),
+            ]
+
+            def _calc_check(self):
+                return self.color
+
+        self.test_type = _test
+
+    def test_unchecked_values(self):
+        """
+        Values are not validated when unpacking a struct that does not
+        validate.
+        """
+        s = self.test_type()
+        s.unpack(b'\xaa\x07\x01\x05\x01\x02\x00')
+
+        self.assertEqual(s.color, 7)
+        self.assertEqual(s.inner.data, [5])
+        self.assertEqual(s.check, 7)
+
+    def test_structure_checked(self):
+        """
+        Lengths and constants are still checked.
+        """
+        s = self.test_type()
+
+        with self.assertRaises(ValueError):
+            s.unpack(b'\xab\x01\x00\x01\x02\x01')
+
+        with self.assertRaises(TypeError):
+            s.data = [1, 2, 3]
+
+    def test_fields_inherit(self):
+        """
+        Nested fields and arrays do not validate either.
+        """
+        s = self.test_type()
+
+        self.assertFalse(s.inner._validate_)
+        s.data = [1000, 2]
+        self.assertEqual(s.data, [1000, 2])
+
+    def test_per_instance(self):
+        """
+        Validation can be turned off for a single instance.
+        """
+        s = _test_field_struct(uint8_t[2])
+        trusted = type(s)(validate=False)
+
+        trusted.test = [300, 2]
+        self.assertEqual(trusted.test, [300, 2])
+
+        with self.assertRaises(TypeError):
+            s.test = [300, 2]
+
+    def test_pack(self):
+        """
+        Valid values pack the same way.
+        """
+        s = self.test_type()
+        s.unpack(b'\xaa\x01\x01\x05\x01\x02\x01')
+
+        self.assertEqual(bytes(s), b'\xaa\x01\x01\x05\x01\x02\x01')
+
+
+class _point(Structure):
+    _fields_ = [
+        ('x', uint8_t),
+        ('y', uint16_t),
+    ]
+
+
+class _be_point(Structure):
+    _fields_ = [
+        ('x', uint8_t),
+        ('y', uint16_t.be),
+    ]
+
+
+def _make_point(x, y, point_type=_point):
+    point = point_type()
+    point.x = x
+    point.y = y
+
+    return point
+
+
+class _record_inner(Structure):
+    _fields_ = [
+        ('len', uint8_t),
+        ('data', uint8_t[LengthField('len')]),
+    ]
+
+
+class _record_struct(Structure):
+    _fields_ = [
+        ('a', uint8_t),
+        ('inner', _record_inner),
+        ('check', Computed(uint8_t, '_calc_check')),
+    ]
+
+    def _calc_check(self):
+        return self.a + self.inner.len
+
+
 def _test_field_struct(field_type, field_name='test'):
     class _test(Structure):
         _fields_ = [
@@ -0,0 +1,144 @@
+import unittest
+
+from tamp import *
+
+
+class _pkt(Structure):
+    _fields_ = [
+        ('len', varuint),
+        ('data', uint8_t[LengthField('len')]),
+    ]
+
+
+class VarintTests(unittest.TestCase):
+    def test_varuint_pack(self):
+        """
+        Unsigned varints pack 7 bits per byte, least significant first.
+        """
+        self.assertEqual(bytes(varuint(0)), b'\x00')
+        self.assertEqual(bytes(varuint(127)), b'\x7f')
+        self.assertEqual(bytes(varuint(300)), b'\xac\x02')
+        self.assertEqual(bytes(varuint(2 ** 64 - 1)), b'\xff' * 9 + b'\x01')
+
+    def test_varuint_unpack(self):
+        """
+        Unsigned varints unpack from a prefix of the buffer.
+        """
+        v = varuint()
+
+        self.assertEqual(v.unpack(b'\xac\x02\x05'), 2)
+        self.assertEqual(v.value, 300)
+
+    def test_varint_zigzag(self):
+        """
+        Signed varints are zigzag encoded.
+        """
+        for value, packed in ((0, b'\x00'), (-1, b'\x01'), (1, b'\x02'), (-2, b'\x03'), (-65, b'\x81\x01')):
+            self.assertEqual(bytes(varint(value)), packed)
+
+            v = varint()
+            v.unpack(packed)
+            self.assertEqual(v.value, value)
+
+    def test_packed_size(self):
+        """
+        The packed size depends on the value.
+        """
+        self.assertEqual(varuint(127).packed_size(), 1)
+        self.assertEqual(varuint(128).packed_size(), 2)
+        self.assertEqual(varint(-65).packed_size(), 2)
+        self.assertIsNone(varuint().static_size())
+
+    def test_invalid(self):
+        """
+        Values out of range raise ``TypeError``; truncated or oversized
+        values raise ``ValueError`` when unpacking.
+        """
+        with self.assertRaises(TypeError):
+            varuint(-1)
+
+        with self.assertRaises(TypeError):
+            varint(2 ** 63)
+
+        with self.assertRaises(ValueError):
+            varuint().unpack(b'\x80\x80')
+
+        with self.assertRaises(ValueError):
+            varuint().unpack(b'\xff' * 10 + b'\x01')
+
+    def test_too_long(self):
+        """
+        Unpacking stops with ``ValueError`` after 10 bytes with the
+        continuation bit set, rather than reading the rest of the input.
+        """
+        with self.assertRaisesRegex(ValueError, 'longer than 10 bytes'):
+            varuint().unpack(b'\x80' * 10000)
+
+        with self.assertRaisesRegex(ValueError, 'longer than 10 bytes'):
+            varuint._unpack_many(b'\x01' + b'\xff' * 11)
+
+        stream = StreamUnpacker(varuint)
+        with self.assertRaisesRegex(ValueError, 'longer than 10 bytes'):
+            list(stream.unpack(b'\x80' * 10))
+
+    def test_length_field(self):
+        """
+        A varint can be a length field.
+        """
+        pkt = _pkt()
+        pkt.data = list(range(200))
+
+        packed = bytes(pkt)
+        self.assertEqual(packed[:2], b'\xc8\x01')
+
+        other = _pkt()
+        other.unpack(packed)
+        self.assertEqual(other, pkt)
+
+    def test_unpack_stream(self):
+        """
+        A varint can be unpacked from a stream a byte at a time.
+        """
+        pkt = _pkt()
+        pkt.data = list(range(150))
+        packed = bytes(pkt)
+
+        stream = StreamUnpacker(_pkt)
+        values = []
+        for i in range(len(packed)):
+            values.extend(stream.unpack(packed[i:i + 1]))
+
+        self.assertEqual(values, [pkt])
+
+    def test_array(self):
+        """
+        Arrays of varints pack and unpack in bulk.
+        """
+        class _test(Structure):
+            _fields_ = [
+                ('a', varint[3]),
+                ('b', varuint[0]),
+            ]
+
+        s = _test()
+        s.a = [1, -300, 5]
+        s.b = [0, 2 ** 40]
+
+        packed = bytes(s)
+        self.assertEqual(packed, b'\x02\xd7\x04\x0a\x00\x80\x80\x80\x80\x80\x20')
+
+        other = _test()
+        self.assertEqual(other.unpack(packed), len(packed))
+        self.assertEqual(other.a, [1, -300, 5])
+        self.assertEqual(other.b, [0, 2 ** 40])
+
+    def test_array_truncated(self):
+        """
+        Unpacking an array that ends inside a varint raises ``ValueError``.
+        """
+        with self.assertRaises(ValueError):
+            varuint[0]().unpack(b'\x01\x80')
+
+
+if __name__ == '__main__':
+    unittest.main()